@@ -23,11 +23,16 @@ Long description of module's purpose
     # always loaded
     'data': [
         'security/ir.model.access.csv',  # Updated security rules
+        'data/ir_cron_data.xml',
         'views/category_views.xml',
         'views/expense_views.xml',
         'views/user_category_views.xml',
         'views/user_expense_views.xml',
         'views/record_views.xml',
+        'views/record_rollup_views.xml',
+        'views/recurring_expense_views.xml',
+        'views/budget_views.xml',
+        'views/profiling_request_views.xml',
         'views/menus.xml',
     ],
     # only loaded in demonstration mode
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the per-request JWT verification cost, before and after
+the worker caches of jwt_cache.
+
+Runs in-process against a database with the module installed (no HTTP):
+
+    python3 benchmarks/auth_benchmark.py --config odoo.conf --db bench --iterations 20000
+
+"before" replays the uncached verification every protected request used to do:
+an ir.config_parameter lookup of the secret through sudo() and a full HS256
+check of the token. "after" calls the cached path used by
+JWTAuth.authenticate_request today. Both verify the same valid token; the
+report gives mean/p50/p95/p99 per call in microseconds, as JSON.
+"""
+import sys
+import json
+import time
+import argparse
+import datetime
+
+import jwt
+
+from odoo_env import add_arguments, odoo_env, addon_module
+
+PERCENTILES = (50, 95, 99)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=10000, help="Verifications timed per variant")
+    parser.add_argument('--warmup', type=int, default=500, help="Untimed verifications run first")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+def _time_calls(function, iterations, warmup):
+    for _ in range(warmup):
+        function()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'mean_us': round(sum(samples) / len(samples), 2),
+        **{f'p{p}_us': round(samples[max(0, round(p / 100 * len(samples)) - 1)], 2) for p in PERCENTILES},
+    }
+
+
+def main():
+    args = parse_args()
+    with odoo_env(args) as env:
+        jwt_cache = addon_module(args, 'jwt_cache')
+        secret = env['ir.config_parameter'].sudo().get_param(jwt_cache.SECRET_PARAM, 'default_secret')
+        token = jwt.encode({
+            'user_id': env.uid,
+            'login': env.user.login,
+            'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1),
+        }, secret, algorithm='HS256')
+
+        def before():
+            key = env['ir.config_parameter'].sudo().get_param(jwt_cache.SECRET_PARAM, 'default_secret')
+            return jwt.decode(token, key, algorithms=['HS256'])
+
+        def after():
+            return jwt_cache._decode_token(env, token)
+
+        assert before()['user_id'] == after()['user_id'] == env.uid
+        report = {
+            'before': _time_calls(before, args.iterations, args.warmup),
+            'after': _time_calls(after, args.iterations, args.warmup),
+        }
+        report['speedup'] = round(report['before']['mean_us'] / report['after']['mean_us'], 1)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
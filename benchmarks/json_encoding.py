@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the JSON response encoders, on record-shaped rows.
+
+Runs in-process (no HTTP, no database), with the addon on the Odoo addons_path:
+
+    python3 benchmarks/json_encoding.py --config odoo.conf --rows 10000 --repeat 20
+
+Variants, all producing the {"status", "message", "data"} envelope:
+
+- "old": json.dumps of the whole body, as _http_success_response did before
+  _json_dumps (default=str stands in for the str() calls the controllers made
+  on dates);
+- "buffered": _json_dumps of the whole body (orjson when installed), what
+  _http_success_response does today;
+- "streamed": the body iterator of _http_stream_response fed by a generator,
+  as the json export does.
+
+Buffered variants build the full row list first, like a search_read does; the
+streamed one consumes rows as they are produced. The report gives, per variant
+and as JSON, the mean/p50/p95 wall time in milliseconds, the peak memory
+traced while encoding (tracemalloc, a separate untimed run) and the body size.
+"""
+import sys
+import json
+import time
+import argparse
+import datetime
+import tracemalloc
+
+from odoo_env import add_arguments, load_config, addon_module
+
+PERCENTILES = (50, 95)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser, database=False)
+    parser.add_argument('--rows', type=int, default=10000, help="Rows per response body")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed encodings per variant")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+def _iter_rows(count):
+    start = datetime.datetime(2024, 1, 1)
+    for n in range(count):
+        yield {
+            'id': n + 1,
+            'date': start + datetime.timedelta(minutes=37 * n),
+            'amount': round(1 + (n % 9700) / 100, 2),
+            'category_type': 'global' if n % 3 else 'user',
+            'category_id': 1 + n % 12,
+            'category_name': f"Category {1 + n % 12}",
+            'expense_id': 1 + n % 80,
+            'expense_name': f"Expense {1 + n % 80}",
+            'note': None if n % 4 else f"Note {n}",
+        }
+
+
+def _measure(function, repeat):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = function()
+        samples.append((time.perf_counter() - start) * 1e3)
+    samples.sort()
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'repeat': repeat,
+        'mean_ms': round(sum(samples) / len(samples), 2),
+        **{f'p{p}_ms': round(samples[max(0, round(p / 100 * len(samples)) - 1)], 2) for p in PERCENTILES},
+        'peak_kib': round(peak / 1024, 1),
+        'bytes': size,
+    }
+
+
+def main():
+    args = parse_args()
+    load_config(args)
+    helpers = addon_module(args, 'controllers._helpers')
+    message = "Expense Records retrieved successfully"
+
+    def old():
+        body = {'status': 'success', 'message': message, 'data': list(_iter_rows(args.rows))}
+        return len(json.dumps(body, default=str))
+
+    def buffered():
+        body = {'status': 'success', 'message': message, 'data': list(_iter_rows(args.rows))}
+        return len(helpers._json_dumps(body))
+
+    def streamed():
+        response = helpers._http_stream_response(_iter_rows(args.rows), message)
+        return sum(len(chunk) for chunk in response.response)
+
+    streamed_body = b''.join(helpers._http_stream_response(_iter_rows(args.rows), message).response)
+    assert json.loads(streamed_body) == json.loads(helpers._json_dumps(
+        {'status': 'success', 'message': message, 'data': list(_iter_rows(args.rows))}))
+
+    report = {
+        'rows': args.rows,
+        'orjson': helpers.orjson is not None,
+        'old': _measure(old, args.repeat),
+        'buffered': _measure(buffered, args.repeat),
+        'streamed': _measure(streamed, args.repeat),
+    }
+    report['buffered_speedup'] = round(report['old']['mean_ms'] / report['buffered']['mean_ms'], 2)
+    report['streamed_memory_ratio'] = round(report['streamed']['peak_kib'] / report['old']['peak_kib'], 3)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Load test for the easy_expenses API.
+
+Runs --clients concurrent clients for --duration seconds. Each client logs in
+as one of the users created by seed_data.py and then repeatedly picks a
+scenario from a weighted, seeded mix covering every client API route
+(everything but the metrics scrape). For each
+route the report gives the request and error counts, throughput, and the
+mean/p50/p95/p99 latency in milliseconds, as JSON:
+
+    python3 benchmarks/load_test.py --url http://localhost:8069 --users 100 \
+        --clients 32 --duration 60 --output results.json
+
+Use the same --seed (and the same seeded database) to compare runs. Write
+scenarios only touch records the client created itself, so a run leaves the
+data set roughly as it found it.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+import http.client
+import urllib.parse
+
+PERCENTILES = (50, 95, 99)
+IMPORT_YEAR = 2099
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8069', help="Odoo base URL")
+    parser.add_argument('--users', type=int, default=10, help="Number of seeded users to spread clients over")
+    parser.add_argument('--user-password', default='bench-password')
+    parser.add_argument('--clients', type=int, default=8, help="Concurrent clients (threads)")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of load, after login")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed of the scenario mix")
+    parser.add_argument('--read-only', action='store_true', help="Only run scenarios that do not write")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+class ApiError(Exception):
+    pass
+
+
+class Client:
+    """One keep-alive connection authenticated as one user"""
+
+    def __init__(self, base_url, login, password, stats):
+        parsed = urllib.parse.urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+        self._connect = lambda: connection_class(parsed.netloc, timeout=60)
+        self.connection = self._connect()
+        self.login, self.password = login, password
+        self.stats = stats
+        self.token = self.refresh_token = None
+        self.user_categories = []
+        self.global_expenses = []
+
+    def request(self, route, method, path, params=None, body=None, content_type=None, headers=None):
+        """Send one request, record its latency under `route` and return (status, raw body)"""
+        if params:
+            path = f'{path}?{urllib.parse.urlencode(params)}'
+        all_headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
+        if content_type:
+            all_headers['Content-Type'] = content_type
+        all_headers.update(headers or {})
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=all_headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = self._connect()
+            self.stats.record(route, time.perf_counter() - start, error=True)
+            raise ApiError(f"{method} {path}: connection error")
+        self.stats.record(route, time.perf_counter() - start, error=status >= 400)
+        return status, payload
+
+    def http_json(self, route, method, path, params=None, form=None, json_body=None, headers=None, envelope=False):
+        """Call a type='http' route; return the `data` of its success envelope, or all of it (None for 304)"""
+        body = content_type = None
+        if form is not None:
+            body, content_type = urllib.parse.urlencode(form), 'application/x-www-form-urlencoded'
+        elif json_body is not None:
+            body, content_type = json.dumps(json_body), 'application/json'
+        status, payload = self.request(route, method, path, params, body, content_type, headers)
+        if status == 304:
+            return None
+        if status >= 400:
+            raise ApiError(f"{method} {path}: HTTP {status}")
+        if not payload.startswith(b'{'):
+            return payload
+        reply = json.loads(payload)
+        return reply if envelope else reply.get('data')
+
+    def json_rpc(self, route, path, params, method='POST'):
+        """Call a type='json' route and return its result"""
+        body = json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': params})
+        status, payload = self.request(route, method, path, body=body, content_type='application/json')
+        reply = json.loads(payload) if status < 400 else {}
+        if 'error' in reply or status >= 400:
+            raise ApiError(f"POST {path}: {reply.get('error', {}).get('message', status)}")
+        return reply.get('result', reply)
+
+    def authenticate(self):
+        self.token = None
+        result = self.json_rpc('auth.login', '/api/easy_apps/expenses/auth',
+                               {'login': self.login, 'password': self.password})
+        self.token, self.refresh_token = result['token'], result['refresh_token']
+
+
+class Stats:
+    """Latencies per route, shared by all client threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, route, seconds, error=False):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds * 1000)
+            if error:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, elapsed):
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            routes[route] = {
+                'requests': len(samples),
+                'errors': self.errors.get(route, 0),
+                'throughput_rps': round(len(samples) / elapsed, 2),
+                'mean_ms': round(sum(samples) / len(samples), 2),
+                **{f'p{p}_ms': round(_percentile(samples, p), 2) for p in PERCENTILES},
+                'max_ms': round(samples[-1], 2),
+            }
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'total_requests': total,
+            'total_errors': sum(self.errors.values()),
+            'throughput_rps': round(total / elapsed, 2),
+            'routes': routes,
+        }
+
+
+def _percentile(sorted_samples, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_samples) - 1, round(percent / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+# Scenarios: each is one user action, which may issue several requests
+
+def scenario_catalog(client, rng):
+    client.http_json('categories.get_categories', 'GET', '/api/easy_apps/categories')
+    expenses = client.http_json('expenses.get_expenses', 'GET', '/api/easy_apps/expenses',
+                                params={'fields': 'id,category_id'})
+    client.user_categories = client.http_json('user_categories.get_user_categories', 'GET',
+                                              '/api/easy_apps/user_categories/get') or client.user_categories
+    client.http_json('user_expenses.get_expenses_by_category', 'GET', '/api/easy_apps/user_expenses/category')
+    if client.user_categories:
+        client.http_json('user_expenses.get_expenses_by_category', 'GET',
+                         f"/api/easy_apps/user_expenses/category/{rng.choice(client.user_categories)['id']}")
+    if expenses:
+        client.global_expenses = [(row['category_id'], row['id']) for row in expenses]
+        category_id = rng.choice(client.global_expenses)[0]
+        client.http_json('expenses.get_expenses', 'GET', f'/api/easy_apps/expenses/{category_id}')
+
+
+def scenario_list_records(client, rng):
+    page = client.http_json('records.get_records', 'GET', '/api/easy_apps/records/get', params={'limit': 50})
+    if page:
+        record = rng.choice(page)
+        client.http_json('records.get_record', 'GET', f"/api/easy_apps/records/{record['id']}")
+
+
+def scenario_filter_records(client, rng):
+    end = datetime.date.today() - datetime.timedelta(days=rng.randrange(365))
+    start = end - datetime.timedelta(days=rng.choice((7, 30, 90)))
+    client.http_json('records.get_records', 'GET', '/api/easy_apps/records/get',
+                     params={'start_date': start.isoformat(), 'end_date': end.isoformat(), 'limit': 100})
+
+
+def scenario_summary(client, rng):
+    today = datetime.date.today()
+    granularity = rng.choice(('day', 'week', 'month', 'year'))
+    start = today.replace(day=1) - datetime.timedelta(days=365) if granularity in ('month', 'year') else \
+        today - datetime.timedelta(days=30)
+    if granularity in ('month', 'year'):
+        start = start.replace(day=1)
+    client.http_json('reports.get_summary', 'GET', '/api/easy_apps/records/summary', params={
+        'granularity': granularity,
+        'group_by': rng.choice(('category', 'expense', 'category_type')),
+        'start_date': start.isoformat(),
+        'end_date': today.isoformat(),
+    })
+
+
+def scenario_insights(client, rng):
+    client.http_json('insights.get_insights', 'GET', '/api/easy_apps/records/insights',
+                     params={'months': rng.choice((3, 12))})
+
+
+def scenario_budgets(client, rng):
+    client.http_json('budgets.get_budget_status', 'GET', '/api/easy_apps/budgets/status')
+
+
+def scenario_sync(client, rng):
+    # A full sync, then the incremental one a device would make next
+    reply = client.http_json('sync.sync', 'GET', '/api/easy_apps/sync', envelope=True)
+    if reply and reply.get('watermark'):
+        client.http_json('sync.sync', 'GET', '/api/easy_apps/sync', params={'since': reply['watermark']})
+
+
+def scenario_export(client, rng):
+    start = datetime.date.today() - datetime.timedelta(days=30)
+    client.http_json('export.export_records', 'GET', '/api/easy_apps/records/export',
+                     params={'format': rng.choice(('csv', 'ndjson')), 'start_date': start.isoformat()})
+
+
+def scenario_batch(client, rng):
+    client.http_json('batch.batch', 'POST', '/api/easy_apps/batch', json_body=[
+        {'path': '/api/easy_apps/categories', 'method': 'GET'},
+        {'path': '/api/easy_apps/user_categories/get', 'method': 'GET'},
+        {'path': '/api/easy_apps/records/get', 'method': 'GET', 'params': {'limit': 20}},
+    ])
+
+
+def _record_values(client, rng):
+    if client.global_expenses:
+        category_id, expense_id = rng.choice(client.global_expenses)
+        return {'category_type': 'global', 'category_id': category_id, 'expense_id': expense_id,
+                'amount': round(rng.uniform(1, 200), 2), 'note': 'load test'}
+    return None
+
+
+def scenario_write_record(client, rng):
+    vals = _record_values(client, rng)
+    if not vals:
+        return
+    record = client.http_json('records.create_record', 'POST', '/api/easy_apps/records/create', form=vals)
+    client.http_json('records.update_record', 'PUT', f"/api/easy_apps/records/update/{record['id']}",
+                     form={'amount': round(rng.uniform(1, 200), 2)})
+    client.http_json('records.delete_record', 'DELETE', f"/api/easy_apps/records/delete/{record['id']}")
+
+
+def scenario_bulk_records(client, rng):
+    items = [vals for vals in (_record_values(client, rng) for _ in range(rng.choice((10, 50, 100)))) if vals]
+    if not items:
+        return
+    results = client.http_json('records.create_records_batch', 'POST', '/api/easy_apps/records/create_batch',
+                               json_body=items)
+    ids = [result['id'] for result in results if 'id' in result]
+    if ids:
+        client.http_json('records.update_records_batch', 'PUT', '/api/easy_apps/records/update_batch',
+                         json_body={'ids': ids, 'values': {'note': 'load test (bulk)'}})
+        client.http_json('records.delete_records_batch', 'DELETE', '/api/easy_apps/records/delete_batch',
+                         json_body={'ids': ids})
+
+
+def scenario_import(client, rng):
+    # Statement lines are dated in IMPORT_YEAR so they can be removed by date afterwards
+    lines = ['date,amount,description']
+    lines += [f'{IMPORT_YEAR}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},-{rng.uniform(1, 100):.2f},'
+              f'LOAD TEST {rng.randrange(10 ** 9)}' for _ in range(rng.choice((20, 100)))]
+    boundary = f'----easyexpenses{rng.randrange(10 ** 12)}'
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="statement.csv"\r\n'
+            f'Content-Type: text/csv\r\n\r\n' + '\n'.join(lines) + f'\r\n--{boundary}--\r\n').encode()
+    status, _payload = client.request('statement_import.import_statement', 'POST', '/api/easy_apps/records/import',
+                                      body=body, content_type=f'multipart/form-data; boundary={boundary}')
+    if status < 400:
+        client.http_json('records.delete_records_batch', 'DELETE', '/api/easy_apps/records/delete_batch',
+                         json_body={'filters': {'start_date': f'{IMPORT_YEAR}-01-01'}})
+
+
+def _envelope_id(result):
+    """Id of the object created by a type='json' route, from its success envelope"""
+    data = result.get('data') if isinstance(result, dict) else None
+    return data.get('id') if isinstance(data, dict) else None
+
+
+def scenario_user_catalog(client, rng):
+    category = client.json_rpc('user_categories.create_user_category', '/api/easy_apps/user_categories/create',
+                               {'name': f'Load test {rng.randrange(10 ** 6)}'})
+    category_id = _envelope_id(category)
+    if not category_id:
+        return
+    expense = client.json_rpc('user_expenses.create_user_expense', '/api/easy_apps/user_expenses/create',
+                              {'name': 'Load test expense', 'category_id': category_id})
+    expense_id = _envelope_id(expense)
+    if expense_id:
+        client.json_rpc('user_expenses.update_user_expense', f'/api/easy_apps/user_expenses/update/{expense_id}',
+                        {'name': 'Load test expense (renamed)'}, method='PUT')
+        client.json_rpc('user_expenses.delete_user_expense', f'/api/easy_apps/user_expenses/delete/{expense_id}', {},
+                        method='DELETE')
+    client.json_rpc('user_categories.update_user_category', f'/api/easy_apps/user_categories/update/{category_id}',
+                    {'name': 'Load test (renamed)'}, method='PUT')
+    client.json_rpc('user_categories.delete_user_category', f'/api/easy_apps/user_categories/delete/{category_id}', {},
+                    method='DELETE')
+
+
+def scenario_refresh(client, rng):
+    result = client.json_rpc('auth.refresh', '/api/easy_apps/expenses/auth/refresh',
+                             {'refresh_token': client.refresh_token})
+    client.token, client.refresh_token = result['token'], result['refresh_token']
+
+
+def scenario_relogin(client, rng):
+    client.json_rpc('auth.logout', '/api/easy_apps/expenses/auth/logout', {'refresh_token': client.refresh_token})
+    client.authenticate()
+
+
+# (scenario, weight, writes)
+SCENARIOS = [
+    (scenario_catalog, 10, False),
+    (scenario_list_records, 25, False),
+    (scenario_filter_records, 15, False),
+    (scenario_summary, 10, False),
+    (scenario_budgets, 3, False),
+    (scenario_insights, 3, False),
+    (scenario_sync, 5, False),
+    (scenario_export, 2, False),
+    (scenario_batch, 5, False),
+    (scenario_refresh, 1, False),
+    (scenario_relogin, 1, False),
+    (scenario_write_record, 15, True),
+    (scenario_bulk_records, 4, True),
+    (scenario_import, 1, True),
+    (scenario_user_catalog, 3, True),
+]
+
+
+def run_client(index, args, stats, deadline, start_barrier, failures):
+    rng = random.Random(args.seed * 1000 + index)
+    client = Client(args.url, f'bench_user_{index % args.users}@example.com', args.user_password, stats)
+    scenarios = [(scenario, weight) for scenario, weight, writes in SCENARIOS if not (writes and args.read_only)]
+    functions, weights = zip(*scenarios)
+    try:
+        client.authenticate()
+        scenario_catalog(client, rng)
+    except ApiError as e:
+        failures.append(f"client {index}: {e}")
+        return
+    finally:
+        start_barrier.wait()
+
+    while time.monotonic() < deadline[0]:
+        scenario = rng.choices(functions, weights)[0]
+        try:
+            scenario(client, rng)
+        except ApiError as e:
+            if 'HTTP 401' in str(e):
+                client.authenticate()
+        except (ValueError, KeyError, TypeError) as e:
+            failures.append(f"client {index}: {scenario.__name__}: {e!r}")
+
+
+def main():
+    args = parse_args()
+    stats = Stats()
+    failures = []
+    deadline = [float('inf')]
+    clock = {}
+
+    def start_measuring():
+        # Logins and the first catalog fetch are warm-up: report them apart
+        clock['warmup'] = stats.report(1)
+        stats.latencies.clear()
+        stats.errors.clear()
+        clock['start'] = time.monotonic()
+        deadline[0] = clock['start'] + args.duration
+
+    start_barrier = threading.Barrier(args.clients, action=start_measuring)
+    threads = [
+        threading.Thread(target=run_client, args=(index, args, stats, deadline, start_barrier, failures), daemon=True)
+        for index in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - clock['start']
+    warmup = clock['warmup']
+
+    report = {
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('user_password', 'output')},
+        'elapsed_s': round(elapsed, 2),
+        'warmup': {route: {'requests': values['requests'], 'p50_ms': values['p50_ms']}
+                   for route, values in warmup['routes'].items()},
+        **stats.report(elapsed),
+        'failures': failures[:100],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(text + '\n')
+    else:
+        print(text)
+    return 1 if failures and not stats.latencies else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
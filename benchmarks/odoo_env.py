@@ -0,0 +1,44 @@
+"""
+In-process Odoo bootstrap shared by the benchmarks that time server code
+directly (no HTTP): parses an Odoo configuration, loads the registry of a
+database and yields a superuser environment.
+"""
+import importlib
+from contextlib import contextmanager
+
+
+def add_arguments(parser, database=True):
+    parser.add_argument('--config', help="Odoo configuration file (addons_path, db_host...)")
+    if database:
+        parser.add_argument('--db', required=True, help="Database with the module installed")
+    parser.add_argument('--module', default='easy_expenses', help="Technical name of the addon")
+
+
+def load_config(args):
+    """Parse the Odoo configuration and put its addons_path on the import path"""
+    import odoo
+    from odoo.modules.module import initialize_sys_path
+
+    odoo.tools.config.parse_config(['-c', args.config] if args.config else [])
+    initialize_sys_path()
+
+
+@contextmanager
+def odoo_env(args):
+    """Superuser environment on args.db; the transaction is rolled back unless the caller commits"""
+    from odoo import api, SUPERUSER_ID
+    from odoo.modules.registry import Registry
+
+    load_config(args)
+    registry = Registry(args.db)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        try:
+            yield env
+        finally:
+            cr.rollback()
+
+
+def addon_module(args, name):
+    """Import a submodule of the addon, e.g. addon_module(args, 'jwt_cache')"""
+    return importlib.import_module(f'odoo.addons.{args.module}.{name}')
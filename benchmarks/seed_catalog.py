@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the default catalog seeding run by the category and expense
+init() hooks on every install and upgrade, before and after the set-based
+create_default_categories / create_default_expenses.
+
+Runs in-process against a database with the module installed (no HTTP):
+
+    python3 benchmarks/seed_catalog.py --config odoo.conf --db bench --repeat 20
+
+Scenarios:
+
+- "install": the global catalog tables are emptied first (inside a savepoint,
+  rolled back after each run), so every default row is created;
+- "upgrade": the catalog is already seeded, so nothing is created.
+
+Variants:
+
+- "before": the per-row seeding the module used to do, one search per
+  default category, two searches per default expense and one create per
+  missing row (expenses de-duplicated on their name alone, as before);
+- "after": create_default_categories then create_default_expenses as they
+  run today, one read per table and one multi-create.
+
+Both variants seed from the same default lists, read back from the tables
+after a run of the current code. The report gives, per scenario and variant
+and as JSON, the mean/p50/p95 wall time in milliseconds, the SQL queries run
+and the rows created. Everything is rolled back: run it on a throwaway
+database all the same, since the install scenario deletes the global catalog
+(and, through their foreign keys, nulls or cascades what references it).
+"""
+import sys
+import json
+import time
+import argparse
+
+from odoo_env import add_arguments, odoo_env
+
+PERCENTILES = (50, 95)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per scenario and variant")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+def _empty_catalog(env):
+    env.flush_all()
+    env.cr.execute("DELETE FROM easy_expenses_expense")
+    env.cr.execute("DELETE FROM easy_expenses_category")
+    env.invalidate_all()
+
+
+def _default_catalog(env):
+    """(categories, expenses) seeded by the current code on an empty catalog"""
+    with env.cr.savepoint():
+        _empty_catalog(env)
+        env['easy_expenses.category'].create_default_categories()
+        env['easy_expenses.expense'].create_default_expenses()
+        categories = env['easy_expenses.category'].search_read([], ['name', 'description'], order='id')
+        expenses = [{'name': expense.name, 'category_name': expense.category_id.name}
+                    for expense in env['easy_expenses.expense'].search([], order='id')]
+    env.invalidate_all()
+    return [{'name': category['name'], 'description': category['description']} for category in categories], expenses
+
+
+def _seed_before(env, default_categories, default_expenses):
+    """The per-row seeding of the module before create_default_* became set-based"""
+    Category, Expense = env['easy_expenses.category'], env['easy_expenses.expense']
+    for category in default_categories:
+        existing_category = Category.search([('name', '=', category['name'])], limit=1)
+        if not existing_category:
+            Category.create(category)
+    for expense in default_expenses:
+        category = Category.search([('name', '=', expense['category_name'])], limit=1)
+        if category and not Expense.search([('name', '=', expense['name'])]):
+            Expense.create({'name': expense['name'], 'category_id': category.id})
+
+
+def _seed_after(env):
+    env['easy_expenses.category'].create_default_categories()
+    env['easy_expenses.expense'].create_default_expenses()
+
+
+def _count_rows(env):
+    env.cr.execute("SELECT (SELECT count(*) FROM easy_expenses_category) + (SELECT count(*) FROM easy_expenses_expense)")
+    return env.cr.fetchone()[0]
+
+
+def _measure(env, seed, install, repeat):
+    samples = []
+    queries = created = 0
+    for _ in range(repeat):
+        with env.cr.savepoint():
+            if install:
+                _empty_catalog(env)
+            rows = _count_rows(env)
+            queries_before = env.cr.sql_log_count
+            start = time.perf_counter()
+            seed()
+            env.flush_all()
+            samples.append((time.perf_counter() - start) * 1e3)
+            queries = env.cr.sql_log_count - queries_before
+            created = _count_rows(env) - rows
+        env.invalidate_all()
+    samples.sort()
+    return {
+        'repeat': repeat,
+        'mean_ms': round(sum(samples) / len(samples), 2),
+        **{f'p{p}_ms': round(samples[max(0, round(p / 100 * len(samples)) - 1)], 2) for p in PERCENTILES},
+        'queries': queries,
+        'rows_created': created,
+    }
+
+
+def main():
+    args = parse_args()
+    with odoo_env(args) as env:
+        default_categories, default_expenses = _default_catalog(env)
+
+        def before():
+            _seed_before(env, default_categories, default_expenses)
+
+        def after():
+            _seed_after(env)
+
+        report = {'categories': len(default_categories), 'expenses': len(default_expenses)}
+        for scenario, install in (('install', True), ('upgrade', False)):
+            result = {
+                'before': _measure(env, before, install, args.repeat),
+                'after': _measure(env, after, install, args.repeat),
+            }
+            result['speedup'] = round(result['before']['mean_ms'] / result['after']['mean_ms'], 1)
+            report[scenario] = result
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
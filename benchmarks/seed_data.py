@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for easy_expenses load tests.
+
+Creates N API users through XML-RPC (so passwords and groups go through the
+ORM), gives each a few custom categories/expenses, then bulk-loads expense
+records straight into PostgreSQL with COPY (filling the stored category
+dimension the ORM would compute) and rebuilds the monthly rollups and the
+budget counters.
+
+    python3 benchmarks/seed_data.py --url http://localhost:8069 --db bench \
+        --admin-password admin --dsn "dbname=bench" --users 100 --records 10000000
+
+Every user gets the password given by --user-password and the login
+bench_user_<n>@example.com; load_test.py uses the same convention.
+"""
+import io
+import sys
+import time
+import random
+import argparse
+import datetime
+import xmlrpc.client
+
+import psycopg2
+
+COPY_BATCH = 200_000
+USER_CATEGORIES = ['Pets', 'Hobbies', 'Gifts', 'Kids']
+USER_EXPENSES_PER_CATEGORY = 3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8069', help="Odoo base URL (XML-RPC)")
+    parser.add_argument('--db', required=True, help="Odoo database name")
+    parser.add_argument('--admin-login', default='admin')
+    parser.add_argument('--admin-password', required=True)
+    parser.add_argument('--dsn', required=True, help="psycopg2 DSN of the same database, used for COPY")
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--records', type=int, default=100_000, help="Total records, spread over the users")
+    parser.add_argument('--user-password', default='bench-password')
+    parser.add_argument('--days', type=int, default=3 * 365, help="Spread record dates over this many past days")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible data sets")
+    return parser.parse_args()
+
+
+def ensure_users(args):
+    """Create (or reuse) the benchmark users through the ORM and return their ids"""
+    common = xmlrpc.client.ServerProxy(f'{args.url}/xmlrpc/2/common')
+    uid = common.authenticate(args.db, args.admin_login, args.admin_password, {})
+    if not uid:
+        sys.exit("Admin authentication failed")
+    models = xmlrpc.client.ServerProxy(f'{args.url}/xmlrpc/2/object', allow_none=True)
+
+    def call(model, method, *params, **kw):
+        return models.execute_kw(args.db, uid, args.admin_password, model, method, list(params), kw)
+
+    group = call('ir.model.data', 'search_read', [('module', '=', 'easy_apps'), ('name', '=', 'easy_apps_group')],
+                 fields=['res_id'])
+    group_ids = [(4, group[0]['res_id'])] if group else []
+
+    logins = [f'bench_user_{n}@example.com' for n in range(args.users)]
+    existing = {user['login']: user['id'] for user in
+                call('res.users', 'search_read', [('login', 'in', logins)], fields=['login'])}
+    missing = [login for login in logins if login not in existing]
+    if missing:
+        new_ids = call('res.users', 'create', [
+            {'name': login.split('@')[0], 'login': login, 'password': args.user_password, 'groups_id': group_ids}
+            for login in missing
+        ])
+        existing.update(zip(missing, new_ids))
+    return [existing[login] for login in logins], call
+
+
+def seed_user_catalogs(cr, user_ids):
+    """
+    Insert each user's custom categories and expenses.
+    :return: {user_id: [(category_id, expense_id, category_name, expense_name)]}
+    """
+    catalogs = {}
+    for user_id in user_ids:
+        cr.execute("SELECT id FROM easy_expenses_user_category WHERE user_id = %s", [user_id])
+        if not cr.fetchall():
+            for name in USER_CATEGORIES:
+                cr.execute("""
+                    INSERT INTO easy_expenses_user_category (name, user_id, create_uid, create_date, write_uid, write_date)
+                    VALUES (%s, %s, 1, now() at time zone 'UTC', 1, now() at time zone 'UTC') RETURNING id
+                """, [name, user_id])
+                category_id = cr.fetchone()[0]
+                for n in range(USER_EXPENSES_PER_CATEGORY):
+                    cr.execute("""
+                        INSERT INTO easy_expenses_user_expense (name, category_id, user_id, create_uid, create_date, write_uid, write_date)
+                        VALUES (%s, %s, %s, 1, now() at time zone 'UTC', 1, now() at time zone 'UTC')
+                    """, [f'{name} expense {n}', category_id, user_id])
+        cr.execute("""
+            SELECT e.category_id, e.id, c.name, e.name
+              FROM easy_expenses_user_expense e
+              JOIN easy_expenses_user_category c ON c.id = e.category_id
+             WHERE e.user_id = %s
+        """, [user_id])
+        catalogs[user_id] = cr.fetchall()
+    return catalogs
+
+
+def generate_rows(count, user_ids, global_expenses, user_catalogs, days, rng):
+    """Yield tab-separated COPY lines for easy_expenses_record"""
+    # Naive UTC, as Odoo stores datetimes
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0, tzinfo=None)
+    stamp = now.isoformat(sep=' ')
+    for _ in range(count):
+        user_id = rng.choice(user_ids)
+        date = (now - datetime.timedelta(seconds=rng.randrange(days * 86400))).isoformat(sep=' ')
+        amount = round(rng.lognormvariate(3, 1), 2) or 0.01
+        if rng.random() < 0.8 or not user_catalogs[user_id]:
+            category_id, expense_id, category_name, expense_name = rng.choice(global_expenses)
+            values = ('global', category_id, expense_id, r'\N', r'\N', f'g:{category_id}', f'g:{expense_id}')
+        else:
+            category_id, expense_id, category_name, expense_name = rng.choice(user_catalogs[user_id])
+            values = ('user', r'\N', r'\N', category_id, expense_id, f'u:{category_id}', f'u:{expense_id}')
+        names = (_copy_text(category_name), _copy_text(expense_name))
+        yield '\t'.join(map(str, (user_id, *values, *names, amount, date, r'\N', 1, stamp, 1, stamp))) + '\n'
+
+
+def _copy_text(value):
+    """Escape a text value for the COPY text format"""
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_records(cr, rows, total):
+    """COPY the generated rows in batches, reporting progress"""
+    columns = ('user_id', 'category_type', 'category_id', 'expense_id', 'user_category_id', 'user_expense_id',
+               'category_key', 'expense_key', 'category_name', 'expense_name', 'amount', 'date', 'note',
+               'create_uid', 'create_date', 'write_uid', 'write_date')
+    done = 0
+    start = time.monotonic()
+    while done < total:
+        buffer = io.StringIO()
+        batch = 0
+        for line in rows:
+            buffer.write(line)
+            batch += 1
+            if batch >= COPY_BATCH:
+                break
+        if not batch:
+            break
+        buffer.seek(0)
+        cr.copy_expert(f"COPY easy_expenses_record ({', '.join(columns)}) FROM STDIN", buffer)
+        done += batch
+        elapsed = time.monotonic() - start
+        print(f"  {done:,}/{total:,} records ({done / elapsed:,.0f}/s)", file=sys.stderr)
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"Creating {args.users} users", file=sys.stderr)
+    user_ids, call = ensure_users(args)
+
+    with psycopg2.connect(args.dsn) as cnx, cnx.cursor() as cr:
+        cr.execute("""
+            SELECT e.category_id, e.id, c.name, e.name
+              FROM easy_expenses_expense e
+              JOIN easy_expenses_category c ON c.id = e.category_id
+        """)
+        global_expenses = cr.fetchall()
+        user_catalogs = seed_user_catalogs(cr, user_ids)
+
+        print(f"Loading {args.records:,} records with COPY", file=sys.stderr)
+        start = time.monotonic()
+        copy_records(cr, generate_rows(args.records, user_ids, global_expenses, user_catalogs, args.days, rng),
+                     args.records)
+        cr.execute("ANALYZE easy_expenses_record")
+        print(f"Loaded in {time.monotonic() - start:.1f}s", file=sys.stderr)
+
+    # COPY bypasses the ORM: recompute the monthly rollups and the budget counters once
+    call('easy_expenses.record_rollup', 'action_rebuild')
+    print("Rollups rebuilt", file=sys.stderr)
+    call('easy_expenses.budget', 'action_recompute_spent')
+    print("Budget counters recomputed", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
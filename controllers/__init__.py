@@ -2,3 +2,15 @@
 
 from . import auth
 from . import categories
+from . import expenses
+from . import records
+from . import reports
+from . import user_categories
+from . import user_expenses
+from . import batch
+from . import sync
+from . import export
+from . import statement_import
+from . import metrics
+from . import budgets
+from . import insights
@@ -1,19 +1,127 @@
 import json
-from odoo.http import Response
+import zlib
+import base64
+import datetime
+from decimal import Decimal
+from odoo import fields
+from odoo.http import Response, request
+from ._instrumentation import _phase, _record_rows
 
-def _http_success_response(data, message="Request successful", status=200):
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAM_CHUNK_SIZE = 500
+
+
+def _json_default(value):
+    """Encode the non-JSON types found in ORM reads (datetime, date, Decimal)"""
+    if isinstance(value, datetime.datetime):
+        return fields.Datetime.to_string(value)
+    if isinstance(value, datetime.date):
+        return fields.Date.to_string(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_dumps(data):
+    """
+    Serialize data to JSON bytes, with orjson when it is installed.
+    Datetimes use the Odoo server format ("YYYY-MM-DD HH:MM:SS") with either encoder.
+    :param data: Data to encode.
+    :return: UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_json_default, separators=(',', ':')).encode()
+
+
+def _http_success_response(data, message="Request successful", status=200, extra=None, headers=None):
     """
     Generate a standardized HTTP success response.
     :param data: The actual response data.
     :param message: A success message.
     :param status: HTTP status code (default 200).
+    :param extra: Optional dict of additional envelope keys (e.g. next_cursor).
+    :param headers: Optional dict of additional HTTP headers (e.g. ETag).
     :return: HTTP JSON response.
     """
-    return Response(json.dumps({
+    body = {
         'status': 'success',
         'message': message,
         'data': data
-    }), content_type="application/json", status=status)
+    }
+    if extra:
+        body.update(extra)
+    _record_rows(data)
+    with _phase('encode'):
+        payload = _json_dumps(body)
+    return Response(payload, content_type="application/json", status=status, headers=headers)
+
+
+def _http_stream_response(rows, message="Request successful", status=200, extra=None, headers=None):
+    """
+    Generate a standardized HTTP success response whose data array is streamed.
+    Rows are encoded and sent in chunks, so memory does not grow with the result size.
+    The iterable is consumed after the controller returns: it must not use the
+    request environment and should open its own cursor if it reads the database.
+    :param rows: Iterable of JSON-serializable rows.
+    :param message: A success message.
+    :param status: HTTP status code (default 200).
+    :param extra: Optional dict of additional envelope keys.
+    :param headers: Optional dict of additional HTTP headers.
+    :return: Streamed HTTP JSON response.
+    """
+    head = {'status': 'success', 'message': message}
+    if extra:
+        head.update(extra)
+
+    def generate():
+        yield _json_dumps(head)[:-1] + b',"data":['
+        chunk = []
+        first = True
+        for row in rows:
+            chunk.append(_json_dumps(row))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield (b'' if first else b',') + b','.join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield (b'' if first else b',') + b','.join(chunk)
+        yield b']}'
+
+    return Response(generate(), content_type="application/json", status=status, headers=headers,
+                    direct_passthrough=True)
+
+
+def _catalog_etag(version, user_id=None, output_fields=None):
+    """
+    Build the weak ETag of a catalog version.
+    :param version: Catalog version counter.
+    :param user_id: Owner of a per-user catalog (None for the global catalog).
+    :param output_fields: Projection of the response (see _requested_fields), so a
+        body of another shape is never revalidated.
+    :return: ETag header value.
+    """
+    scope = f"u{user_id}" if user_id else "g"
+    if output_fields:
+        return f'W/"{scope}-{version}-{zlib.crc32(",".join(output_fields).encode()):08x}"'
+    return f'W/"{scope}-{version}"'
+
+
+def _http_not_modified_response(etag):
+    """
+    Return a 304 response when the request's If-None-Match matches the ETag.
+    :param etag: Current ETag of the resource.
+    :return: HTTP 304 response, or None if the client copy is stale.
+    """
+    if_none_match = request.httprequest.headers.get('If-None-Match', '')
+    if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+        return Response(status=304, headers={'ETag': etag})
+    return None
 
 
 def _http_error_response(error_message, status=400):
@@ -23,7 +131,7 @@ def _http_error_response(error_message, status=400):
     :param status: The HTTP status code (default is 400).
     :return: HTTP JSON response.
     """
-    return Response(json.dumps({
+    return Response(_json_dumps({
         'status': 'error',
         'message': error_message
     }), content_type="application/json", status=status)
@@ -55,3 +163,42 @@ def _error_response(error_message, status=400):
         'message': error_message,
         'code': status
     }
+
+
+def _encode_cursor(values):
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    :param values: List of JSON-serializable sort key values.
+    :return: URL-safe cursor string.
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """
+    Decode a cursor produced by _encode_cursor.
+    :param cursor: URL-safe cursor string.
+    :return: List of sort key values.
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _split_category_key(key):
+    """
+    Split a unified category/expense key of an expense record.
+    :param key: "g:<id>" (global) or "u:<id>" (user), or a falsy value.
+    :return: (category_type, id), or (None, None) for an empty key.
+    """
+    if not key:
+        return None, None
+    prefix, _sep, record_id = key.partition(':')
+    return ('user' if prefix == 'u' else 'global'), int(record_id)
@@ -0,0 +1,125 @@
+import json
+import time
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from odoo.http import request, Response
+from odoo.exceptions import AccessDenied
+from odoo.tools import config
+from ._metrics import _observe
+from ._profiling import _start_capture
+
+_logger = logging.getLogger(__name__)
+
+# Server options (odoo.conf / command line):
+#   easy_expenses_instrumentation = True   enable per-request timing and the Server-Timing header
+#   easy_expenses_slow_request_ms = 500    log requests slower than this (0 disables the log)
+#   easy_expenses_metrics = True           per-route counters for /api/easy_apps/metrics (default off)
+#   easy_expenses_metrics_token = <secret> bearer token required by the metrics route
+#   easy_expenses_metrics_allow = 10.0.0.5 or, without a token, comma-separated scraper addresses
+#   easy_expenses_profiling = True         honour the admin's profiling requests (default off)
+INSTRUMENTATION_ENABLED = str(config.get('easy_expenses_instrumentation', '')).lower() in ('1', 'true', 'yes')
+METRICS_ENABLED = str(config.get('easy_expenses_metrics', '')).lower() in ('1', 'true', 'yes')
+PROFILING_ENABLED = str(config.get('easy_expenses_profiling', '')).lower() in ('1', 'true', 'yes')
+SLOW_REQUEST_MS = float(config.get('easy_expenses_slow_request_ms', 500) or 0)
+
+
+@contextmanager
+def _phase(name):
+    """
+    Time a phase of the current request (auth, orm, encode, ...).
+    Phases of the same name add up. Does nothing when instrumentation is off.
+    """
+    timings = getattr(request, '_easy_apps_timings', None) if INSTRUMENTATION_ENABLED else None
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _record_rows(data):
+    """Remember how many rows a response returns, for the metrics route"""
+    if METRICS_ENABLED and isinstance(data, list):
+        request._easy_apps_rows = len(data)
+
+
+def _instrumented(endpoint):
+    """
+    Wrap a route to feed the per-worker metrics (status, latency, rows, bytes)
+    and, when instrumentation is on, to measure wall time per phase and the SQL
+    queries it ran, add a Server-Timing header and log slow requests.
+    Requests matching an admin profiling request are also profiled.
+    When all three are disabled the route is returned unwrapped.
+    """
+    if not INSTRUMENTATION_ENABLED and not METRICS_ENABLED and not PROFILING_ENABLED:
+        return endpoint
+
+    route_name = f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+
+    @functools.wraps(endpoint)
+    def wrapper(self, *args, **kwargs):
+        if getattr(request, '_easy_apps_measuring', False):
+            # Nested call (batch sub-request): the outer route is already measuring
+            return endpoint(self, *args, **kwargs)
+
+        thread = threading.current_thread()
+        query_count = getattr(thread, 'query_count', 0)
+        query_time = getattr(thread, 'query_time', 0.0)
+        request._easy_apps_measuring = True
+        request._easy_apps_timings = timings = {} if INSTRUMENTATION_ENABLED else None
+        capture = _start_capture(route_name) if PROFILING_ENABLED else None
+        start = time.perf_counter()
+        result = None
+        status = 500
+        try:
+            result = endpoint(self, *args, **kwargs)
+            status = result.status_code if isinstance(result, Response) else 200
+            return result
+        except AccessDenied:
+            status = 401
+            raise
+        finally:
+            total_ms = (time.perf_counter() - start) * 1000
+            request._easy_apps_measuring = False
+            request._easy_apps_timings = None
+
+            if capture:
+                capture.stop(status, total_ms)
+
+            if METRICS_ENABLED:
+                size = result.calculate_content_length() if isinstance(result, Response) else None
+                _observe(route_name, status, total_ms, getattr(request, '_easy_apps_rows', 0), size or 0)
+
+            if INSTRUMENTATION_ENABLED:
+                _report(result, status, total_ms, timings,
+                        getattr(thread, 'query_count', 0) - query_count,
+                        (getattr(thread, 'query_time', 0.0) - query_time) * 1000)
+
+    return wrapper
+
+
+def _report(result, status, total_ms, timings, sql_count, sql_ms):
+    """Send the Server-Timing header and log the request if it was slow"""
+    server_timing = [f'{name};dur={duration:.1f}' for name, duration in timings.items()]
+    server_timing.append(f'sql;dur={sql_ms:.1f};desc="{sql_count} queries"')
+    server_timing.append(f'total;dur={total_ms:.1f}')
+    target = result if isinstance(result, Response) else getattr(request, 'future_response', None)
+    if target is not None:
+        target.headers['Server-Timing'] = ', '.join(server_timing)
+
+    if SLOW_REQUEST_MS and total_ms >= SLOW_REQUEST_MS:
+        _logger.warning("easy_apps slow request %s", json.dumps({
+            'route': request.httprequest.path,
+            'method': request.httprequest.method,
+            'status': status,
+            'user_id': (getattr(request, '_easy_apps_token_payload', None) or {}).get('user_id'),
+            'total_ms': round(total_ms, 1),
+            'sql_count': sql_count,
+            'sql_ms': round(sql_ms, 1),
+            'phases': {name: round(duration, 1) for name, duration in timings.items()},
+        }))
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import logging
+import threading
+from odoo.tools import config
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_logger = logging.getLogger(__name__)
+
+# Latency histogram upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+FLUSH_INTERVAL = 5.0
+# Counters of exited workers, folded in by the scrapes so the totals never decrease
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = '.lock'
+
+# Each thread only ever writes its own counters, so recording takes no lock;
+# _all_stats lets the scrape merge every thread of this worker process.
+_local = threading.local()
+_all_stats = []
+_next_flush = [0.0]
+_own_file = {}        # pid -> snapshot file name, recomputed after a fork
+
+
+class _WorkerStats:
+    """Counters of one thread"""
+
+    def __init__(self):
+        self.requests = {}    # (route, status) -> count
+        self.latency = {}     # route -> [bucket counts..., +Inf count, sum_ms]
+        self.rows = {}        # route -> rows returned
+        self.bytes = {}       # route -> response bytes
+
+    def observe(self, route, status, duration_ms, rows, size):
+        key = (route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get(route)
+        if histogram is None:
+            histogram = self.latency[route] = [0] * (len(LATENCY_BUCKETS_MS) + 1) + [0.0]
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                histogram[index] += 1
+                break
+        else:
+            histogram[len(LATENCY_BUCKETS_MS)] += 1
+        histogram[-1] += duration_ms
+        if rows:
+            self.rows[route] = self.rows.get(route, 0) + rows
+        if size:
+            self.bytes[route] = self.bytes.get(route, 0) + size
+
+
+def _metrics_dir():
+    return os.path.join(config['data_dir'], 'easy_expenses_metrics')
+
+
+def _process_start(pid):
+    """
+    Start time of a process, from /proc (clock ticks since boot), so a recycled
+    pid is told apart from the worker that published a snapshot.
+    :return: Start time as a string, '0' where /proc is unavailable, None if the process is gone.
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as handle:
+            # Field 22; the command name (field 2) may contain spaces, so split after it
+            return handle.read().rsplit(')', 1)[1].split()[19]
+    except FileNotFoundError:
+        if os.path.isdir('/proc/self'):
+            return None
+    except (OSError, IndexError):
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except OSError:
+        pass
+    return '0'
+
+
+def _snapshot_file():
+    """Name of this process's snapshot file: <pid>-<start time>.json"""
+    pid = os.getpid()
+    if pid not in _own_file:
+        _own_file.clear()
+        _own_file[pid] = f'{pid}-{_process_start(pid) or 0}.json'
+    return _own_file[pid]
+
+
+def _is_live_snapshot(filename):
+    """Whether a snapshot file belongs to a running process (legacy <pid>.json files never do)"""
+    pid, _sep, start = filename[:-len('.json')].partition('-')
+    if not pid.isdigit() or not start:
+        return False
+    return _process_start(int(pid)) == start
+
+
+def _observe(route, status, duration_ms, rows=0, size=0):
+    """Record one request in the calling thread's counters"""
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        stats = _local.stats = _WorkerStats()
+        _all_stats.append(stats)
+    stats.observe(route, status, duration_ms, rows, size)
+
+    now = time.monotonic()
+    if now >= _next_flush[0]:
+        _next_flush[0] = now + FLUSH_INTERVAL
+        _flush()
+
+
+def _snapshot():
+    """Merge the counters of every thread of this process into a JSON-friendly dict"""
+    snapshot = _empty_total()
+    for stats in list(_all_stats):
+        for (route, status), count in list(stats.requests.items()):
+            key = f'{route}|{status}'
+            snapshot['requests'][key] = snapshot['requests'].get(key, 0) + count
+        for route, histogram in list(stats.latency.items()):
+            merged = snapshot['latency'].setdefault(route, [0] * len(histogram))
+            snapshot['latency'][route] = [a + b for a, b in zip(merged, histogram)]
+        for name in ('rows', 'bytes'):
+            for route, value in list(getattr(stats, name).items()):
+                snapshot[name][route] = snapshot[name].get(route, 0) + value
+    return snapshot
+
+
+def _flush():
+    """Publish this worker's snapshot for the other workers' scrapes (atomic rename)"""
+    try:
+        directory = _metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, _snapshot_file())
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as handle:
+            json.dump(_snapshot(), handle)
+        os.replace(tmp_path, path)
+    except OSError:
+        _logger.warning("Could not write easy_apps metrics snapshot", exc_info=True)
+
+
+def _merge(total, snapshot):
+    for key, count in snapshot['requests'].items():
+        total['requests'][key] = total['requests'].get(key, 0) + count
+    for route, histogram in snapshot['latency'].items():
+        merged = total['latency'].get(route, [0] * len(histogram))
+        total['latency'][route] = [a + b for a, b in zip(merged, histogram)]
+    for name in ('rows', 'bytes'):
+        for route, value in snapshot[name].items():
+            total[name][route] = total[name].get(route, 0) + value
+
+
+def _empty_total():
+    return {'requests': {}, 'latency': {}, 'rows': {}, 'bytes': {}}
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot(path, snapshot):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as handle:
+        json.dump(snapshot, handle)
+    os.replace(tmp_path, path)
+
+
+def _collect():
+    """
+    Merge this worker's live counters with the snapshots published by the others.
+    Snapshots of exited workers are folded into RETIRED_FILE and removed, under a
+    lock shared by the scrapes, so the merged counters never decrease and the
+    directory does not grow with every worker ever started.
+    """
+    total = _empty_total()
+    _merge(total, _snapshot())
+    directory = _metrics_dir()
+    if not os.path.isdir(directory):
+        return total
+
+    own_file = _snapshot_file()
+    try:
+        with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(directory, RETIRED_FILE)
+            retired = _read_snapshot(retired_path) or _empty_total()
+            dead = []
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename in (own_file, RETIRED_FILE):
+                    continue
+                path = os.path.join(directory, filename)
+                snapshot = _read_snapshot(path)
+                if _is_live_snapshot(filename):
+                    if snapshot:
+                        _merge(total, snapshot)
+                    continue
+                if snapshot:
+                    _merge(retired, snapshot)
+                dead.append(path)
+            if dead:
+                _write_snapshot(retired_path, retired)
+                for path in dead:
+                    os.remove(path)
+            _merge(total, retired)
+    except OSError:
+        _logger.warning("Could not read easy_apps metrics snapshots", exc_info=True)
+    return total
+
+
+def _render_prometheus(total):
+    """Render merged counters in the Prometheus text exposition format"""
+    lines = [
+        '# HELP easy_apps_requests_total API requests by route and HTTP status.',
+        '# TYPE easy_apps_requests_total counter',
+    ]
+    for key, count in sorted(total['requests'].items()):
+        route, status = key.rsplit('|', 1)
+        lines.append(f'easy_apps_requests_total{{route="{route}",status="{status}"}} {count}')
+
+    lines += [
+        '# HELP easy_apps_request_duration_seconds API request latency.',
+        '# TYPE easy_apps_request_duration_seconds histogram',
+    ]
+    for route, histogram in sorted(total['latency'].items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, histogram):
+            cumulative += count
+            lines.append(f'easy_apps_request_duration_seconds_bucket{{route="{route}",le="{bound / 1000:g}"}} {cumulative}')
+        cumulative += histogram[len(LATENCY_BUCKETS_MS)]
+        lines.append(f'easy_apps_request_duration_seconds_bucket{{route="{route}",le="+Inf"}} {cumulative}')
+        lines.append(f'easy_apps_request_duration_seconds_sum{{route="{route}"}} {histogram[-1] / 1000:.6f}')
+        lines.append(f'easy_apps_request_duration_seconds_count{{route="{route}"}} {cumulative}')
+
+    for name, help_text in (('rows', 'Rows returned in response data.'), ('bytes', 'Response payload bytes.')):
+        lines += [
+            f'# HELP easy_apps_response_{name}_total {help_text}',
+            f'# TYPE easy_apps_response_{name}_total counter',
+        ]
+        for route, value in sorted(total[name].items()):
+            lines.append(f'easy_apps_response_{name}_total{{route="{route}"}} {value}')
+    return '\n'.join(lines) + '\n'
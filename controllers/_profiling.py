@@ -0,0 +1,98 @@
+import io
+import time
+import pstats
+import logging
+import marshal
+import cProfile
+import threading
+from odoo import api, SUPERUSER_ID
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+
+_logger = logging.getLogger(__name__)
+
+PROFILE_TOP_FUNCTIONS = 60
+
+
+def _start_capture(route_name):
+    """
+    Start profiling the current request if an active profiling request matches
+    its route and user, and one of its captures can still be claimed.
+    :return: A started _Capture, or None.
+    """
+    if not request.db:
+        return None
+    try:
+        rules = request.env['easy_expenses.profiling_request'].sudo()._get_active_rules()
+        if not rules:
+            return None
+        user_id = None
+        if any(rule_user_id for _rule_id, rule_user_id, _route in rules):
+            # Imported here: auth imports the instrumentation, which imports this module
+            from .auth import JWTAuth
+            try:
+                user_id = JWTAuth.authenticate_request().get('user_id')
+            except AccessDenied:
+                pass
+        for rule_id, rule_user_id, rule_route in rules:
+            if (rule_route and rule_route != route_name) or (rule_user_id and rule_user_id != user_id):
+                continue
+            # Claimed on its own committed cursor, so N captures hold across workers
+            with request.env.registry.cursor() as cr:
+                if api.Environment(cr, SUPERUSER_ID, {})['easy_expenses.profiling_request']._claim(rule_id):
+                    return _Capture(rule_id, route_name, user_id)
+    except Exception:
+        _logger.warning("Could not start easy_apps request profiling", exc_info=True)
+    return None
+
+
+class _Capture:
+    """cProfile and SQL statements of one request"""
+
+    def __init__(self, rule_id, route_name, user_id):
+        self.rule_id = rule_id
+        self.route_name = route_name
+        self.user_id = user_id
+        self.queries = []
+        self.thread = threading.current_thread()
+        if getattr(self.thread, 'query_hooks', None) is None:
+            self.thread.query_hooks = []
+        self.thread.query_hooks.append(self._query_hook)
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def _query_hook(self, cr, query, params, query_start, query_time):
+        self.queries.append((query_time * 1000, cr._format(query, params)))
+
+    def stop(self, status, total_ms):
+        """Stop profiling and store the profile and SQL report as attachments"""
+        self.profile.disable()
+        try:
+            self.thread.query_hooks.remove(self._query_hook)
+        except ValueError:
+            pass
+        try:
+            self.profile.create_stats()
+            with request.env.registry.cursor() as cr:
+                api.Environment(cr, SUPERUSER_ID, {})['easy_expenses.profiling_request'].browse(
+                    self.rule_id)._store_capture(
+                    f"{self.route_name}-{time.strftime('%Y%m%d-%H%M%S')}",
+                    marshal.dumps(self.profile.stats),
+                    self._report(status, total_ms),
+                )
+        except Exception:
+            _logger.warning("Could not store easy_apps request profile", exc_info=True)
+
+    def _report(self, status, total_ms):
+        """Plain text report: request summary, hottest functions, then every SQL statement"""
+        output = io.StringIO()
+        sql_ms = sum(duration for duration, _query in self.queries)
+        output.write(f"{request.httprequest.method} {request.httprequest.full_path}\n"
+                     f"route: {self.route_name}\nuser_id: {self.user_id}\nstatus: {status}\n"
+                     f"total: {total_ms:.1f} ms\nsql: {len(self.queries)} queries, {sql_ms:.1f} ms\n\n")
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        output.write("\nSQL statements (ms, in execution order)\n\n")
+        for duration, query in self.queries:
+            output.write(f"{duration:9.2f}  {query}\n")
+        return output.getvalue()
@@ -0,0 +1,98 @@
+# Projection-based serialization of API resources: rows are fetched with one
+# read()/search_read() of the requested columns, many2one values come back as ids
+# and *_name fields are filled from one batched display name lookup per model.
+
+from ._instrumentation import _phase
+
+RECORD_FIELDS = ['id', 'date', 'amount', 'note', 'category_type',
+                 'category_id', 'user_category_id', 'expense_id', 'user_expense_id',
+                 'category_key', 'expense_key', 'category_name', 'expense_name']
+
+CATEGORY_FIELDS = ['id', 'name', 'description']
+
+EXPENSE_FIELDS = ['id', 'name', 'category_id', 'category_name']
+
+# Output fields carrying the display name of a many2one field
+EXPENSE_NAMES = {'category_name': 'category_id'}
+
+
+def _requested_fields(kwargs, available):
+    """
+    Resolve the sparse fieldset asked for with the `fields` query parameter.
+    :param kwargs: Request parameters.
+    :param available: Fields the resource exposes, in output order.
+    :return: List of output fields ('id' is always included).
+    :raises ValueError: If an unknown field is requested.
+    """
+    value = kwargs.get('fields')
+    if not value:
+        return list(available)
+    wanted = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = wanted - set(available)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in available if name == 'id' or name in wanted]
+
+
+def _projection(output_fields, names):
+    """Model fields to read and whether display names are needed"""
+    read_fields = set()
+    for name in output_fields:
+        if name == 'id':
+            continue
+        read_fields.add(names.get(name, name))
+    load = '_classic_read' if any(name in names for name in output_fields) else None
+    # An empty list would make read() fetch every field
+    return list(read_fields) or ['id'], load
+
+
+def _to_dicts(model, rows, output_fields, names):
+    """Shape raw read() rows into API dicts"""
+    result = []
+    for row in rows:
+        item = {}
+        for name in output_fields:
+            if name in names:
+                value = row[names[name]]
+                item[name] = value[1] if value else None
+                continue
+            value = row[name]
+            if name != 'id' and model._fields[name].type == 'many2one':
+                value = (value[0] if isinstance(value, tuple) else value) or None
+            item[name] = value
+        result.append(item)
+    return result
+
+
+def _read(records, output_fields, names=None):
+    """
+    Serialize a recordset with one read() of the requested columns.
+    :param records: Recordset to serialize (order is preserved).
+    :param output_fields: Output fields, see _requested_fields().
+    :param names: Dict of output field -> many2one field whose display name it holds.
+    :return: List of dicts.
+    """
+    names = names or {}
+    read_fields, load = _projection(output_fields, names)
+    with _phase('orm'):
+        rows = records.read(read_fields, load=load)
+    with _phase('serialize'):
+        return _to_dicts(records, rows, output_fields, names)
+
+
+def _search_read(model, domain, output_fields, names=None, **search_kwargs):
+    """
+    Search and serialize in a single search_read() of the requested columns.
+    :param model: Model to search.
+    :param domain: Search domain.
+    :param output_fields: Output fields, see _requested_fields().
+    :param names: Dict of output field -> many2one field whose display name it holds.
+    :param search_kwargs: order, limit, offset passed to search_read().
+    :return: List of dicts.
+    """
+    names = names or {}
+    read_fields, load = _projection(output_fields, names)
+    with _phase('orm'):
+        rows = model.search_read(domain, read_fields, load=load, **search_kwargs)
+    with _phase('serialize'):
+        return _to_dicts(model, rows, output_fields, names)
@@ -4,16 +4,21 @@ import logging
 from odoo import http
 from odoo.http import request, Response
 from odoo.exceptions import AccessDenied
+from ..jwt_cache import _get_secret_key, _decode_token
+from ._instrumentation import _instrumented, _phase
 
 # _logger = logging.getLogger(__name__)
 
+ACCESS_TOKEN_LIFETIME = datetime.timedelta(minutes=30)
+
+
 class JWTAuth:
     """Middleware for handling JWT authentication"""
 
     @staticmethod
     def get_secret_key():
-        """Fetch secret key from Odoo system parameters"""
-        return request.env['ir.config_parameter'].sudo().get_param('easy_apps_secret_key', 'default_secret')
+        """Fetch secret key from Odoo system parameters (cached per worker, see jwt_cache)"""
+        return _get_secret_key(request.env)
 
     @staticmethod
     def generate_token(user):
@@ -21,23 +26,22 @@ class JWTAuth:
         payload = {
             'user_id': user.id,
             'login': user.login,
-            'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=7)
+            'exp': datetime.datetime.now(datetime.timezone.utc) + ACCESS_TOKEN_LIFETIME
         }
         return jwt.encode(payload, JWTAuth.get_secret_key(), algorithm='HS256')
 
     @staticmethod
     def decode_token(token):
-        """Decode JWT token"""
-        try:
-            return jwt.decode(token, JWTAuth.get_secret_key(), algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
+        """Decode JWT token, skipping signature verification for recently verified tokens"""
+        return _decode_token(request.env, token)
 
     @staticmethod
     def authenticate_request():
-        """Middleware to verify JWT token in protected endpoints"""
+        """Middleware to verify JWT token in protected endpoints (once per HTTP request)"""
+        authenticated = getattr(request, '_easy_apps_token_payload', None)
+        if authenticated:
+            return authenticated
+
         token = request.httprequest.headers.get('Authorization')
 
         if not token:
@@ -47,16 +51,20 @@ class JWTAuth:
             raise AccessDenied("Invalid Token Format. Use 'Bearer <token>'")
 
         token = token.split(' ')[1]  # Extract actual token
-        decoded_token = JWTAuth.decode_token(token)
+        with _phase('auth'):
+            decoded_token = JWTAuth.decode_token(token)
 
         if not decoded_token:
             raise AccessDenied("Invalid or expired token")
 
+        # Sub-requests of a batch reuse the verified payload
+        request._easy_apps_token_payload = decoded_token
         return decoded_token
 
 
 class JWTAuthController(http.Controller):
     @http.route('/api/easy_apps/expenses/auth', type='json', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
     def login(self, **kwargs):
         """
         Authenticate user and return JWT token.
@@ -73,8 +81,47 @@ class JWTAuthController(http.Controller):
         if not user or not user._check_password(password) or not user.has_group('easy_apps.easy_apps_group'):
             raise AccessDenied("Invalid credentials")
 
-        # Generate JWT token
-        token = JWTAuth.generate_token(user)
+        return JWTAuthController._token_response(user)
+
+    @http.route('/api/easy_apps/expenses/auth/refresh', type='json', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
+    def refresh(self, **kwargs):
+        """
+        Exchange a refresh token for a new access token and a new refresh token.
+        The presented refresh token is consumed (rotation).
+        """
+        refresh_token = kwargs.get('refresh_token')
+        if not refresh_token:
+            raise AccessDenied("Missing refresh token")
+
+        user, new_refresh_token = request.env['easy_expenses.refresh_token'].sudo()._rotate(refresh_token)
+        if not user.has_group('easy_apps.easy_apps_group'):
+            raise AccessDenied("Invalid credentials")
 
-        return {'token': token, 'user_id': user.id, 'login': user.login}
+        return JWTAuthController._token_response(user, new_refresh_token)
+
+    @http.route('/api/easy_apps/expenses/auth/logout', type='json', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
+    def logout(self, **kwargs):
+        """Revoke a refresh token"""
+        refresh_token = kwargs.get('refresh_token')
+        if not refresh_token:
+            raise AccessDenied("Missing refresh token")
+
+        request.env['easy_expenses.refresh_token'].sudo()._revoke(refresh_token)
+        return {'revoked': True}
+
+    @staticmethod
+    def _token_response(user, refresh_token=None):
+        """Issue a short-lived access JWT, plus a refresh token unless one is given"""
+        if refresh_token is None:
+            refresh_token = request.env['easy_expenses.refresh_token'].sudo()._issue(user)
+
+        return {
+            'token': JWTAuth.generate_token(user),
+            'expires_in': int(ACCESS_TOKEN_LIFETIME.total_seconds()),
+            'refresh_token': refresh_token,
+            'user_id': user.id,
+            'login': user.login,
+        }
 
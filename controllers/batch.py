@@ -0,0 +1,138 @@
+import json
+from contextlib import contextmanager
+from werkzeug.exceptions import NotFound, MethodNotAllowed
+from werkzeug.routing import Map, Rule
+from odoo import http
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .auth import JWTAuth
+from ._helpers import _http_success_response, _http_error_response, _error_response
+from ._instrumentation import _instrumented
+
+MAX_BATCH_REQUESTS = 20
+
+# Headers of the batch request that must not reach the sub-requests: they were
+# meant for the batch itself, and a 304 would leave a sub-response without a body
+CONDITIONAL_HEADER_KEYS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+                           'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_IF_RANGE')
+
+# Routes that can run inside a batch: plain HTTP routes that take their input
+# from query/form parameters (JSON-RPC routes and routes reading the raw body are excluded).
+# This map only whitelists them; the endpoints are resolved through the registry's
+# routing map, so overrides of these routes by inheriting addons apply inside a batch.
+BATCH_ROUTES = Map([
+    Rule('/api/easy_apps/categories', methods=['GET']),
+    Rule('/api/easy_apps/expenses', methods=['GET']),
+    Rule('/api/easy_apps/expenses/<int:category_id>', methods=['GET']),
+    Rule('/api/easy_apps/user_categories/get', methods=['GET']),
+    Rule('/api/easy_apps/user_expenses/category', methods=['GET']),
+    Rule('/api/easy_apps/user_expenses/category/<int:category_id>', methods=['GET']),
+    Rule('/api/easy_apps/records/get', methods=['GET']),
+    Rule('/api/easy_apps/records/summary', methods=['GET']),
+    Rule('/api/easy_apps/budgets/status', methods=['GET']),
+    Rule('/api/easy_apps/records/insights', methods=['GET']),
+    Rule('/api/easy_apps/records/<int:record_id>', methods=['GET']),
+    Rule('/api/easy_apps/records/create', methods=['POST']),
+    Rule('/api/easy_apps/records/update/<int:record_id>', methods=['PUT']),
+    Rule('/api/easy_apps/records/delete/<int:record_id>', methods=['DELETE']),
+])
+
+
+class BatchAPI(http.Controller):
+
+    ## 🔹 [POST] Run Several API Calls in One Round Trip
+    @http.route('/api/easy_apps/batch', type='http', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
+    def batch(self, **kwargs):
+        """
+        Execute a list of sub-requests with a single authentication (JWT required).
+        JSON body: [{"path": "/api/easy_apps/...", "method": "GET", "params": {...}}, ...]
+        Returns the sub-responses in order as {"path", "status", "body"}, where body
+        is the usual success or error envelope. Each sub-request runs in its own
+        savepoint, so a failing call (5xx or exception) is rolled back and reported
+        as its own item without undoing the others. Conditional headers of the
+        batch request (If-None-Match...) are not applied to the sub-requests.
+        """
+        try:
+            JWTAuth.authenticate_request()
+
+            try:
+                sub_requests = json.loads(request.httprequest.get_data() or b'null')
+            except ValueError:
+                return _http_error_response("Invalid JSON body", 400)
+            if not isinstance(sub_requests, list) or not sub_requests:
+                return _http_error_response("Expected a non-empty JSON array of requests", 400)
+            if len(sub_requests) > MAX_BATCH_REQUESTS:
+                return _http_error_response(f"A batch may contain at most {MAX_BATCH_REQUESTS} requests", 400)
+
+            host = request.httprequest.host
+            adapters = (BATCH_ROUTES.bind(host), request.env['ir.http'].routing_map().bind(host))
+            results = []
+            with _without_conditional_headers():
+                for sub_request in sub_requests:
+                    if not isinstance(sub_request, dict) or not isinstance(sub_request.get('path'), str):
+                        results.append({'path': None, 'status': 400, 'body': _error_response("Missing path", 400)})
+                        continue
+                    results.append(self._run_sub_request(adapters, sub_request))
+
+            return _http_success_response(results, "Batch executed successfully")
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error executing batch: {str(e)}", 500)
+
+    @staticmethod
+    def _run_sub_request(adapters, sub_request):
+        """
+        Dispatch one sub-request to its registry endpoint and unwrap its envelope.
+        :param adapters: (whitelist adapter, registry routing map adapter), bound to the request host.
+        """
+        whitelist, routing = adapters
+        path = sub_request['path']
+        method = (sub_request.get('method') or 'GET').upper()
+        params = sub_request.get('params') or {}
+        if not isinstance(params, dict):
+            return {'path': path, 'status': 400, 'body': _error_response("'params' must be an object", 400)}
+
+        try:
+            whitelist.match(path, method=method)
+            endpoint, path_args = routing.match(path, method=method)
+        except NotFound:
+            return {'path': path, 'status': 404, 'body': _error_response("Route not available in batch", 404)}
+        except MethodNotAllowed:
+            return {'path': path, 'status': 405, 'body': _error_response("Method not allowed", 405)}
+
+        try:
+            with request.env.cr.savepoint():
+                # Path arguments win over query parameters of the same name
+                response = endpoint(**{**params, **path_args})
+                if response.status_code >= 500:
+                    raise _SubRequestFailed(response)
+        except _SubRequestFailed as failure:
+            response = failure.response
+        except AccessDenied as e:
+            return {'path': path, 'status': 401, 'body': _error_response(str(e), 401)}
+        except Exception as e:
+            return {'path': path, 'status': 500, 'body': _error_response(f"Error executing request: {str(e)}", 500)}
+
+        data = response.get_data()
+        return {'path': path, 'status': response.status_code, 'body': json.loads(data) if data else None}
+
+
+@contextmanager
+def _without_conditional_headers():
+    """Hide the conditional headers of the current request while its sub-requests run"""
+    environ = request.httprequest.environ
+    removed = {key: environ.pop(key) for key in CONDITIONAL_HEADER_KEYS if key in environ}
+    try:
+        yield
+    finally:
+        environ.update(removed)
+
+
+class _SubRequestFailed(Exception):
+    """Raised inside a sub-request's savepoint to roll back a 5xx response"""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
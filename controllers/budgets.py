@@ -0,0 +1,50 @@
+from odoo import http, fields
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .auth import JWTAuth
+from ._helpers import _http_success_response, _http_error_response
+from ._instrumentation import _instrumented
+
+BUDGET_FIELDS = ['id', 'name', 'category_key', 'date_from', 'date_to', 'amount_limit', 'alert_threshold',
+                 'spent', 'alert_state']
+ALERT_FIELDS = ['id', 'budget_id', 'level', 'spent', 'amount_limit', 'create_date']
+
+
+class BudgetAPI(http.Controller):
+
+    ## 🔹 [GET] Budget Status of the Authenticated User
+    @http.route('/api/easy_apps/budgets/status', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
+    def get_budget_status(self, **kwargs):
+        """
+        Return the user's budgets covering a date, with their spending (JWT required).
+        Parameters:
+        - date (YYYY-MM-DD, default today)
+        Spending comes from each budget's running counter: no record is aggregated.
+        The response also lists the alerts raised for these budgets.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            try:
+                date = fields.Date.to_date(kwargs.get('date')) or fields.Date.today()
+            except ValueError:
+                return _http_error_response("Invalid date", 400)
+
+            budgets = request.env['easy_expenses.budget'].sudo().search_read(
+                [('user_id', '=', user_id), ('date_from', '<=', date), ('date_to', '>=', date)],
+                BUDGET_FIELDS, load=None)
+            for budget in budgets:
+                budget['remaining'] = budget['amount_limit'] - budget['spent']
+                budget['ratio'] = round(budget['spent'] / budget['amount_limit'], 4) if budget['amount_limit'] else None
+
+            alerts = request.env['easy_expenses.budget_alert'].sudo().search_read(
+                [('budget_id', 'in', [budget['id'] for budget in budgets])], ALERT_FIELDS, load=None
+            ) if budgets else []
+
+            return _http_success_response(budgets, "Budget status retrieved successfully", extra={'alerts': alerts})
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error getting budget status: {str(e)}", 500)
@@ -2,23 +2,38 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import AccessDenied
 from .auth import JWTAuth
-from ._helpers import _http_success_response, _http_error_response
+from ._helpers import _http_success_response, _http_error_response, _http_not_modified_response, _catalog_etag
+from ._serializers import CATEGORY_FIELDS, _requested_fields, _search_read
+from ._instrumentation import _instrumented
 
 class ExpenseCategoryAPI(http.Controller):
 
     @http.route('/api/easy_apps/categories', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
     def get_categories(self, **kwargs):
-        """Retrieve all expense categories (JWT required)"""
+        """Retrieve all expense categories (JWT required, supports If-None-Match)"""
         try:
             # Validate JWT
             JWTAuth.authenticate_request()  # Will raise AccessDenied if invalid
 
+            try:
+                output_fields = _requested_fields(kwargs, CATEGORY_FIELDS)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            # Conditional GET: answer from the catalog version and projection alone when the client copy is current
+            etag = _catalog_etag(request.env['easy_expenses.category']._get_catalog_version(), output_fields=output_fields)
+            not_modified = _http_not_modified_response(etag)
+            if not_modified:
+                return not_modified
+
             # Fetch categories
-            categories = request.env['easy_expenses.category'].sudo().search([])
+            categories = _search_read(request.env['easy_expenses.category'].sudo(), [], output_fields)
 
             return _http_success_response(
-                [{'id': cat.id, 'name': cat.name, 'description': cat.description} for cat in categories],
-                "Categories retrieved successfully"
+                categories,
+                "Categories retrieved successfully",
+                headers={'ETag': etag}
             )
         except AccessDenied as e:
             return _http_error_response(str(e), 401)  # Convert Odoo AccessDenied into JSON response
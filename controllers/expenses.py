@@ -2,27 +2,41 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import AccessDenied
 from .auth import JWTAuth
-from ._helpers import _http_success_response, _http_error_response
+from ._helpers import _http_success_response, _http_error_response, _http_not_modified_response, _catalog_etag
+from ._serializers import EXPENSE_FIELDS, EXPENSE_NAMES, _requested_fields, _search_read
+from ._instrumentation import _instrumented
 
 class ExpenseAPI(http.Controller):
 
     @http.route('/api/easy_apps/expenses', type='http', auth='public', methods=['GET'], csrf=False)
     @http.route('/api/easy_apps/expenses/<int:category_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
     def get_expenses(self, category_id=None, **kwargs):
-        """Retrieve all expenses or filter by category (JWT required)"""
+        """Retrieve all expenses or filter by category (JWT required, supports If-None-Match)"""
         try:
             # Validate JWT
             JWTAuth.authenticate_request()  # Will raise AccessDenied if invalid
 
+            try:
+                output_fields = _requested_fields(kwargs, EXPENSE_FIELDS)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            # Conditional GET: answer from the catalog version and projection alone when the client copy is current
+            etag = _catalog_etag(request.env['easy_expenses.expense']._get_catalog_version(), output_fields=output_fields)
+            not_modified = _http_not_modified_response(etag)
+            if not_modified:
+                return not_modified
+
             domain = [('category_id', '=', category_id)] if category_id else []
 
-            # Fetch expenses
-            expenses = request.env['easy_expenses.expense'].sudo().search(domain)
+            # Fetch expenses, category names resolved in one batch
+            expenses = _search_read(request.env['easy_expenses.expense'].sudo(), domain, output_fields, EXPENSE_NAMES)
 
             return _http_success_response(
-                [{'id': exp.id, 'name': exp.name, 'category_id': exp.category_id.id, 'category_name': exp.category_id.name}
-                 for exp in expenses],
-                "Expenses retrieved successfully"
+                expenses,
+                "Expenses retrieved successfully",
+                headers={'ETag': etag}
             )
         except AccessDenied as e:
             return _http_error_response(str(e), 401)  # Convert Odoo AccessDenied into JSON response
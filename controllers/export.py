@@ -0,0 +1,121 @@
+import io
+import csv
+from odoo import http, fields
+from odoo.http import request, Response
+from odoo.exceptions import AccessDenied
+from odoo.tools import SQL
+from .auth import JWTAuth
+from .records import _build_record_domain
+from ._helpers import _http_error_response, _http_stream_response, _json_dumps, _split_category_key
+from ._instrumentation import _instrumented
+
+EXPORT_BATCH_SIZE = 2000
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+EXPORT_COLUMNS = ['id', 'date', 'amount', 'category_type', 'category_id', 'category_name',
+                  'expense_id', 'expense_name', 'note']
+
+
+class ExpenseExportAPI(http.Controller):
+
+    ## 🔹 [GET] Stream All Matching Records as CSV or NDJSON
+    @http.route('/api/easy_apps/records/export', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
+    def export_records(self, **kwargs):
+        """
+        Export the authenticated user's expense records (JWT required).
+        Accepts the get_records filters plus format=csv (default), ndjson or json
+        (the usual success envelope, its data array streamed). Rows are read from a
+        server-side cursor in batches of EXPORT_BATCH_SIZE and written to the
+        response as they arrive, so memory does not depend on the number of
+        exported records. category/expense columns hold the global or
+        user category/expense depending on category_type, read from the record's
+        stored category dimension.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            export_format = kwargs.get('format', 'csv')
+            if export_format not in EXPORT_FORMATS:
+                return _http_error_response("Invalid format, use csv, ndjson or json", 400)
+
+            try:
+                domain = _build_record_domain(user_id, kwargs)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            env = request.env
+            Record = env['easy_expenses.record'].sudo()
+            query = Record._search(domain, order='date desc, id desc')
+            select = query.select(*[
+                SQL.identifier(query.table, column)
+                for column in ('id', 'date', 'amount', 'category_type', 'category_key', 'category_name',
+                               'expense_key', 'expense_name', 'note')
+            ])
+
+            filename = f"expenses_{fields.Date.to_string(fields.Date.today())}.{export_format}"
+            headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+            if export_format == 'json':
+                rows = (dict(zip(EXPORT_COLUMNS, row)) for batch in _iter_batches(env.registry, select)
+                        for row in batch)
+                return _http_stream_response(rows, "Expense Records exported successfully", headers=headers)
+
+            body = _stream_rows(env.registry, select, export_format)
+            return Response(body, content_type=EXPORT_FORMATS[export_format], direct_passthrough=True,
+                            headers=headers)
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error exporting records: {str(e)}", 500)
+
+
+def _stream_rows(registry, select, export_format):
+    """Yield encoded CSV or NDJSON export chunks, one per batch of rows"""
+    if export_format == 'csv':
+        encode = _encode_csv_rows
+        yield encode([EXPORT_COLUMNS])
+    else:
+        encode = _encode_ndjson_rows
+    for rows in _iter_batches(registry, select):
+        yield encode(rows)
+
+
+def _iter_batches(registry, select):
+    """
+    Yield lists of export rows (EXPORT_COLUMNS order) from a server-side cursor.
+    Runs after the controller has returned, so it uses its own database cursor.
+    """
+    with registry.cursor() as cr:
+        server_cursor = cr._cnx.cursor(name='easy_expenses_record_export')
+        server_cursor.itersize = EXPORT_BATCH_SIZE
+        try:
+            server_cursor.execute(select.code, select.params)
+            while True:
+                batch = server_cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not batch:
+                    break
+                rows = []
+                for (record_id, date, amount, category_type, category_key, category_name,
+                     expense_key, expense_name, note) in batch:
+                    rows.append([record_id, fields.Datetime.to_string(date), amount, category_type,
+                                 _split_category_key(category_key)[1], category_name,
+                                 _split_category_key(expense_key)[1], expense_name, note])
+                yield rows
+        finally:
+            server_cursor.close()
+
+
+def _encode_csv_rows(rows):
+    """Encode a batch of export rows as CSV"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson_rows(rows):
+    """Encode a batch of export rows as newline-delimited JSON objects"""
+    return b''.join(_json_dumps(dict(zip(EXPORT_COLUMNS, row))) + b'\n' for row in rows)
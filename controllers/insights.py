@@ -0,0 +1,219 @@
+import threading
+from collections import OrderedDict
+from dateutil.relativedelta import relativedelta
+from odoo import http, fields
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .auth import JWTAuth
+from ._helpers import _http_success_response, _http_error_response
+from ._instrumentation import _instrumented, _phase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_MONTHS = 12
+MAX_MONTHS = 60
+ROLLING_WINDOWS = (7, 30)
+CATEGORY_PERCENTILES = (25, 50, 75, 90)
+# Robust z-score (0.6745 * deviation / MAD) above which a record is flagged as unusual
+OUTLIER_Z_SCORE = 3.5
+OUTLIER_MIN_SAMPLES = 5
+MAX_OUTLIERS = 50
+
+# Per-worker LRU of computed insights, keyed by (dbname, user_id, months, day) and
+# validated against the user's records version, which every record write bumps.
+INSIGHTS_CACHE_SIZE = 256
+_insights_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class ExpenseInsightsAPI(http.Controller):
+
+    ## 🔹 [GET] Spending Statistics and Unusual Expenses
+    @http.route('/api/easy_apps/records/insights', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
+    def get_insights(self, **kwargs):
+        """
+        Statistics over the authenticated user's recent expense records (JWT required).
+        Parameters:
+        - months: history to analyse, whole months up to today (default 12, max 60)
+        Returns daily totals with 7/30-day rolling averages, monthly totals with
+        month-over-month deltas, per-category percentiles and the records whose
+        amount is unusually high for their category (robust z-score). Archived
+        records are included. Requires NumPy on the server.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            if np is None:
+                return _http_error_response("Insights are not available: NumPy is not installed on the server", 501)
+
+            try:
+                months = min(max(int(kwargs.get('months', DEFAULT_MONTHS)), 1), MAX_MONTHS)
+            except ValueError:
+                return _http_error_response("Invalid months", 400)
+
+            today = fields.Date.today()
+            version = request.env['easy_expenses.record']._get_records_version(user_id)
+            cache_key = (request.env.cr.dbname, user_id, months, today)
+            with _cache_lock:
+                cached = _insights_cache.get(cache_key)
+                if cached and cached[0] == version:
+                    _insights_cache.move_to_end(cache_key)
+                    return _http_success_response(cached[1], "Insights retrieved successfully")
+
+            start = today.replace(day=1) - relativedelta(months=months - 1)
+            with _phase('orm'):
+                request.env['easy_expenses.record'].flush_model()
+                request.env['easy_expenses.record_archive'].flush_model()
+                # Archived records keep counting, as they do in the summaries and budgets
+                request.env.cr.execute("""
+                    SELECT id, date, amount, COALESCE(category_key, ''), COALESCE(category_name, '')
+                      FROM easy_expenses_record
+                     WHERE user_id = %(user_id)s AND date >= %(start)s AND date < %(end)s
+                 UNION ALL
+                    SELECT id, date, amount, COALESCE(category_key, ''), COALESCE(category_name, '')
+                      FROM easy_expenses_record_archive
+                     WHERE user_id = %(user_id)s AND date >= %(start)s AND date < %(end)s
+                  ORDER BY 2, 1
+                """, {'user_id': user_id, 'start': start, 'end': today + relativedelta(days=1)})
+                rows = request.env.cr.fetchall()
+
+            with _phase('compute'):
+                data = _compute_insights(rows, start, today)
+
+            with _cache_lock:
+                _insights_cache[cache_key] = (version, data)
+                _insights_cache.move_to_end(cache_key)
+                while len(_insights_cache) > INSIGHTS_CACHE_SIZE:
+                    _insights_cache.popitem(last=False)
+
+            return _http_success_response(data, "Insights retrieved successfully")
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error computing insights: {str(e)}", 500)
+
+
+def _json_values(array, decimals=2):
+    """Rounded array as a JSON-friendly list, NaN and infinities as None"""
+    values = np.round(array, decimals).astype(object)
+    values[~np.isfinite(array)] = None
+    return values.tolist()
+
+
+def _group_quantile(sorted_values, starts, counts, q):
+    """
+    Linear-interpolated q-quantile of every group of a group-sorted array.
+    :param sorted_values: Values sorted by group, then by value.
+    :param starts: Index of the first value of each group.
+    :param counts: Number of values of each group (at least 1).
+    :param q: Quantile, between 0 and 1.
+    """
+    position = starts + q * (counts - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def _compute_insights(rows, start, today):
+    """
+    Vectorised statistics over (id, date, amount, category_key, category_name) rows.
+    :param start: First day analysed.
+    :param today: Last day analysed.
+    """
+    first_day = np.datetime64(start, 'D')
+    n_days = int((np.datetime64(today, 'D') - first_day).astype(np.int64)) + 1
+    first_month = first_day.astype('datetime64[M]')
+    n_months = int((np.datetime64(today, 'M') - first_month).astype(np.int64)) + 1
+    calendar = first_day + np.arange(n_days)
+    month_labels = np.datetime_as_string(first_month + np.arange(n_months))
+
+    if rows:
+        record_ids, dates, amounts, keys, names = zip(*rows)
+        record_ids = np.array(record_ids, dtype=np.int64)
+        days = np.array(dates, dtype='datetime64[us]').astype('datetime64[D]')
+        amounts = np.array(amounts, dtype=np.float64)
+        keys = np.array(keys)
+        names = np.array(names)
+    else:
+        record_ids, amounts = np.zeros(0, dtype=np.int64), np.zeros(0)
+        days = np.zeros(0, dtype='datetime64[D]')
+        keys = names = np.zeros(0, dtype=str)
+
+    # Daily totals and trailing rolling averages (windows shorter at the start of the range)
+    day_index = (days - first_day).astype(np.int64)
+    daily = np.bincount(day_index, weights=amounts, minlength=n_days)[:n_days]
+    cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+    position = np.arange(1, n_days + 1)
+    daily_data = {'date': np.datetime_as_string(calendar).tolist(), 'total': _json_values(daily)}
+    for window in ROLLING_WINDOWS:
+        window_start = np.maximum(position - window, 0)
+        rolling = (cumulative[position] - cumulative[window_start]) / (position - window_start)
+        daily_data[f'avg_{window}'] = _json_values(rolling)
+
+    # Monthly totals and month-over-month deltas
+    month_index = (days.astype('datetime64[M]') - first_month).astype(np.int64)
+    monthly = np.bincount(month_index, weights=amounts, minlength=n_months)[:n_months]
+    previous = np.concatenate(([np.nan], monthly[:-1]))
+    delta = monthly - previous
+    delta_pct = np.divide(delta * 100, previous, out=np.full(n_months, np.nan), where=previous > 0)
+    monthly_data = {
+        'month': month_labels.tolist(),
+        'total': _json_values(monthly),
+        'delta': _json_values(delta),
+        'delta_pct': _json_values(delta_pct, 1),
+    }
+
+    if not len(amounts):
+        return {'daily': daily_data, 'monthly': monthly_data, 'categories': [], 'outliers': []}
+
+    # Per-category statistics over the records sorted by (category, amount)
+    category_keys, first_index, codes = np.unique(keys, return_index=True, return_inverse=True)
+    n_categories = len(category_keys)
+    order = np.lexsort((amounts, codes))
+    sorted_amounts = amounts[order]
+    counts = np.bincount(codes, minlength=n_categories)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    percentiles = {p: _group_quantile(sorted_amounts, starts, counts, p / 100) for p in CATEGORY_PERCENTILES}
+    totals = np.bincount(codes, weights=amounts, minlength=n_categories)
+    per_month = np.bincount(codes * n_months + month_index, weights=amounts,
+                            minlength=n_categories * n_months).reshape(n_categories, n_months)
+    this_month = per_month[:, -1]
+    last_month = per_month[:, -2] if n_months > 1 else np.full(n_categories, np.nan)
+
+    columns = {
+        'category_key': category_keys.tolist(),
+        'category_name': names[first_index].tolist(),
+        'count': counts.tolist(),
+        'total': _json_values(totals),
+        'mean': _json_values(totals / counts),
+        **{f'p{p}': _json_values(values) for p, values in percentiles.items()},
+        'month_total': _json_values(this_month),
+        'previous_month_total': _json_values(last_month),
+        'month_delta': _json_values(this_month - last_month),
+    }
+    categories = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    # Robust z-scores: distance to the category median in units of median absolute deviation
+    medians = percentiles[50] if 50 in percentiles else _group_quantile(sorted_amounts, starts, counts, 0.5)
+    deviations = np.abs(amounts - medians[codes])
+    mad = _group_quantile(deviations[np.lexsort((deviations, codes))], starts, counts, 0.5)
+    scale = mad[codes]
+    scores = np.divide(0.6745 * (amounts - medians[codes]), scale, out=np.zeros_like(amounts), where=scale > 0)
+    flagged = np.flatnonzero((scores > OUTLIER_Z_SCORE) & (counts[codes] >= OUTLIER_MIN_SAMPLES))
+    flagged = flagged[np.argsort(-scores[flagged], kind='stable')][:MAX_OUTLIERS]
+    outlier_columns = {
+        'id': record_ids[flagged].tolist(),
+        'date': np.datetime_as_string(days[flagged]).tolist(),
+        'amount': _json_values(amounts[flagged]),
+        'category_key': keys[flagged].tolist(),
+        'category_median': _json_values(medians[codes[flagged]]),
+        'score': _json_values(scores[flagged]),
+    }
+    outliers = [dict(zip(outlier_columns, values)) for values in zip(*outlier_columns.values())]
+
+    return {'daily': daily_data, 'monthly': monthly_data, 'categories': categories, 'outliers': outliers}
@@ -0,0 +1,35 @@
+import hmac
+from odoo import http
+from odoo.http import request, Response
+from odoo.tools import config
+from ._metrics import _collect, _render_prometheus
+from ._instrumentation import METRICS_ENABLED
+
+
+class MetricsAPI(http.Controller):
+
+    ## 🔹 [GET] Prometheus Metrics for the easy_apps Routes
+    @http.route('/api/easy_apps/metrics', type='http', auth='none', methods=['GET'], csrf=False)
+    def metrics(self, **kwargs):
+        """
+        Expose request counts by status, latency histograms, rows and bytes per route,
+        merged over all workers, in the Prometheus text format.
+        Answers 404 unless metrics are enabled (easy_expenses_metrics) and access is
+        configured: `Authorization: Bearer <easy_expenses_metrics_token>` when that
+        server option is set, else a client address listed in the comma-separated
+        easy_expenses_metrics_allow option (the address Odoo sees, i.e. the
+        X-Forwarded-For one behind a proxy in proxy_mode).
+        """
+        token = config.get('easy_expenses_metrics_token')
+        allowed = {address.strip() for address in str(config.get('easy_expenses_metrics_allow') or '').split(',')
+                   if address.strip()}
+        if not METRICS_ENABLED or not (token or allowed):
+            return Response("Not Found\n", status=404, content_type='text/plain')
+        if token:
+            header = request.httprequest.headers.get('Authorization', '')
+            if not hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+                return Response("Unauthorized\n", status=401, content_type='text/plain')
+        elif request.httprequest.remote_addr not in allowed:
+            return Response("Forbidden\n", status=403, content_type='text/plain')
+
+        return Response(_render_prometheus(_collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,14 +1,193 @@
-from odoo import http
+import json
+from odoo import http, fields
 from odoo.http import request
 from odoo.exceptions import AccessDenied
 from .auth import JWTAuth
-from ._helpers import _http_success_response, _http_error_response
+from ._helpers import _http_success_response, _http_error_response, _encode_cursor, _decode_cursor
+from ._serializers import RECORD_FIELDS, _requested_fields, _read, _search_read
+from ._instrumentation import _instrumented
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+MAX_BATCH_SIZE = 1000
+
+
+# Fields a bulk update may set on every selected record
+BULK_UPDATE_FIELDS = ('category_type', 'category_id', 'user_category_id', 'expense_id',
+                      'user_expense_id', 'amount', 'date', 'note')
+
+# Catalog model of each record relation, and whether its rows belong to a user
+RELATION_MODELS = {
+    'category_id': ('easy_expenses.category', False),
+    'expense_id': ('easy_expenses.expense', False),
+    'user_category_id': ('easy_expenses.user_category', True),
+    'user_expense_id': ('easy_expenses.user_expense', True),
+}
+# (expense field, category field): a record's expense must belong to its category
+EXPENSE_CATEGORY_FIELDS = (('expense_id', 'category_id'), ('user_expense_id', 'user_category_id'))
+
+
+def _build_record_domain(user_id, filters):
+    """
+    Build the search domain for a user's records from the get_records filters.
+    :param user_id: Owner of the records.
+    :param filters: Dict with optional start_date, end_date, category_id, user_category_id,
+        category_key, expense_key.
+    :return: Odoo domain.
+    """
+    domain = [('user_id', '=', user_id)]
+
+    # Date filtering
+    if filters.get('start_date'):
+        domain.append(('date', '>=', filters['start_date']))
+    if filters.get('end_date'):
+        domain.append(('date', '<=', filters['end_date']))
+
+    # Category filtering
+    if filters.get('category_id'):
+        domain.append(('category_id', '=', int(filters['category_id'])))
+    if filters.get('user_category_id'):
+        domain.append(('user_category_id', '=', int(filters['user_category_id'])))
+    if filters.get('category_key'):
+        domain.append(('category_key', '=', filters['category_key']))
+    if filters.get('expense_key'):
+        domain.append(('expense_key', '=', filters['expense_key']))
+
+    return domain
+
+
+def _keyset_domain(cursor_date, cursor_id):
+    """
+    Domain continuing a (date desc, id desc) listing strictly after a cursor row.
+    The redundant date <= bound is a plain range the (user_id, date, id) index can
+    start from; the OR alone would be applied as a filter after a full scan.
+    """
+    return [('date', '<=', cursor_date),
+            '|', ('date', '<', cursor_date),
+            '&', ('date', '=', cursor_date), ('id', '<', cursor_id)]
+
+
+def _json_body():
+    """
+    Parse the JSON body of the current HTTP request.
+    :raises ValueError: If the body is not valid JSON.
+    """
+    return json.loads(request.httprequest.get_data() or b'null')
+
+
+def _bulk_selection_domain(user_id, body):
+    """
+    Domain selecting the user's records targeted by a bulk request.
+    :param body: Dict with either 'ids' (list of record ids) or 'filters' (get_records filters).
+    :raises ValueError: If neither selector is usable.
+    """
+    if body.get('ids') is not None:
+        ids = body['ids']
+        if not isinstance(ids, list) or not ids:
+            raise ValueError("'ids' must be a non-empty list")
+        try:
+            ids = [int(record_id) for record_id in ids]
+        except (TypeError, ValueError):
+            raise ValueError("Invalid ids")
+        return [('user_id', '=', user_id), ('id', 'in', ids)]
+    if isinstance(body.get('filters'), dict):
+        return _build_record_domain(user_id, body['filters'])
+    raise ValueError("Provide either 'ids' or 'filters'")
+
+
+def _prepare_record_vals(user_id, data):
+    """
+    Validate API input for a new expense record and build its create values.
+    :param user_id: Owner of the record.
+    :param data: Dict of request fields.
+    :return: Dict of values for easy_expenses.record.create().
+    :raises ValueError: If the input is invalid.
+    """
+    required_fields = ['amount', 'category_type']
+    if not all(data.get(field) for field in required_fields):
+        raise ValueError("Missing required fields")
+
+    category_type = data.get('category_type')
+    if category_type not in ('global', 'user'):
+        raise ValueError("Invalid category_type")
+
+    try:
+        amount = float(data.get('amount'))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid amount")
+    if amount <= 0:
+        raise ValueError("The expense amount must be greater than zero.")
+
+    relations = {
+        'category_id': data.get('category_id') if category_type == 'global' else None,
+        'user_category_id': data.get('user_category_id') if category_type == 'user' else None,
+        'expense_id': data.get('expense_id') if category_type == 'global' else None,
+        'user_expense_id': data.get('user_expense_id') if category_type == 'user' else None,
+    }
+    for field_name, value in relations.items():
+        if value:
+            try:
+                relations[field_name] = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {field_name}")
+
+    vals = {
+        'category_type': category_type,
+        **relations,
+        'amount': amount,
+        'note': data.get('note'),
+        'user_id': user_id
+    }
+    if data.get('date'):
+        try:
+            vals['date'] = fields.Datetime.to_datetime(data.get('date'))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid date")
+    return vals
+
+
+def _relation_errors(user_id, keyed_vals):
+    """
+    Check the catalog references of expense record values, with one query per
+    catalog model for the whole list: global categories/expenses must exist, user
+    ones must belong to the user, and an expense must belong to the record's category.
+    :param user_id: Owner of the records.
+    :param keyed_vals: List of (key, vals) pairs, e.g. (input index, create values).
+    :return: Dict of key -> error message, for the invalid values only.
+    """
+    found = {}
+    for field_name, (model_name, owned) in RELATION_MODELS.items():
+        wanted = {vals[field_name] for _key, vals in keyed_vals if vals.get(field_name)}
+        domain = [('id', 'in', list(wanted))] + ([('user_id', '=', user_id)] if owned else [])
+        model = request.env[model_name].sudo()
+        if not wanted:
+            found[field_name] = {}
+        elif 'category_id' in model._fields:
+            found[field_name] = {row['id']: row['category_id']
+                                 for row in model.search_read(domain, ['category_id'], load=None)}
+        else:
+            found[field_name] = dict.fromkeys(model.search(domain).ids)
+
+    errors = {}
+    for key, vals in keyed_vals:
+        invalid = [field_name for field_name in RELATION_MODELS
+                   if vals.get(field_name) and vals[field_name] not in found[field_name]]
+        if invalid:
+            errors[key] = f"Invalid {invalid[0]}"
+            continue
+        for expense_field, category_field in EXPENSE_CATEGORY_FIELDS:
+            expense_id = vals.get(expense_field)
+            if expense_id and found[expense_field][expense_id] != (vals.get(category_field) or None):
+                errors[key] = f"{expense_field} does not belong to {category_field}"
+                break
+    return errors
 
 
 class ExpenseRecordAPI(http.Controller):
 
     ## 🔹 [GET] Retrieve All Records (Filtered by Date, Category, or User Category)
     @http.route('/api/easy_apps/records/get', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
     def get_records(self, **kwargs):
         """
         Retrieve all expense records for the authenticated user (JWT required).
@@ -17,45 +196,55 @@ class ExpenseRecordAPI(http.Controller):
         - end_date (YYYY-MM-DD)
         - category_id (Global Category)
         - user_category_id (User Custom Category)
+        - category_key / expense_key ("g:<id>" global or "u:<id>" user, either category type)
+        - fields (comma-separated subset of the record fields)
+        Pagination (keyset on date desc, id desc):
+        - limit (default 100, max 1000)
+        - cursor (opaque value returned as next_cursor by the previous page)
         """
         try:
             user_data = JWTAuth.authenticate_request()
             user_id = user_data.get("user_id")
 
-            domain = [('user_id', '=', user_id)]
-
-            # Date filtering
-            start_date = kwargs.get('start_date')
-            end_date = kwargs.get('end_date')
+            try:
+                limit = min(max(int(kwargs.get('limit', DEFAULT_PAGE_LIMIT)), 1), MAX_PAGE_LIMIT)
+            except ValueError:
+                return _http_error_response("Invalid limit", 400)
 
-            if start_date:
-                domain.append(('date', '>=', start_date))
-            if end_date:
-                domain.append(('date', '<=', end_date))
+            try:
+                output_fields = _requested_fields(kwargs, RECORD_FIELDS)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
 
-            # Category filtering
-            category_id = kwargs.get('category_id')
-            user_category_id = kwargs.get('user_category_id')
+            domain = _build_record_domain(user_id, kwargs)
 
-            if category_id:
-                domain.append(('category_id', '=', int(category_id)))
+            # Keyset pagination: continue strictly after the last row of the previous page
+            cursor = kwargs.get('cursor')
+            if cursor:
+                try:
+                    cursor_date, cursor_id = _decode_cursor(cursor)
+                    if not cursor_date:
+                        raise ValueError("Invalid cursor")
+                    cursor_date = fields.Datetime.to_string(fields.Datetime.to_datetime(cursor_date))
+                    cursor_id = int(cursor_id)
+                except (TypeError, ValueError):
+                    return _http_error_response("Invalid cursor", 400)
+                domain += _keyset_domain(cursor_date, cursor_id)
 
-            if user_category_id:
-                domain.append(('user_category_id', '=', int(user_category_id)))
+            # Fetch one extra row to know whether another page exists; the cursor needs the date
+            read_fields = output_fields if 'date' in output_fields else output_fields + ['date']
+            rows = _search_read(request.env['easy_expenses.record'].sudo(), domain, read_fields,
+                                order='date desc, id desc', limit=limit + 1)
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = _encode_cursor([fields.Datetime.to_string(rows[-1]['date']), rows[-1]['id']])
+            if read_fields is not output_fields:
+                for row in rows:
+                    del row['date']
 
-            # Fetch records
-            records = request.env['easy_expenses.record'].sudo().search(domain)
-
-            return _http_success_response(
-                [{'id': rec.id, 'date': rec.date, 'amount': rec.amount, 'note': rec.note,
-                  'category_type': rec.category_type,
-                  'category_id': rec.category_id.id if rec.category_id else None,
-                  'user_category_id': rec.user_category_id.id if rec.user_category_id else None,
-                  'expense_id': rec.expense_id.id if rec.expense_id else None,
-                  'user_expense_id': rec.user_expense_id.id if rec.user_expense_id else None}
-                 for rec in records],
-                "Expense Records retrieved successfully"
-            )
+            return _http_success_response(rows, "Expense Records retrieved successfully",
+                                          extra={'next_cursor': next_cursor})
         except AccessDenied as e:
             return _http_error_response(str(e), 401)
         except Exception as e:
@@ -64,24 +253,23 @@ class ExpenseRecordAPI(http.Controller):
 
     ## 🔹 [GET] Retrieve Single Record by ID
     @http.route('/api/easy_apps/records/<int:record_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
     def get_record(self, record_id, **kwargs):
-        """Retrieve a single expense record by ID (JWT required)"""
+        """Retrieve a single expense record by ID (JWT required, optional `fields`)"""
         try:
             user_data = JWTAuth.authenticate_request()
             user_id = user_data.get("user_id")
 
+            try:
+                output_fields = _requested_fields(kwargs, RECORD_FIELDS)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
             record = request.env['easy_expenses.record'].sudo().search([('id', '=', record_id), ('user_id', '=', user_id)], limit=1)
             if not record:
                 return _http_error_response("Expense Record not found", 404)
 
-            return _http_success_response({
-                'id': record.id, 'date': record.date, 'amount': record.amount, 'note': record.note,
-                'category_type': record.category_type,
-                'category_id': record.category_id.id if record.category_id else None,
-                'user_category_id': record.user_category_id.id if record.user_category_id else None,
-                'expense_id': record.expense_id.id if record.expense_id else None,
-                'user_expense_id': record.user_expense_id.id if record.user_expense_id else None
-            }, "Expense Record retrieved successfully")
+            return _http_success_response(_read(record, output_fields)[0], "Expense Record retrieved successfully")
         except AccessDenied as e:
             return _http_error_response(str(e), 401)
         except Exception as e:
@@ -90,33 +278,22 @@ class ExpenseRecordAPI(http.Controller):
 
     ## 🔹 [POST] Create a New Record
     @http.route('/api/easy_apps/records/create', type='http', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
     def create_record(self, **kwargs):
         """Create a new expense record (JWT required)"""
         try:
             user_data = JWTAuth.authenticate_request()
             user_id = user_data.get("user_id")
 
-            required_fields = ['amount', 'category_type']
-            if not all(kwargs.get(field) for field in required_fields):
-                return _http_error_response("Missing required fields", 400)
-
-            category_type = kwargs.get('category_type')
-            category_id = kwargs.get('category_id') if category_type == 'global' else None
-            user_category_id = kwargs.get('user_category_id') if category_type == 'user' else None
-            expense_id = kwargs.get('expense_id') if category_type == 'global' else None
-            user_expense_id = kwargs.get('user_expense_id') if category_type == 'user' else None
-
-            record = request.env['easy_expenses.record'].sudo().create({
-                'category_type': category_type,
-                'category_id': category_id,
-                'user_category_id': user_category_id,
-                'expense_id': expense_id,
-                'user_expense_id': user_expense_id,
-                'amount': float(kwargs.get('amount')),
-                'date': kwargs.get('date'),
-                'note': kwargs.get('note'),
-                'user_id': user_id
-            })
+            try:
+                vals = _prepare_record_vals(user_id, kwargs)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+            errors = _relation_errors(user_id, [(0, vals)])
+            if errors:
+                return _http_error_response(errors[0], 400)
+
+            record = request.env['easy_expenses.record'].sudo().create(vals)
 
             return _http_success_response({'id': record.id}, "Expense Record created successfully", 201)
         except AccessDenied as e:
@@ -125,8 +302,62 @@ class ExpenseRecordAPI(http.Controller):
             return _http_error_response(f"Error creating record: {str(e)}", 500)
 
 
+    ## 🔹 [POST] Create Many Records in One Request
+    @http.route('/api/easy_apps/records/create_batch', type='http', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
+    def create_records_batch(self, **kwargs):
+        """
+        Create several expense records at once (JWT required).
+        The body is a JSON array of record objects (same fields as records/create).
+        Every item is validated first (fields, date, and the catalog entries it
+        references, with one query per catalog model); the valid ones are inserted
+        with a single multi-create. The response lists, in input order, either the
+        new id or the validation error of each item.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            try:
+                items = _json_body()
+            except ValueError:
+                return _http_error_response("Invalid JSON body", 400)
+            if not isinstance(items, list) or not items:
+                return _http_error_response("Expected a non-empty JSON array of records", 400)
+            if len(items) > MAX_BATCH_SIZE:
+                return _http_error_response(f"A batch may contain at most {MAX_BATCH_SIZE} records", 400)
+
+            results = [None] * len(items)
+            valid = []
+            for index, item in enumerate(items):
+                try:
+                    if not isinstance(item, dict):
+                        raise ValueError("Expected a JSON object")
+                    valid.append((index, _prepare_record_vals(user_id, item)))
+                except ValueError as e:
+                    results[index] = {'index': index, 'error': str(e)}
+
+            # Catalog references (existence, ownership, expense in category) for the whole batch
+            errors = _relation_errors(user_id, valid)
+            for index, error in errors.items():
+                results[index] = {'index': index, 'error': error}
+            valid = [(index, vals) for index, vals in valid if index not in errors]
+
+            if valid:
+                records = request.env['easy_expenses.record'].sudo().create([vals for _index, vals in valid])
+                for (index, _vals), record in zip(valid, records):
+                    results[index] = {'index': index, 'id': record.id}
+
+            return _http_success_response(results, f"{len(valid)} of {len(items)} Expense Records created", 201)
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error creating records: {str(e)}", 500)
+
+
     ## 🔹 [PUT] Update an Existing Record
     @http.route('/api/easy_apps/records/update/<int:record_id>', type='http', auth='public', methods=['PUT'], csrf=False)
+    @_instrumented
     def update_record(self, record_id, **kwargs):
         """Update an existing expense record (JWT required)"""
         try:
@@ -157,6 +388,7 @@ class ExpenseRecordAPI(http.Controller):
 
     ## 🔹 [DELETE] Remove an Expense Record
     @http.route('/api/easy_apps/records/delete/<int:record_id>', type='http', auth='public', methods=['DELETE'], csrf=False)
+    @_instrumented
     def delete_record(self, record_id, **kwargs):
         """Delete an expense record (JWT required)"""
         try:
@@ -174,3 +406,110 @@ class ExpenseRecordAPI(http.Controller):
             return _http_error_response(str(e), 401)
         except Exception as e:
             return _http_error_response(f"Error deleting record: {str(e)}", 500)
+
+
+    ## 🔹 [PUT] Update Many Records by Id List or Filter
+    @http.route('/api/easy_apps/records/update_batch', type='http', auth='public', methods=['PUT'], csrf=False)
+    @_instrumented
+    def update_records_batch(self, **kwargs):
+        """
+        Apply the same values to many expense records (JWT required).
+        JSON body: {"ids": [...]} or {"filters": {...get_records filters}},
+        plus "values": {...} restricted to the editable record fields. Changing
+        category_type clears the category and expense of the other type.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            try:
+                body = _json_body()
+                if not isinstance(body, dict):
+                    raise ValueError("Expected a JSON object")
+                domain = _bulk_selection_domain(user_id, body)
+                values = body.get('values')
+                if not isinstance(values, dict) or not values:
+                    raise ValueError("'values' must be a non-empty object")
+                unknown = set(values) - set(BULK_UPDATE_FIELDS)
+                if unknown:
+                    raise ValueError(f"Fields not allowed: {', '.join(sorted(unknown))}")
+                if 'amount' in values:
+                    try:
+                        values['amount'] = float(values['amount'])
+                    except (TypeError, ValueError):
+                        raise ValueError("Invalid amount")
+                    if values['amount'] <= 0:
+                        raise ValueError("The expense amount must be greater than zero.")
+                if 'category_type' in values:
+                    if values['category_type'] not in ('global', 'user'):
+                        raise ValueError("Invalid category_type")
+                    # As on create, only the relations of the new type are kept
+                    other_type = ('user_category_id', 'user_expense_id') if values['category_type'] == 'global' \
+                        else ('category_id', 'expense_id')
+                    values.update(dict.fromkeys(other_type, False))
+                if 'date' in values:
+                    try:
+                        values['date'] = fields.Datetime.to_datetime(values['date'])
+                    except (TypeError, ValueError):
+                        raise ValueError("Invalid date")
+                    if not values['date']:
+                        raise ValueError("Invalid date")
+                for field_name in RELATION_MODELS:
+                    if values.get(field_name):
+                        try:
+                            values[field_name] = int(values[field_name])
+                        except (TypeError, ValueError):
+                            raise ValueError(f"Invalid {field_name}")
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            # One ownership query, one set-based write
+            records = request.env['easy_expenses.record'].sudo().search(domain, order='id')
+            if records and RELATION_MODELS.keys() & values.keys():
+                # Check the references each record ends up with, in one read and one query per catalog
+                current = records.read(list(RELATION_MODELS), load=None)
+                errors = _relation_errors(user_id, [(row['id'], {**row, **values}) for row in current])
+                if errors:
+                    record_id, error = min(errors.items())
+                    return _http_error_response(f"Record {record_id}: {error}", 400)
+            if records:
+                records.write(values)
+
+            return _http_success_response({'count': len(records)}, "Expense Records updated successfully")
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error updating records: {str(e)}", 500)
+
+
+    ## 🔹 [DELETE] Remove Many Records by Id List or Filter
+    @http.route('/api/easy_apps/records/delete_batch', type='http', auth='public', methods=['DELETE'], csrf=False)
+    @_instrumented
+    def delete_records_batch(self, **kwargs):
+        """
+        Delete many expense records (JWT required).
+        JSON body: {"ids": [...]} or {"filters": {...get_records filters}}.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            try:
+                body = _json_body()
+                if not isinstance(body, dict):
+                    raise ValueError("Expected a JSON object")
+                domain = _bulk_selection_domain(user_id, body)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            # One ownership query, one set-based unlink
+            records = request.env['easy_expenses.record'].sudo().search(domain, order='id')
+            count = len(records)
+            if records:
+                records.unlink()
+
+            return _http_success_response({'count': count}, "Expense Records deleted successfully")
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error deleting records: {str(e)}", 500)
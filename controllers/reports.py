@@ -0,0 +1,181 @@
+import pytz
+from datetime import datetime, time, timedelta
+from odoo import http, fields
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .auth import JWTAuth
+from ._helpers import _http_success_response, _http_error_response, _split_category_key
+from ._instrumentation import _instrumented
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+ROLLUP_GRANULARITIES = ('month', 'year')
+
+# Group-by keys exposed by the API. Every grouping also splits on category_type,
+# so global and user rows come back with the same shape in a single pass.
+# Output (global, user) id fields of each grouping
+GROUP_BY_FIELDS = {
+    'category': ['category_id', 'user_category_id'],
+    'expense': ['expense_id', 'user_expense_id'],
+    'category_type': [],
+}
+# Raw records group on their unified, indexed key column instead of the id pair
+GROUP_BY_KEYS = {
+    'category': ['category_key'],
+    'expense': ['expense_key'],
+    'category_type': [],
+}
+
+
+class ExpenseReportAPI(http.Controller):
+
+    ## 🔹 [GET] Aggregate Spending per Period and Group
+    @http.route('/api/easy_apps/records/summary', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
+    def get_summary(self, **kwargs):
+        """
+        Aggregate the authenticated user's expense records (JWT required).
+        Parameters:
+        - start_date / end_date (YYYY-MM-DD, optional)
+        - granularity: day, week, month (default) or year
+        - tz: IANA timezone used to bucket dates (default UTC)
+        - group_by: category (default), expense or category_type
+        - category_type: restrict to 'global' or 'user' records (optional)
+        Both dates are inclusive days of tz. Month or year summaries in UTC over whole months
+        (start_date on the first day of a month, end_date on the last day of one)
+        are read from easy_expenses.record_rollup. Archived records are counted on
+        every path.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            granularity = kwargs.get('granularity', 'month')
+            if granularity not in GRANULARITIES:
+                return _http_error_response("Invalid granularity", 400)
+
+            group_by = kwargs.get('group_by', 'category')
+            if group_by not in GROUP_BY_FIELDS:
+                return _http_error_response("Invalid group_by", 400)
+
+            tz = kwargs.get('tz', 'UTC')
+            if tz not in pytz.all_timezones_set:
+                return _http_error_response("Invalid timezone", 400)
+
+            try:
+                for name in ('start_date', 'end_date'):
+                    fields.Date.to_date(kwargs.get(name))
+            except ValueError:
+                return _http_error_response("Invalid date, use YYYY-MM-DD", 400)
+
+            data = _summary_rows(request.env, user_id, granularity, group_by, tz, kwargs.get('start_date'),
+                                 kwargs.get('end_date'), kwargs.get('category_type'))
+
+            return _http_success_response(data, "Expense summary retrieved successfully")
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error getting summary: {str(e)}", 500)
+
+
+def _summary_rows(env, user_id, granularity, group_by, tz, start_date=None, end_date=None, category_type=None):
+    """
+    Aggregate a user's expense records for get_summary (archived ones included),
+    with one GROUP BY per table read.
+    :param env: Environment to read with (sudo is applied here).
+    :return: List of summary rows, ordered by period.
+    """
+    key_fields = GROUP_BY_FIELDS[group_by]
+
+    # Month/year buckets over whole UTC months are answered from the rollup table;
+    # a partial first or last month falls back to the records
+    start, end = fields.Date.to_date(start_date), fields.Date.to_date(end_date)
+    whole_months = (not start or start.day == 1) and (not end or (end + timedelta(days=1)).day == 1)
+    if granularity in ROLLUP_GRANULARITIES and tz == 'UTC' and whole_months:
+        Model = env['easy_expenses.record_rollup'].sudo()
+        date_field = 'month'
+        aggregates = ['amount_total:sum', 'record_count:sum', 'amount_min:min', 'amount_max:max']
+        domain = [('user_id', '=', user_id)]
+        if start_date:
+            domain.append(('month', '>=', start_date))
+        if end_date:
+            # The bucket of end_date's month starts on or before it: end_date stays inclusive
+            domain.append(('month', '<=', end_date))
+    else:
+        Model = env['easy_expenses.record'].sudo()
+        date_field = 'date'
+        key_fields = GROUP_BY_KEYS[group_by]
+        aggregates = ['amount:sum', '__count', 'amount:min', 'amount:max']
+        domain = [('user_id', '=', user_id)]
+        # Bound on the local midnights, so the first and last buckets hold whole local days
+        if start:
+            domain.append(('date', '>=', _local_midnight(start, tz)))
+        if end:
+            domain.append(('date', '<', _local_midnight(end + timedelta(days=1), tz)))
+    if category_type:
+        domain.append(('category_type', '=', category_type))
+
+    groupby = [f'{date_field}:{granularity}', 'category_type'] + key_fields
+
+    # Single GROUP BY in the database; the tz context drives date bucketing
+    groups = Model.with_context(tz=tz)._read_group(
+        domain, groupby, aggregates, order=f'{date_field}:{granularity}',
+    )
+    if date_field == 'date':
+        # Archived records keep counting, as they do in the rollups: merge their groups in
+        archived = env['easy_expenses.record_archive'].sudo().with_context(tz=tz)._read_group(
+            domain, groupby, aggregates,
+        )
+        if archived:
+            groups = _merge_groups(groups, archived, len(groupby))
+
+    data = []
+    for period, category_type, *keys_and_aggregates in groups:
+        keys = keys_and_aggregates[:len(key_fields)]
+        total, count, minimum, maximum = keys_and_aggregates[len(key_fields):]
+        row = {
+            'period': fields.Date.to_string(period) if period else None,
+            'category_type': category_type,
+            'sum': total,
+            'count': count,
+            'min': minimum,
+            'max': maximum,
+        }
+        if key_fields == GROUP_BY_FIELDS[group_by]:
+            for field_name, value in zip(key_fields, keys):
+                row[field_name] = value.id or None
+        elif key_fields:
+            # "g:<id>" / "u:<id>" back to the (global, user) id pair
+            key_type, key_id = _split_category_key(keys[0])
+            global_field, user_field = GROUP_BY_FIELDS[group_by]
+            row[global_field] = key_id if key_type == 'global' else None
+            row[user_field] = key_id if key_type == 'user' else None
+        data.append(row)
+    return data
+
+
+def _local_midnight(day, tz):
+    """
+    Start of a day in a timezone, as a naive UTC datetime to compare with stored datetimes.
+    :param day: Local date.
+    :param tz: IANA timezone name.
+    """
+    local = pytz.timezone(tz).localize(datetime.combine(day, time.min))
+    return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _merge_groups(groups, other_groups, key_length):
+    """
+    Combine two _read_group results of (keys..., sum, count, min, max) rows.
+    :param key_length: Number of leading group key values in each row.
+    :return: Merged rows, ordered by their first key (the period).
+    """
+    merged = {tuple(group[:key_length]): list(group[key_length:]) for group in groups}
+    for group in other_groups:
+        key = tuple(group[:key_length])
+        total, count, minimum, maximum = group[key_length:]
+        current = merged.get(key)
+        if current is None:
+            merged[key] = [total, count, minimum, maximum]
+        else:
+            merged[key] = [current[0] + total, current[1] + count, min(current[2], minimum), max(current[3], maximum)]
+    return sorted((key + tuple(values) for key, values in merged.items()), key=lambda group: group[0])
@@ -0,0 +1,195 @@
+import io
+import re
+import csv
+import hashlib
+import datetime
+import threading
+from psycopg2.errors import UniqueViolation
+from odoo import http, fields
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .auth import JWTAuth
+from ._helpers import _http_success_response, _http_error_response
+from ._instrumentation import _instrumented
+
+IMPORT_CHUNK_SIZE = 1000
+# Retries of a chunk rejected because a concurrent import inserted some of its lines
+IMPORT_CONFLICT_RETRIES = 2
+MAX_REPORTED_ERRORS = 100
+AMOUNT_SIGNS = ('any', 'negative', 'positive')
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _normalize(text):
+    """Lowercase words of a description or expense name, joined by single spaces"""
+    return ' '.join(_WORD_RE.findall((text or '').lower()))
+
+
+class _ExpenseMatcher:
+    """
+    Map statement descriptions to expenses through an index built once per import:
+    expense names are bucketed by their first word, so a description only
+    compares against names starting with one of its own words. The longest
+    matching name wins; user expenses take precedence over the global ones.
+    """
+
+    def __init__(self, env, user_id):
+        by_word = {}
+        targets = []
+        for expense in env['easy_expenses.expense'].sudo().search_read([], ['name', 'category_id'], load=None):
+            targets.append((expense['name'], {'category_type': 'global', 'category_id': expense['category_id'],
+                                              'expense_id': expense['id']}))
+        for expense in env['easy_expenses.user_expense'].sudo().search_read(
+                [('user_id', '=', user_id)], ['name', 'category_id'], load=None):
+            targets.append((expense['name'], {'category_type': 'user', 'user_category_id': expense['category_id'],
+                                              'user_expense_id': expense['id']}))
+        # Later entries (user expenses) replace global ones with the same name
+        for name, target in targets:
+            normalized = _normalize(name)
+            if normalized:
+                by_word.setdefault(normalized.split(' ', 1)[0], {})[normalized] = target
+        self._candidates = {
+            word: sorted(names.items(), key=lambda item: -len(item[0]))
+            for word, names in by_word.items()
+        }
+
+        others = env['easy_expenses.expense'].sudo().search(
+            [('name', '=', 'Others'), ('category_id.name', '=', 'Others')], limit=1)
+        self.fallback = ({'category_type': 'global', 'category_id': others.category_id.id, 'expense_id': others.id}
+                         if others else {'category_type': 'global'})
+
+    def match(self, description):
+        """Return the record values of the best matching expense, or None"""
+        normalized = _normalize(description)
+        padded = f' {normalized} '
+        best = None
+        for word in set(normalized.split(' ')):
+            for name, target in self._candidates.get(word, ()):
+                if best and len(name) <= len(best[0]):
+                    break
+                if f' {name} ' in padded:
+                    best = (name, target)
+                    break
+        return best[1] if best else None
+
+
+class StatementImportAPI(http.Controller):
+
+    ## 🔹 [POST] Import a Bank or Card Statement
+    @http.route('/api/easy_apps/records/import', type='http', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
+    def import_statement(self, **kwargs):
+        """
+        Turn an uploaded CSV statement into expense records (JWT required).
+        Multipart form with a `file` field and optional parameters:
+        - date_column / amount_column / description_column (default date, amount, description)
+        - date_format (strptime format, default %Y-%m-%d)
+        - delimiter (default ,)
+        - amount_sign: any (default), negative or positive; lines of the other sign are skipped
+        The file is parsed as a stream and inserted in chunks of IMPORT_CHUNK_SIZE,
+        each committed on its own. Lines already imported (same date, amount,
+        description and occurrence) are skipped, so uploading a statement again is cheap.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            upload = request.httprequest.files.get('file')
+            if not upload:
+                return _http_error_response("Missing statement file", 400)
+
+            date_column = kwargs.get('date_column', 'date')
+            amount_column = kwargs.get('amount_column', 'amount')
+            description_column = kwargs.get('description_column', 'description')
+            date_format = kwargs.get('date_format', '%Y-%m-%d')
+            amount_sign = kwargs.get('amount_sign', 'any')
+            if amount_sign not in AMOUNT_SIGNS:
+                return _http_error_response("Invalid amount_sign", 400)
+
+            reader = csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''),
+                                    delimiter=kwargs.get('delimiter', ','))
+            missing_columns = {date_column, amount_column, description_column} - set(reader.fieldnames or ())
+            if missing_columns:
+                return _http_error_response(f"Missing columns: {', '.join(sorted(missing_columns))}", 400)
+
+            matcher = _ExpenseMatcher(request.env, user_id)
+            Record = request.env['easy_expenses.record'].sudo()
+            stats = {'imported': 0, 'duplicates': 0, 'skipped': 0, 'unmatched': 0, 'errors': []}
+            occurrences = {}
+            chunk = []
+
+            for line_number, line in enumerate(reader, start=2):
+                try:
+                    date = datetime.datetime.strptime(line[date_column].strip(), date_format)
+                    amount = float(line[amount_column].strip().replace(' ', ''))
+                except (ValueError, AttributeError):
+                    stats['skipped'] += 1
+                    if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                        stats['errors'].append({'line': line_number, 'error': "Invalid date or amount"})
+                    continue
+                if not amount or (amount_sign == 'negative' and amount > 0) or (amount_sign == 'positive' and amount < 0):
+                    stats['skipped'] += 1
+                    continue
+
+                description = (line[description_column] or '').strip()
+                # Identical lines in one statement are distinct expenses: number their occurrences
+                key = (fields.Datetime.to_string(date), round(amount, 2), description)
+                occurrences[key] = occurrence = occurrences.get(key, 0) + 1
+                import_hash = hashlib.sha256(f"{key[0]}|{key[1]:.2f}|{key[2]}|{occurrence}".encode()).hexdigest()
+
+                target = matcher.match(description)
+                if target is None:
+                    stats['unmatched'] += 1
+                    target = matcher.fallback
+
+                chunk.append({
+                    **target,
+                    'amount': abs(amount),
+                    'date': date,
+                    'note': description,
+                    'user_id': user_id,
+                    'import_hash': import_hash,
+                })
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    self._insert_chunk(Record, user_id, chunk, stats)
+                    chunk = []
+
+            if chunk:
+                self._insert_chunk(Record, user_id, chunk, stats)
+
+            return _http_success_response(stats, "Statement imported successfully")
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error importing statement: {str(e)}", 500)
+
+    @staticmethod
+    def _insert_chunk(Record, user_id, chunk, stats):
+        """
+        Drop already imported lines with one lookup, multi-create the rest and commit.
+        A concurrent import of the same statement may insert some of these lines
+        between the lookup and the create: the unique hash index then rejects the
+        chunk, which is rolled back to its savepoint and retried without the lines
+        the other import committed, counted as duplicates.
+        """
+        hashes = [vals['import_hash'] for vals in chunk]
+        for attempt in range(IMPORT_CONFLICT_RETRIES + 1):
+            existing = {row['import_hash'] for row in Record.search_read(
+                [('user_id', '=', user_id), ('import_hash', 'in', hashes)], ['import_hash'])}
+            new_vals = [vals for vals in chunk if vals['import_hash'] not in existing]
+            try:
+                with Record.env.cr.savepoint():
+                    if new_vals:
+                        Record.create(new_vals)
+                break
+            except UniqueViolation:
+                Record.env.invalidate_all()
+                if attempt == IMPORT_CONFLICT_RETRIES:
+                    raise
+        stats['duplicates'] += len(chunk) - len(new_vals)
+        if not getattr(threading.current_thread(), 'testing', False):
+            Record.env.cr.commit()
+        # Keep the ORM cache from growing with the statement size
+        Record.env.invalidate_all()
+        stats['imported'] += len(new_vals)
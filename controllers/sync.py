@@ -0,0 +1,125 @@
+import datetime
+from odoo import http, fields
+from odoo.http import request
+from odoo.exceptions import AccessDenied
+from .auth import JWTAuth
+from ._helpers import _http_success_response, _http_error_response, _encode_cursor, _decode_cursor
+from ._serializers import RECORD_FIELDS, CATEGORY_FIELDS, EXPENSE_FIELDS, EXPENSE_NAMES, _search_read
+from ._instrumentation import _instrumented
+
+# Rows committed by transactions that started before the previous sync but
+# finished after it carry an older write_date; re-sending this window catches them.
+SYNC_OVERLAP = datetime.timedelta(seconds=60)
+# Rows per page, all models together
+DEFAULT_SYNC_LIMIT = 1000
+MAX_SYNC_LIMIT = 5000
+
+# (response key, model, fields, display names) of the synchronised per-user models
+SYNC_MODELS = [
+    ('records', 'easy_expenses.record', RECORD_FIELDS, None),
+    ('user_categories', 'easy_expenses.user_category', CATEGORY_FIELDS, None),
+    ('user_expenses', 'easy_expenses.user_expense', EXPENSE_FIELDS, EXPENSE_NAMES),
+]
+
+
+class SyncAPI(http.Controller):
+
+    ## 🔹 [GET] Changes Since the Last Sync
+    @http.route('/api/easy_apps/sync', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
+    def sync(self, **kwargs):
+        """
+        Return the user's records, user categories and user expenses changed since a watermark (JWT required).
+        Optional parameters:
+        - since: watermark returned by the previous sync (omit for a full sync)
+        - limit: rows per page, all models together (default 1000, max 5000)
+        - cursor: next_cursor returned by the previous page of the same sync
+        The response carries the changed rows, the ids deleted since the watermark and
+        a new watermark. Rows near the watermark may be sent twice; clients upsert by id.
+        When the watermark is older than the deletion log retention, full_resync is true
+        and every row is returned.
+        Rows are paged by model then id: while next_cursor is set, request it with the
+        same parameters; deletions come with the first page and the watermark with the
+        last one, which clients store once every page has been applied.
+        """
+        try:
+            user_data = JWTAuth.authenticate_request()
+            user_id = user_data.get("user_id")
+
+            try:
+                limit = min(max(int(kwargs.get('limit', DEFAULT_SYNC_LIMIT)), 1), MAX_SYNC_LIMIT)
+            except (TypeError, ValueError):
+                return _http_error_response("Invalid limit", 400)
+
+            Tombstone = request.env['easy_expenses.sync_tombstone'].sudo()
+            if kwargs.get('cursor'):
+                # Later page: the watermark and window were fixed by the first page
+                try:
+                    watermark, since, full_resync, model_index, last_id = _decode_cursor(kwargs['cursor'])
+                    watermark = fields.Datetime.to_datetime(watermark)
+                    since = since and fields.Datetime.to_datetime(since)
+                    model_index, last_id = int(model_index), int(last_id)
+                    if not watermark or not 0 <= model_index < len(SYNC_MODELS):
+                        raise ValueError("Invalid cursor")
+                except (TypeError, ValueError):
+                    return _http_error_response("Invalid cursor", 400)
+                first_page = False
+            else:
+                # Taken before reading, so changes made during this sync show up in the next one
+                watermark = request.env.cr.now()
+
+                since = None
+                if kwargs.get('since'):
+                    try:
+                        since = fields.Datetime.to_datetime(_decode_cursor(kwargs['since'])[0])
+                    except (TypeError, ValueError, IndexError):
+                        return _http_error_response("Invalid watermark", 400)
+
+                full_resync = bool(since) and since < watermark - Tombstone._retention
+                if full_resync:
+                    since = None
+                model_index, last_id = 0, 0
+                first_page = True
+
+            data = {'deleted': {}}
+            next_cursor = None
+            remaining = limit
+            for index, (key, model_name, output_fields, names) in enumerate(SYNC_MODELS):
+                data[key] = []
+                deleted = []
+                if first_page and since:
+                    deleted = [tombstone['res_id'] for tombstone in Tombstone.search_read(
+                        [('user_id', '=', user_id), ('res_model', '=', model_name),
+                         ('create_date', '>', since - SYNC_OVERLAP)], ['res_id'], order='id')]
+                data['deleted'][key] = deleted
+
+                if index < model_index or next_cursor:
+                    continue
+                if not remaining:
+                    next_cursor = [index, 0]
+                    continue
+                domain = [('user_id', '=', user_id), ('id', '>', last_id if index == model_index else 0)]
+                if since:
+                    domain.append(('write_date', '>', since - SYNC_OVERLAP))
+                # One extra row tells whether this model continues on the next page
+                rows = _search_read(request.env[model_name].sudo(), domain, output_fields, names,
+                                    order='id', limit=remaining + 1)
+                if len(rows) > remaining:
+                    rows = rows[:remaining]
+                    next_cursor = [index, rows[-1]['id']]
+                remaining -= len(rows)
+                data[key] = rows
+
+            if next_cursor:
+                next_cursor = _encode_cursor([fields.Datetime.to_string(watermark),
+                                              since and fields.Datetime.to_string(since),
+                                              full_resync, *next_cursor])
+            return _http_success_response(data, "Changes retrieved successfully", extra={
+                'next_cursor': next_cursor,
+                'watermark': None if next_cursor else _encode_cursor([fields.Datetime.to_string(watermark)]),
+                'full_resync': full_resync or not since,
+            })
+        except AccessDenied as e:
+            return _http_error_response(str(e), 401)
+        except Exception as e:
+            return _http_error_response(f"Error synchronising: {str(e)}", 500)
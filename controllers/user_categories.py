@@ -2,25 +2,41 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import AccessDenied
 from .auth import JWTAuth
-from ._helpers import _http_success_response, _http_error_response
+from ._helpers import _http_success_response, _http_error_response, _http_not_modified_response, _catalog_etag
+from ._serializers import CATEGORY_FIELDS, _requested_fields, _search_read
+from ._instrumentation import _instrumented
 
 
 class UserExpenseCategoryAPI(http.Controller):
 
     ## 🔹 [GET] Retrieve All User Expense Categories
     @http.route('/api/easy_apps/user_categories/get', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
     def get_user_categories(self, **kwargs):
-        """Retrieve all user expense categories (JWT required)"""
+        """Retrieve all user expense categories (JWT required, supports If-None-Match)"""
         try:
             user_data = JWTAuth.authenticate_request()  # Validate JWT
-            
-            # Fetch only categories that belong to the authenticated user
             user_id = user_data.get("user_id")
-            categories = request.env['easy_expenses.user_category'].sudo().search([('user_id', '=', user_id)])
+
+            try:
+                output_fields = _requested_fields(kwargs, CATEGORY_FIELDS)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            # Conditional GET against the user's catalog version
+            etag = _catalog_etag(request.env['easy_expenses.user_category']._get_catalog_version(user_id), user_id, output_fields)
+            not_modified = _http_not_modified_response(etag)
+            if not_modified:
+                return not_modified
+
+            # Fetch only categories that belong to the authenticated user
+            categories = _search_read(request.env['easy_expenses.user_category'].sudo(),
+                                      [('user_id', '=', user_id)], output_fields)
 
             return _http_success_response(
-                [{'id': cat.id, 'name': cat.name, 'description': cat.description} for cat in categories],
-                "User Categories retrieved successfully"
+                categories,
+                "User Categories retrieved successfully",
+                headers={'ETag': etag}
             )
         except AccessDenied as e:
             return _http_error_response(str(e), 401)
@@ -29,6 +45,7 @@ class UserExpenseCategoryAPI(http.Controller):
 
     ## 🔹 [POST] Create a New User Expense Category
     @http.route('/api/easy_apps/user_categories/create', type='json', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
     def create_user_category(self, **kwargs):
         """Create a new user expense category (JWT required)"""
         try:
@@ -56,6 +73,7 @@ class UserExpenseCategoryAPI(http.Controller):
 
     ## 🔹 [PUT] Update an Existing User Expense Category
     @http.route('/api/easy_apps/user_categories/update/<int:category_id>', type='json', auth='public', methods=['PUT'], csrf=False)
+    @_instrumented
     def update_user_category(self, category_id, **kwargs):
         """Update an existing user expense category (JWT required)"""
         try:
@@ -83,6 +101,7 @@ class UserExpenseCategoryAPI(http.Controller):
 
     ## 🔹 [DELETE] Delete a User Expense Category
     @http.route('/api/easy_apps/user_categories/delete/<int:category_id>', type='json', auth='public', methods=['DELETE'], csrf=False)
+    @_instrumented
     def delete_user_category(self, category_id, **kwargs):
         """Delete a user expense category (JWT required)"""
         try:
@@ -2,7 +2,9 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import AccessDenied
 from .auth import JWTAuth
-from ._helpers import _http_success_response, _http_error_response
+from ._helpers import _http_success_response, _http_error_response, _http_not_modified_response, _catalog_etag
+from ._serializers import EXPENSE_FIELDS, EXPENSE_NAMES, _requested_fields, _search_read
+from ._instrumentation import _instrumented
 
 
 class UserExpenseAPI(http.Controller):
@@ -10,23 +12,36 @@ class UserExpenseAPI(http.Controller):
     ## 🔹 [GET] Retrieve User Expenses (Filtered by Category if Provided)
     @http.route('/api/easy_apps/user_expenses/category', type='http', auth='public', methods=['GET'], csrf=False)
     @http.route('/api/easy_apps/user_expenses/category/<int:category_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    @_instrumented
     def get_expenses_by_category(self, category_id=None, **kwargs):
-        """Retrieve user expenses filtered by category, or all if none provided (JWT required)"""
+        """Retrieve user expenses filtered by category, or all if none provided (JWT required, supports If-None-Match)"""
         try:
             user_data = JWTAuth.authenticate_request()
             user_id = user_data.get("user_id")
 
+            try:
+                output_fields = _requested_fields(kwargs, EXPENSE_FIELDS)
+            except ValueError as e:
+                return _http_error_response(str(e), 400)
+
+            # Conditional GET against the user's catalog version
+            etag = _catalog_etag(request.env['easy_expenses.user_expense']._get_catalog_version(user_id), user_id, output_fields)
+            not_modified = _http_not_modified_response(etag)
+            if not_modified:
+                return not_modified
+
             # If category_id is provided, filter by category; otherwise, get all
             domain = [('user_id', '=', user_id)]
             if category_id:
                 domain.append(('category_id', '=', category_id))
 
-            expenses = request.env['easy_expenses.user_expense'].sudo().search(domain)
+            # Category names resolved in one batch
+            expenses = _search_read(request.env['easy_expenses.user_expense'].sudo(), domain, output_fields, EXPENSE_NAMES)
 
             return _http_success_response(
-                [{'id': exp.id, 'name': exp.name, 'category_id': exp.category_id.id, 'category_name': exp.category_id.name}
-                for exp in expenses],
-                "User Expenses retrieved successfully"
+                expenses,
+                "User Expenses retrieved successfully",
+                headers={'ETag': etag}
             )
         except AccessDenied as e:
             return _http_error_response(str(e), 401)
@@ -35,6 +50,7 @@ class UserExpenseAPI(http.Controller):
 
     ## 🔹 [POST] Create a User Expense
     @http.route('/api/easy_apps/user_expenses/create', type='json', auth='public', methods=['POST'], csrf=False)
+    @_instrumented
     def create_user_expense(self, **kwargs):
         """Create a new user expense (JWT required)"""
         try:
@@ -67,6 +83,7 @@ class UserExpenseAPI(http.Controller):
 
     ## 🔹 [PUT] Update a User Expense
     @http.route('/api/easy_apps/user_expenses/update/<int:expense_id>', type='json', auth='public', methods=['PUT'], csrf=False)
+    @_instrumented
     def update_user_expense(self, expense_id, **kwargs):
         """Update an existing user expense (JWT required)"""
         try:
@@ -98,6 +115,7 @@ class UserExpenseAPI(http.Controller):
 
     ## 🔹 [DELETE] Delete a User Expense
     @http.route('/api/easy_apps/user_expenses/delete/<int:expense_id>', type='json', auth='public', methods=['DELETE'], csrf=False)
+    @_instrumented
     def delete_user_expense(self, expense_id, **kwargs):
         """Delete a user expense (JWT required)"""
         try:
@@ -0,0 +1,78 @@
+"""
+Per-worker caches of the JWT signing secret and of verified access tokens.
+
+Shared by the auth controller, which reads through them, and the models, which
+drop them when the secret changes; keyed by database name. The secret is re-read
+at most every SECRET_CACHE_TTL seconds (changes made in this worker invalidate it
+at once), and verified token payloads are kept in a bounded LRU until their 'exp'.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+import jwt
+
+SECRET_PARAM = 'easy_apps_secret_key'
+SECRET_CACHE_TTL = 60
+TOKEN_CACHE_SIZE = 1024
+_secret_cache = {}
+_token_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_secret_key(env):
+    """Signing secret of env's database, from the worker cache when still fresh"""
+    dbname = env.cr.dbname
+    cached = _secret_cache.get(dbname)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    secret = env['ir.config_parameter'].sudo().get_param(SECRET_PARAM, 'default_secret')
+    with _cache_lock:
+        if cached and cached[0] != secret:
+            _drop_cached_tokens(dbname)
+        _secret_cache[dbname] = (secret, time.monotonic() + SECRET_CACHE_TTL)
+    return secret
+
+
+def _invalidate_secret(dbname):
+    """Forget the cached secret of a database and every token verified with it"""
+    with _cache_lock:
+        _secret_cache.pop(dbname, None)
+        _drop_cached_tokens(dbname)
+
+
+def _drop_cached_tokens(dbname):
+    """Remove the verified tokens of a database from the LRU (caller holds the lock)"""
+    for key in [key for key in _token_cache if key[0] == dbname]:
+        del _token_cache[key]
+
+
+def _decode_token(env, token):
+    """
+    Verify a HS256 access token, skipping the signature check for recently verified tokens.
+    :return: The token payload, or None if it is invalid or expired.
+    """
+    secret = _get_secret_key(env)
+    key = (env.cr.dbname, token)
+    with _cache_lock:
+        payload = _token_cache.get(key)
+        if payload is not None:
+            if payload['exp'] > time.time():
+                _token_cache.move_to_end(key)
+                return payload
+            del _token_cache[key]
+            return None
+
+    try:
+        payload = jwt.decode(token, secret, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+    if isinstance(payload.get('exp'), (int, float)):
+        with _cache_lock:
+            _token_cache[key] = payload
+            if len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return payload
@@ -1,10 +1,389 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+import hashlib
+import secrets
+from datetime import timedelta
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError, AccessDenied
+from ..jwt_cache import SECRET_PARAM, _invalidate_secret
+
+REFRESH_TOKEN_LIFETIME = timedelta(days=30)
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+class ConfigParameter(models.Model):
+    """Drop the cached JWT secret when it is changed"""
+    _inherit = 'ir.config_parameter'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._invalidate_jwt_secret()
+        return records
+
+    def write(self, vals):
+        self._invalidate_jwt_secret()
+        res = super().write(vals)
+        self._invalidate_jwt_secret()
+        return res
+
+    def unlink(self):
+        self._invalidate_jwt_secret()
+        return super().unlink()
+
+    def _invalidate_jwt_secret(self):
+        if any(param.key == SECRET_PARAM for param in self):
+            _invalidate_secret(self.env.cr.dbname)
+
+
+class RefreshToken(models.Model):
+    """Long-lived, rotating API refresh tokens (only a hash of the token is stored)"""
+    _name = 'easy_expenses.refresh_token'
+    _description = 'API Refresh Token'
+
+    user_id = fields.Many2one('res.users', string="User", required=True, ondelete='cascade', index=True)
+    token_hash = fields.Char(string="Token Hash", required=True, copy=False)
+    expires_at = fields.Datetime(string="Expires At", required=True)
+    revoked = fields.Boolean(string="Revoked", default=False)
+
+    _sql_constraints = [
+        ('token_hash_unique', 'unique(token_hash)', 'Refresh token hashes must be unique.'),
+    ]
+
+    @staticmethod
+    def _hash(raw_token):
+        return hashlib.sha256(raw_token.encode()).hexdigest()
+
+    @api.model
+    def _issue(self, user):
+        """Create a refresh token for the user and return its raw value"""
+        raw_token = secrets.token_urlsafe(48)
+        self.create({
+            'user_id': user.id,
+            'token_hash': self._hash(raw_token),
+            'expires_at': fields.Datetime.now() + REFRESH_TOKEN_LIFETIME,
+        })
+        return raw_token
+
+    @api.model
+    def _rotate(self, raw_token):
+        """
+        Exchange a refresh token for a new one (one indexed lookup, no password check).
+        The token is consumed by a single conditional UPDATE, so of two concurrent
+        refreshes with the same token only one can win; the other, like any later
+        use of a rotated token, is treated as reuse and revokes every token of its user.
+        :return: (user, new raw refresh token)
+        :raises AccessDenied: If the token is unknown, expired or revoked.
+        """
+        token_hash = self._hash(raw_token)
+        self.env.cr.execute(f"""
+            UPDATE {self._table}
+               SET revoked = true, write_uid = %s, write_date = now() at time zone 'UTC'
+             WHERE token_hash = %s AND NOT revoked AND expires_at > now() at time zone 'UTC'
+         RETURNING user_id
+        """, [self.env.uid, token_hash])
+        row = self.env.cr.fetchone()
+        self.invalidate_model(['revoked'])
+        if not row:
+            self.env.cr.execute(f"""
+                SELECT user_id FROM {self._table}
+                 WHERE token_hash = %s AND revoked AND expires_at > now() at time zone 'UTC'
+            """, [token_hash])
+            reused = self.env.cr.fetchone()
+            if reused:
+                # Own cursor, so the revocation survives the rollback of the failed request
+                with self.env.registry.cursor() as cr:
+                    cr.execute(f"""
+                        UPDATE {self._table} SET revoked = true, write_date = now() at time zone 'UTC'
+                         WHERE user_id = %s AND NOT revoked
+                    """, [reused[0]])
+                raise AccessDenied("Refresh token reuse detected, please log in again")
+            raise AccessDenied("Invalid or expired refresh token")
+        user = self.env['res.users'].browse(row[0])
+        if not user.active:
+            raise AccessDenied("Invalid credentials")
+        return user, self._issue(user)
+
+    @api.model
+    def _revoke(self, raw_token):
+        """Revoke a refresh token, e.g. on logout"""
+        self.search([('token_hash', '=', self._hash(raw_token))], limit=1).write({'revoked': True})
+
+    @api.autovacuum
+    def _gc_expired_tokens(self):
+        """Purge refresh tokens that can no longer be used"""
+        self.search([('expires_at', '<', fields.Datetime.now())]).unlink()
+
+
+class ProfilingRequest(models.Model):
+    """
+    Admin switch capturing a cProfile profile and the SQL statements of the
+    next N API requests of a user and/or route, stored as attachments.
+    """
+    _name = 'easy_expenses.profiling_request'
+    _description = 'API Profiling Request'
+    _order = 'id desc'
+
+    name = fields.Char(string="Reason", required=True, default="API profiling")
+    user_id = fields.Many2one('res.users', string="User", ondelete='cascade',
+                              help="Only profile requests of this API user (any user when empty)")
+    route = fields.Char(string="Route",
+                        help="Route name as reported by the metrics, e.g. records.get_records (any route when empty)")
+    remaining = fields.Integer(string="Requests to Capture", default=5,
+                               help="Decremented by every captured request; profiling stops at zero")
+    captured = fields.Integer(string="Captured", default=0, readonly=True, copy=False)
+    attachment_ids = fields.One2many('ir.attachment', 'res_id', string="Profiles",
+                                     domain=[('res_model', '=', 'easy_expenses.profiling_request')])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'user_id', 'route', 'remaining'} & set(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _get_active_rules(self):
+        """(id, user_id, route) of the requests still capturing, cached until one changes"""
+        self.env.cr.execute(f"SELECT id, user_id, route FROM {self._table} WHERE remaining > 0 ORDER BY id")
+        return tuple(self.env.cr.fetchall())
+
+    @api.model
+    def _claim(self, rule_id):
+        """
+        Take one capture of a profiling request; atomic, so concurrent workers
+        never capture more than asked.
+        :return: True if a capture was claimed.
+        """
+        self.env.cr.execute(f"""
+            UPDATE {self._table} SET remaining = remaining - 1
+             WHERE id = %s AND remaining > 0
+         RETURNING remaining
+        """, [rule_id])
+        row = self.env.cr.fetchone()
+        if row and row[0] == 0:
+            self.env.registry.clear_cache()
+        return bool(row)
+
+    def _store_capture(self, name, profile_data, report):
+        """Attach one captured request: the binary .prof (pstats format) and the text report"""
+        self.ensure_one()
+        self.env['ir.attachment'].create([{
+            'name': f'{name}.prof',
+            'raw': profile_data,
+            'mimetype': 'application/octet-stream',
+            'res_model': self._name,
+            'res_id': self.id,
+        }, {
+            'name': f'{name}.txt',
+            'raw': report.encode(),
+            'mimetype': 'text/plain',
+            'res_model': self._name,
+            'res_id': self.id,
+        }])
+        self.env.cr.execute(f"UPDATE {self._table} SET captured = captured + 1 WHERE id = %s", [self.id])
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    easy_expenses_catalog_version = fields.Integer(
+        string="Expenses Catalog Version", default=0, copy=False,
+        help="Bumped whenever the user's custom categories or expenses change (used as API ETag)")
+    easy_expenses_records_version = fields.Integer(
+        string="Expense Records Version", default=0, copy=False,
+        help="Bumped whenever the user's expense records change (invalidates cached insights)")
+
+
+class CatalogVersionMixin(models.AbstractModel):
+    """
+    Bump a version counter on every create/write/unlink, so API clients can
+    revalidate catalogs with an ETag. Models with a user_id bump the owner's
+    counter; the others bump the global catalog counter.
+    The counters are read and written with plain SQL so a conditional GET
+    never needs to load records.
+    """
+    _name = 'easy_expenses.catalog_version_mixin'
+    _description = 'Catalog Version Tracking'
+
+    _GLOBAL_VERSION_KEY = 'easy_expenses.catalog_version'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._bump_catalog_version()
+        return records
+
+    def write(self, vals):
+        self._bump_catalog_version()
+        res = super().write(vals)
+        if 'user_id' in vals:
+            self._bump_catalog_version()
+        return res
+
+    def unlink(self):
+        self._bump_catalog_version()
+        return super().unlink()
+
+    def _bump_catalog_version(self):
+        if not self:
+            return
+        if 'user_id' in self._fields:
+            self.env.cr.execute("""
+                UPDATE res_users SET easy_expenses_catalog_version = COALESCE(easy_expenses_catalog_version, 0) + 1
+                 WHERE id IN %s
+            """, [tuple(set(self.mapped('user_id').ids))])
+            self.env['res.users'].invalidate_model(['easy_expenses_catalog_version'])
+        else:
+            self.env.cr.execute("""
+                INSERT INTO ir_config_parameter (key, value, create_uid, create_date, write_uid, write_date)
+                VALUES (%s, '1', %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+                ON CONFLICT (key) DO UPDATE SET value = (ir_config_parameter.value::integer + 1)::text
+            """, [self._GLOBAL_VERSION_KEY, self.env.uid, self.env.uid])
+
+    @api.model
+    def _get_catalog_version(self, user_id=None):
+        """Current version of the global catalog, or of a user's catalog when user_id is given"""
+        if user_id:
+            self.env.cr.execute("SELECT easy_expenses_catalog_version FROM res_users WHERE id = %s", [user_id])
+        else:
+            self.env.cr.execute("SELECT value FROM ir_config_parameter WHERE key = %s", [self._GLOBAL_VERSION_KEY])
+        row = self.env.cr.fetchone()
+        return int(row[0] or 0) if row else 0
+
+
+class DimensionNameMixin(models.AbstractModel):
+    """
+    Catalog entries whose name is copied onto the expense records' category
+    dimension. A rename updates the live and archived records with one SQL
+    UPDATE per table instead of an ORM recompute of every record using the
+    entry, and a deletion clears their key and name the same way (the
+    database nulls the reference itself, which the ORM never recomputes from).
+    The live records get a new write_date, so delta sync sends them again,
+    and their owners' records version is bumped.
+    """
+    _name = 'easy_expenses.dimension_name_mixin'
+    _description = 'Record Dimension Name Propagation'
+
+    # Record columns holding this catalog's key ("<prefix>:<id>") and name, and its id
+    _dimension_key_column = 'category_key'
+    _dimension_name_column = 'category_name'
+    _dimension_key_prefix = 'g'
+    _dimension_id_column = 'category_id'
+
+    def unlink(self):
+        # The records keep their amounts with a null reference (set null): move the
+        # entries' rollup buckets to the null-key buckets so the totals stay the same
+        self.env['easy_expenses.record_rollup']._detach_catalog_entries(self._dimension_id_column, self.ids)
+        user_ids = self._update_dimension_names(clear=True)
+        self.env['easy_expenses.record']._bump_records_version(user_ids)
+        return super().unlink()
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'name' in vals:
+            user_ids = self._update_dimension_names()
+            self.env['easy_expenses.record']._bump_records_version(user_ids)
+        return res
+
+    def _update_dimension_names(self, clear=False):
+        """
+        Copy the current names of these entries onto the records referencing them.
+        :param clear: Reset the records' key and name instead (the entries are being deleted).
+        :return: Ids of the users whose records changed.
+        """
+        if not self:
+            return set()
+        key_column, name_column = self._dimension_key_column, self._dimension_name_column
+        names = {f'{self._dimension_key_prefix}:{rec.id}': None if clear else rec.name for rec in self}
+        if clear:
+            assignment, changed = f'{key_column} = NULL, {name_column} = NULL', 'TRUE'
+        else:
+            assignment, changed = f'{name_column} = v.name', f'r.{name_column} IS DISTINCT FROM v.name'
+        user_filter = ''
+        params = [list(names), list(names.values())]
+        if 'user_id' in self._fields:
+            # Per-user catalogs: the records all belong to the entries' owners
+            user_filter = 'AND r.user_id IN %s'
+            params.append(tuple(set(self.mapped('user_id').ids)))
+        user_ids = set()
+        for model_name in ('easy_expenses.record', 'easy_expenses.record_archive'):
+            Model = self.env[model_name]
+            Model.flush_model([key_column, name_column])
+            # Live records get a new write_date so delta sync sends them again (the archive has none)
+            touch = (f", write_date = now() at time zone 'UTC', write_uid = {int(self.env.uid)}"
+                     if Model._log_access else '')
+            self.env.cr.execute(f"""
+                WITH updated AS (
+                    UPDATE "{Model._table}" r SET {assignment}{touch}
+                      FROM (SELECT unnest(%s::varchar[]) AS key, unnest(%s::varchar[]) AS name) v
+                     WHERE r.{key_column} = v.key AND {changed} {user_filter}
+                 RETURNING r.user_id
+                ) SELECT DISTINCT user_id FROM updated
+            """, params)
+            user_ids.update(row[0] for row in self.env.cr.fetchall())
+            Model.invalidate_model([key_column, name_column] + (['write_date', 'write_uid'] if Model._log_access else []))
+        return user_ids
+
+
+class SyncTombstone(models.Model):
+    """Deletion log read by the delta sync endpoint"""
+    _name = 'easy_expenses.sync_tombstone'
+    _description = 'Sync Deletion Log'
+    _order = 'id'
+    _retention = TOMBSTONE_RETENTION
+
+    user_id = fields.Many2one('res.users', string="User", required=True, ondelete='cascade')
+    res_model = fields.Char(string="Model", required=True)
+    res_id = fields.Integer(string="Record ID", required=True)
+
+    def init(self):
+        tools.create_index(self._cr, 'easy_expenses_sync_tombstone_user_date_idx',
+                           self._table, ['user_id', 'create_date'])
+
+    @api.autovacuum
+    def _gc_old_tombstones(self):
+        """Purge tombstones past the retention window; older watermarks must fully resync"""
+        self.search([('create_date', '<', fields.Datetime.now() - self._retention)]).unlink()
+
+
+class SyncMixin(models.AbstractModel):
+    """
+    Per-user rows that mobile clients synchronise by delta: indexes
+    (user_id, write_date) and logs a tombstone for every deleted row.
+    """
+    _name = 'easy_expenses.sync_mixin'
+    _description = 'Delta Sync Support'
+
+    def init(self):
+        super().init()
+        if self._abstract:
+            return
+        tools.create_index(self._cr, f'{self._table}_user_write_date_idx',
+                           self._table, ['user_id', 'write_date'])
+
+    def unlink(self):
+        if self:
+            self.env['easy_expenses.sync_tombstone'].sudo().create([
+                {'user_id': rec.user_id.id, 'res_model': self._name, 'res_id': rec.id}
+                for rec in self
+            ])
+        return super().unlink()
 
 
 class ExpenseCategory(models.Model):
     """General Expense Category"""
     _name = 'easy_expenses.category'
+    _inherit = ['easy_expenses.catalog_version_mixin', 'easy_expenses.dimension_name_mixin']
     _description = 'Global Expense Category'
     _order = 'name'
 
@@ -29,10 +408,10 @@ class ExpenseCategory(models.Model):
             {'name': 'Others', 'description': 'Expenses in a non-registered category'},
         ]
 
-        for category in default_categories:
-            existing_category = self.search([('name', '=', category['name'])], limit=1)
-            if not existing_category:
-                self.create(category)
+        existing_names = {category['name'] for category in self.search_read([], ['name'])}
+        missing = [category for category in default_categories if category['name'] not in existing_names]
+        if missing:
+            self.create(missing)
     @api.model
     def init(self):
         """Ensure default categories are created on module installation."""
@@ -42,8 +421,12 @@ class ExpenseCategory(models.Model):
 class Expense(models.Model):
     """Predefined Expenses"""
     _name = 'easy_expenses.expense'
+    _inherit = ['easy_expenses.catalog_version_mixin', 'easy_expenses.dimension_name_mixin']
     _description = 'Global Predefined Expense'
     _order = 'name'
+    _dimension_key_column = 'expense_key'
+    _dimension_name_column = 'expense_name'
+    _dimension_id_column = 'expense_id'
 
     name = fields.Char(string="Expense Name", required=True)
     category_id = fields.Many2one('easy_expenses.category', string="Category", required=True)
@@ -179,10 +562,21 @@ class Expense(models.Model):
             {'name': 'Others', 'category_name': 'Others'},
         ]
 
+        # One query for the categories, one for the existing expenses, one multi-create;
+        # duplicates are detected per (name, category) so each category gets its own 'Others'
+        category_ids = {category['name']: category['id']
+                        for category in self.env['easy_expenses.category'].search_read([], ['name'])}
+        existing = {(expense['name'], expense['category_id'])
+                    for expense in self.search_read([], ['name', 'category_id'], load=None)}
+
+        missing = []
         for expense in default_expenses:
-            category = self.env['easy_expenses.category'].search([('name', '=', expense['category_name'])], limit=1)
-            if category and not self.search([('name', '=', expense['name'])]):
-                self.create({'name': expense['name'], 'category_id': category.id})
+            key = (expense['name'], category_ids.get(expense['category_name']))
+            if key[1] and key not in existing:
+                existing.add(key)
+                missing.append({'name': key[0], 'category_id': key[1]})
+        if missing:
+            self.create(missing)
 
     @api.model
     def init(self):
@@ -192,31 +586,93 @@ class Expense(models.Model):
 class UserExpenseCategory(models.Model):
     """User-Created Expense Categories"""
     _name = 'easy_expenses.user_category'
+    _inherit = ['easy_expenses.catalog_version_mixin', 'easy_expenses.sync_mixin',
+                'easy_expenses.dimension_name_mixin']
     _description = 'User Custom Expense Category'
+    _dimension_key_prefix = 'u'
+    _dimension_id_column = 'user_category_id'
 
     name = fields.Char(string="Category Name", required=True)
     description = fields.Char(string="Category Description", required=False)
-    user_id = fields.Many2one('res.users', string="User", required=True, default=lambda self: self.env.user)
+    user_id = fields.Many2one('res.users', string="User", required=True, default=lambda self: self.env.user, index=True)
 
 
 class UserExpense(models.Model):
     """User-Created Expenses"""
     _name = 'easy_expenses.user_expense'
+    _inherit = ['easy_expenses.catalog_version_mixin', 'easy_expenses.sync_mixin',
+                'easy_expenses.dimension_name_mixin']
     _description = 'User Custom Expense'
+    _dimension_key_column = 'expense_key'
+    _dimension_name_column = 'expense_name'
+    _dimension_key_prefix = 'u'
+    _dimension_id_column = 'user_expense_id'
 
     name = fields.Char(string="Expense Name", required=True)
     category_id = fields.Many2one('easy_expenses.user_category', string="Category", required=True)
-    user_id = fields.Many2one('res.users', string="User", required=True, default=lambda self: self.env.user)
+    user_id = fields.Many2one('res.users', string="User", required=True, default=lambda self: self.env.user, index=True)
+
+
+import logging
+import threading
+from dateutil.relativedelta import relativedelta
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError, UserError
 
+_logger = logging.getLogger(__name__)
+
+# Fields whose change moves a record's amount between rollup buckets (and budgets)
+ROLLUP_TRACKED_FIELDS = {
+    'amount', 'date', 'user_id', 'category_type',
+    'category_id', 'user_category_id', 'expense_id', 'user_expense_id',
+}
+
+# Monthly partitions created ahead of the current month (opt-in partitioning)
+PARTITION_MONTHS_AHEAD = 12
+ARCHIVE_AFTER_MONTHS_PARAM = 'easy_expenses.archive_after_months'
+# Recurring expenses: templates handled per transaction, records per create() call
+RECURRING_TEMPLATE_CHUNK_SIZE = 1000
+RECURRING_RECORD_CHUNK_SIZE = 1000
+RECURRING_INTERVALS = {
+    'day': lambda count: relativedelta(days=count),
+    'week': lambda count: relativedelta(weeks=count),
+    'month': lambda count: relativedelta(months=count),
+    'year': lambda count: relativedelta(years=count),
+}
+# Columns moved to the archive table, in this order
+ARCHIVE_COLUMNS = ('id', 'user_id', 'date', 'amount', 'category_type', 'category_id', 'user_category_id',
+                   'expense_id', 'user_expense_id', 'note', 'recurring_id', 'category_key', 'expense_key',
+                   'category_name', 'expense_name')
+
+
+def _init_category_dimension(model):
+    """Create the category dimension columns of a records table and fill them in one statement"""
+    cr, table = model._cr, model._table
+    for name in ('category_key', 'expense_key', 'category_name', 'expense_name'):
+        tools.create_column(cr, table, name, 'varchar', model._fields[name].string)
+    cr.execute(f"""
+        UPDATE {table} r
+           SET category_key = CASE WHEN r.category_type = 'user' THEN 'u:' || r.user_category_id
+                                   ELSE 'g:' || r.category_id END,
+               expense_key = CASE WHEN r.category_type = 'user' THEN 'u:' || r.user_expense_id
+                                  ELSE 'g:' || r.expense_id END,
+               category_name = CASE WHEN r.category_type = 'user' THEN uc.name ELSE c.name END,
+               expense_name = CASE WHEN r.category_type = 'user' THEN ue.name ELSE e.name END
+          FROM {table} r2
+     LEFT JOIN easy_expenses_category c ON c.id = r2.category_id
+     LEFT JOIN easy_expenses_expense e ON e.id = r2.expense_id
+     LEFT JOIN easy_expenses_user_category uc ON uc.id = r2.user_category_id
+     LEFT JOIN easy_expenses_user_expense ue ON ue.id = r2.user_expense_id
+         WHERE r2.id = r.id
+    """)
 
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
 
 class ExpenseRecord(models.Model):
     """Records of actual expenses"""
     _name = 'easy_expenses.record'
+    _inherit = ['easy_expenses.sync_mixin']
     _description = 'Expense Record'
-    _order = 'date desc'
+    _order = 'date desc, id desc'
 
     category_type = fields.Selection(
         [('global', 'Global Category'), ('user', 'User Category')],
@@ -242,10 +698,314 @@ class ExpenseRecord(models.Model):
     date = fields.Datetime(string="Date", required=True, default=fields.Datetime.now)
     note = fields.Text(string="Note", help="Optional notes about the expense")
     user_id = fields.Many2one('res.users', string="User", default=lambda self: self.env.user, required=True)
+    import_hash = fields.Char(string="Import Hash", copy=False, readonly=True,
+                              help="Fingerprint of the statement line this record was imported from")
+    recurring_id = fields.Many2one('easy_expenses.recurring_expense', string="Recurring Expense",
+                                   ondelete='set null', copy=False, readonly=True)
+
+    # Unified category dimension: one column whatever the category_type, "g:<id>" or "u:<id>"
+    category_key = fields.Char(string="Category Key", compute='_compute_category_dimension', store=True)
+    expense_key = fields.Char(string="Expense Key", compute='_compute_category_dimension', store=True)
+    category_name = fields.Char(string="Category", compute='_compute_category_dimension', store=True)
+    expense_name = fields.Char(string="Expense", compute='_compute_category_dimension', store=True)
+
+    def init(self):
+        """Composite indexes backing the per-user API filters and the keyset pagination order"""
+        super().init()
+        tools.create_index(self._cr, 'easy_expenses_record_user_date_idx',
+                           self._table, ['user_id', 'date DESC', 'id DESC'])
+        tools.create_index(self._cr, 'easy_expenses_record_user_category_date_idx',
+                           self._table, ['user_id', 'category_id', 'date'])
+        tools.create_index(self._cr, 'easy_expenses_record_user_user_category_date_idx',
+                           self._table, ['user_id', 'user_category_id', 'date'])
+        # One record per recurring occurrence, even if a generation run is replayed
+        tools.create_unique_index(self._cr, 'easy_expenses_record_recurring_date_uniq',
+                                  self._table, ['recurring_id', 'date'])
+        tools.create_index(self._cr, 'easy_expenses_record_user_category_key_date_idx',
+                           self._table, ['user_id', 'category_key', 'date'])
+        tools.create_index(self._cr, 'easy_expenses_record_user_expense_key_date_idx',
+                           self._table, ['user_id', 'expense_key', 'date'])
+        # Unique indexes of a partitioned table must contain the partition key;
+        # the hash covers the date already, so adding it changes nothing
+        tools.create_unique_index(self._cr, 'easy_expenses_record_user_import_hash_uniq', self._table,
+                                  ['user_id', 'import_hash', 'date'] if self._is_partitioned() else
+                                  ['user_id', 'import_hash'])
+
+    # -------------------------------------------------------------------------
+    # Opt-in monthly range partitioning by date
+    # -------------------------------------------------------------------------
+
+    def _auto_init(self):
+        columns = tools.table_columns(self._cr, self._table) if tools.table_exists(self._cr, self._table) else {}
+        if columns and 'category_key' not in columns:
+            # Fill the category dimension of existing rows in one statement instead of an ORM recompute
+            _init_category_dimension(self)
+            columns = tools.table_columns(self._cr, self._table)
+        # The ORM may leave a partitioned table's schema alone: add the columns of new stored fields
+        if columns and self._is_partitioned():
+            for field in self._fields.values():
+                if field.store and field.column_type and field.name not in columns:
+                    tools.create_column(self._cr, self._table, field.name, field.column_type[1], field.string)
+        return super()._auto_init()
+
+    def _is_partitioned(self):
+        self._cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", [self._table])
+        row = self._cr.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @api.model
+    def action_enable_partitioning(self):
+        """Server action: convert the records table to monthly range partitions"""
+        if self._is_partitioned():
+            raise UserError("Expense records are already partitioned.")
+        self._partition_table()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': "Expense records partitioned",
+                'message': "Records are now stored in monthly partitions by date.",
+                'sticky': False,
+            },
+        }
+
+    @api.model
+    def _partition_table(self):
+        """
+        Rebuild the records table as a table partitioned by range of date.
+        The ORM keeps reading and writing the parent table; PostgreSQL routes
+        rows to their month and prunes partitions on date filters. Runs in the
+        current transaction and locks the table for the duration of the copy.
+        """
+        self.flush_model()
+        cr = self._cr
+        table, legacy = self._table, f'{self._table}_unpartitioned'
+        cr.execute("SELECT conrelid::regclass::text FROM pg_constraint WHERE confrelid = %s::regclass", [table])
+        referencing = [row[0] for row in cr.fetchall()]
+        if referencing:
+            # The primary key becomes (id, date), which foreign keys cannot target
+            raise UserError(f"Cannot partition {table}: referenced by {', '.join(referencing)}.")
+
+        cr.execute(f'LOCK TABLE "{table}" IN ACCESS EXCLUSIVE MODE')
+        cr.execute("""
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+             WHERE conrelid = %s::regclass AND contype = 'f'
+        """, [table])
+        foreign_keys = cr.fetchall()
+        cr.execute("""
+            SELECT indexdef FROM pg_indexes
+             WHERE tablename = %s AND indexdef NOT LIKE 'CREATE UNIQUE %%'
+        """, [table])
+        index_definitions = [row[0] for row in cr.fetchall()]
+
+        cr.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+        # Free the primary key name, so the new key gets it rather than "{table}_pkey1"
+        cr.execute(f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{table}_pkey" TO "{legacy}_pkey"')
+        cr.execute(f"""
+            CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE (date)
+        """)
+        cr.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, date)')
+        cr.execute(f'CREATE TABLE "{table}_pdefault" PARTITION OF "{table}" DEFAULT')
+        cr.execute(f'SELECT MIN(date) FROM "{legacy}"')
+        oldest = cr.fetchone()[0]
+        self._ensure_partitions(oldest.date() if oldest else None)
+        cr.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+        cr.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+        cr.execute(f'DROP TABLE "{legacy}"')
+
+        # Recreate what LIKE does not copy, under the original names
+        for name, definition in foreign_keys:
+            cr.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+        for definition in index_definitions:
+            cr.execute(definition.replace(f'public.{legacy}', f'public.{table}').replace(f' {legacy} ', f' {table} '))
+        self.init()
+        cr.execute(f'ANALYZE "{table}"')
+        _logger.info("Partitioned %s by month", table)
+
+    @api.model
+    def _ensure_partitions(self, since=None):
+        """
+        Create the monthly partitions from `since` (default: this month) to
+        PARTITION_MONTHS_AHEAD months ahead. Rows that went to the default
+        partition meanwhile are moved into their new month.
+        """
+        cr = self._cr
+        table = self._table
+        month = (since or fields.Date.today()).replace(day=1)
+        last = fields.Date.today().replace(day=1) + relativedelta(months=PARTITION_MONTHS_AHEAD)
+        cr.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass", [table])
+        existing = {row[0] for row in cr.fetchall()}
+        while month <= last:
+            partition = f'{table}_p{month:%Y%m}'
+            following = month + relativedelta(months=1)
+            if partition not in existing:
+                cr.execute(f'CREATE TABLE "{partition}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+                cr.execute(f"""
+                    WITH moved AS (
+                        DELETE FROM "{table}_pdefault" WHERE date >= %s AND date < %s RETURNING *
+                    ) INSERT INTO "{partition}" SELECT * FROM moved
+                """, [month, following])
+                cr.execute(f"""
+                    ALTER TABLE "{table}" ATTACH PARTITION "{partition}" FOR VALUES FROM (%s) TO (%s)
+                """, [month, following])
+            month = following
+
+    @api.model
+    def _cron_maintain_partitions(self):
+        """Scheduled action: keep a year of future partitions (no-op unless partitioned)"""
+        if self._is_partitioned():
+            self._ensure_partitions()
+
+    # -------------------------------------------------------------------------
+    # Cold archiving
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _cron_archive_old_records(self):
+        """
+        Scheduled action: move records older than the `easy_expenses.archive_after_months`
+        parameter (0 disables it) to easy_expenses.record_archive, one month per
+        transaction. Archived records keep counting in every aggregate (rollups,
+        summaries, budgets), so only the records table changes; a sync tombstone
+        is logged per row so clients drop them, and emptied partitions are dropped.
+        """
+        months = int(self.env['ir.config_parameter'].sudo().get_param(ARCHIVE_AFTER_MONTHS_PARAM, 0) or 0)
+        if months <= 0:
+            return
+        cutoff = fields.Date.today().replace(day=1) - relativedelta(months=months)
+        self.flush_model()
+        cr = self._cr
+        table, archive_table = self._table, self.env['easy_expenses.record_archive']._table
+        tombstone_table = self.env['easy_expenses.sync_tombstone']._table
+        partitioned = self._is_partitioned()
+        columns = ', '.join(ARCHIVE_COLUMNS)
+
+        cr.execute(f'SELECT MIN(date) FROM "{table}" WHERE date < %s', [cutoff])
+        oldest = cr.fetchone()[0]
+        month = oldest and oldest.date().replace(day=1)
+        while month and month < cutoff:
+            following = month + relativedelta(months=1)
+            cr.execute(f"""
+                WITH moved AS (
+                    DELETE FROM "{table}" WHERE date >= %s AND date < %s RETURNING {columns}
+                ), archived AS (
+                    INSERT INTO "{archive_table}" ({columns}) SELECT {columns} FROM moved
+                ), tombstones AS (
+                    INSERT INTO "{tombstone_table}" (user_id, res_model, res_id,
+                                                     create_uid, create_date, write_uid, write_date)
+                    SELECT user_id, %s, id, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC' FROM moved
+                ) SELECT user_id, COUNT(*) FROM moved GROUP BY user_id
+            """, [month, following, self._name, self.env.uid, self.env.uid])
+            moved_per_user = dict(cr.fetchall())
+            moved = sum(moved_per_user.values())
+            self._bump_records_version(set(moved_per_user))
+            if partitioned:
+                partition = f'{table}_p{month:%Y%m}'
+                cr.execute("SELECT 1 FROM pg_class WHERE relname = %s", [partition])
+                if cr.fetchone():
+                    cr.execute(f'DROP TABLE "{partition}"')
+            if not getattr(threading.current_thread(), 'testing', False):
+                cr.commit()
+            _logger.info("Archived %s expense record(s) of %s", moved, f'{month:%Y-%m}')
+            month = following
+        self.env.invalidate_all()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['easy_expenses.record_rollup']._add_buckets(records._rollup_buckets())
+        self.env['easy_expenses.budget']._add_spending(records._budget_spending())
+        records._bump_records_version()
+        return records
+
+    def write(self, vals):
+        if not ROLLUP_TRACKED_FIELDS.intersection(vals):
+            return super().write(vals)
+        old_buckets = self._rollup_buckets()
+        old_spending = self._budget_spending(sign=-1)
+        old_spending_users = {user_id for user_id, _key, _day in old_spending}
+        res = super().write(vals)
+        Rollup = self.env['easy_expenses.record_rollup']
+        Rollup._remove_buckets(old_buckets)
+        Rollup._add_buckets(self._rollup_buckets())
+        spending = old_spending
+        for key, amount in self._budget_spending().items():
+            spending[key] = spending.get(key, 0.0) + amount
+        self.env['easy_expenses.budget']._add_spending(spending)
+        self._bump_records_version(old_spending_users | set(self.mapped('user_id').ids))
+        return res
+
+    def unlink(self):
+        old_buckets = self._rollup_buckets()
+        old_spending = self._budget_spending(sign=-1)
+        user_ids = set(self.mapped('user_id').ids)
+        res = super().unlink()
+        self.env['easy_expenses.record_rollup']._remove_buckets(old_buckets)
+        self.env['easy_expenses.budget']._add_spending(old_spending)
+        self._bump_records_version(user_ids)
+        return res
+
+    def _rollup_buckets(self):
+        """Aggregate these records into {bucket key: [total, count, min, max]}"""
+        buckets = {}
+        for rec in self:
+            key = (rec.user_id.id, rec.date.date().replace(day=1), rec.category_type,
+                   rec.category_id.id or None, rec.user_category_id.id or None,
+                   rec.expense_id.id or None, rec.user_expense_id.id or None)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [rec.amount, 1, rec.amount, rec.amount]
+            else:
+                bucket[0] += rec.amount
+                bucket[1] += 1
+                bucket[2] = min(bucket[2], rec.amount)
+                bucket[3] = max(bucket[3], rec.amount)
+        return buckets
+
+    def _bump_records_version(self, user_ids=None):
+        """Bump the records version of the given users (default: the owners of these records)"""
+        user_ids = tuple(user_ids if user_ids is not None else set(self.mapped('user_id').ids))
+        if not user_ids:
+            return
+        self.env.cr.execute("""
+            UPDATE res_users SET easy_expenses_records_version = COALESCE(easy_expenses_records_version, 0) + 1
+             WHERE id IN %s
+        """, [user_ids])
+        self.env['res.users'].invalidate_model(['easy_expenses_records_version'])
+
+    @api.model
+    def _get_records_version(self, user_id):
+        """Current records version of a user, read without loading the user"""
+        self.env.cr.execute("SELECT easy_expenses_records_version FROM res_users WHERE id = %s", [user_id])
+        row = self.env.cr.fetchone()
+        return int(row[0] or 0) if row else 0
+
+    def _budget_spending(self, sign=1):
+        """Signed amounts of these records per {(user_id, category_key, day): amount}"""
+        spending = {}
+        for rec in self:
+            key = (rec.user_id.id, rec.category_key or None, rec.date.date())
+            spending[key] = spending.get(key, 0.0) + sign * rec.amount
+        return spending
+
+    # Not on the catalogs' names: a rename is copied in SQL by easy_expenses.dimension_name_mixin,
+    # so it does not recompute every record through the ORM
+    @api.depends('category_type', 'category_id', 'user_category_id', 'expense_id', 'user_expense_id')
+    def _compute_category_dimension(self):
+        for rec in self:
+            if rec.category_type == 'user':
+                category, expense, prefix = rec.user_category_id, rec.user_expense_id, 'u'
+            else:
+                category, expense, prefix = rec.category_id, rec.expense_id, 'g'
+            rec.category_key = f'{prefix}:{category.id}' if category else False
+            rec.expense_key = f'{prefix}:{expense.id}' if expense else False
+            rec.category_name = category.name or False
+            rec.expense_name = expense.name or False
 
     @api.onchange('category_type')
     def _onchange_category_type(self):
-        """Reset category and expenses when switching category type"""
+        """Reset category and expenses (and so the category dimension) when switching category type"""
         self.category_id = False
         self.user_category_id = False
         self.expense_id = False
@@ -270,3 +1030,570 @@ class ExpenseRecord(models.Model):
             if record.amount <= 0:
                 raise ValidationError("The expense amount must be greater than zero.")
 
+
+
+class RecurringExpense(models.Model):
+    """Template generating an expense record on every occurrence (rent, subscriptions, loans...)"""
+    _name = 'easy_expenses.recurring_expense'
+    _description = 'Recurring Expense'
+    _order = 'next_date, id'
+
+    name = fields.Char(string="Name", required=True)
+    active = fields.Boolean(string="Active", default=True)
+    user_id = fields.Many2one('res.users', string="User", required=True, default=lambda self: self.env.user,
+                              ondelete='cascade', index=True)
+    category_type = fields.Selection(
+        [('global', 'Global Category'), ('user', 'User Category')],
+        string="Category Type",
+        required=True,
+        default='global'
+    )
+    category_id = fields.Many2one('easy_expenses.category', string="Global Category")
+    user_category_id = fields.Many2one('easy_expenses.user_category', string="User Category")
+    expense_id = fields.Many2one('easy_expenses.expense', string="Global Expense",
+                                 domain="[('category_id', '=', category_id)]")
+    user_expense_id = fields.Many2one('easy_expenses.user_expense', string="Custom Expense",
+                                      domain="[('category_id', '=', user_category_id)]")
+    amount = fields.Float(string="Amount", required=True)
+    note = fields.Text(string="Note")
+
+    interval_number = fields.Integer(string="Repeat Every", required=True, default=1)
+    interval_type = fields.Selection(
+        [('day', 'Days'), ('week', 'Weeks'), ('month', 'Months'), ('year', 'Years')],
+        string="Interval Unit",
+        required=True,
+        default='month'
+    )
+    start_date = fields.Date(string="First Occurrence", required=True, default=fields.Date.context_today)
+    end_date = fields.Date(string="Last Occurrence", help="No occurrence is generated after this date")
+    occurrence_count = fields.Integer(string="Generated Occurrences", default=0, readonly=True, copy=False)
+    next_date = fields.Date(string="Next Due Date", readonly=True, copy=False,
+                            compute='_compute_next_date', store=True)
+
+    def init(self):
+        """Due-date index read by the generator, restricted to the templates it can pick"""
+        tools.create_index(self._cr, 'easy_expenses_recurring_expense_due_idx',
+                           self._table, ['next_date', 'id'], where='active')
+
+    @api.depends('start_date', 'interval_number', 'interval_type')
+    def _compute_next_date(self):
+        # Rule changes restart the schedule from the first occurrence not generated yet
+        for template in self:
+            template.next_date = template._occurrence_date(template.occurrence_count)
+
+    def _occurrence_date(self, index):
+        """Date of the index-th occurrence, computed from start_date so month ends do not drift"""
+        if not self.start_date:
+            return False
+        return self.start_date + RECURRING_INTERVALS[self.interval_type](index * max(self.interval_number, 1))
+
+    @api.constrains('amount', 'interval_number')
+    def _check_rule(self):
+        for template in self:
+            if template.amount <= 0:
+                raise ValidationError("The expense amount must be greater than zero.")
+            if template.interval_number < 1:
+                raise ValidationError("The repeat interval must be at least 1.")
+
+    @api.onchange('category_type')
+    def _onchange_category_type(self):
+        """Reset category and expenses when switching category type"""
+        self.category_id = False
+        self.user_category_id = False
+        self.expense_id = False
+        self.user_expense_id = False
+
+    def _occurrence_vals(self, date):
+        """Create values of the expense record of one occurrence"""
+        is_user = self.category_type == 'user'
+        return {
+            'user_id': self.user_id.id,
+            'category_type': self.category_type,
+            'category_id': False if is_user else self.category_id.id,
+            'expense_id': False if is_user else self.expense_id.id,
+            'user_category_id': self.user_category_id.id if is_user else False,
+            'user_expense_id': self.user_expense_id.id if is_user else False,
+            'amount': self.amount,
+            'note': self.note or self.name,
+            'date': fields.Datetime.to_datetime(date),
+            'recurring_id': self.id,
+        }
+
+    @api.model
+    def _cron_generate_records(self):
+        """
+        Scheduled action: create the expense records of every due occurrence, up to today.
+        Due templates are read RECURRING_TEMPLATE_CHUNK_SIZE at a time through the
+        due-date index. Each chunk multi-creates its records, advances its schedules
+        with one UPDATE and commits, so an interrupted run resumes where it stopped;
+        occurrences already present (unique recurring_id/date) are never created twice.
+        """
+        today = fields.Date.today()
+        Record = self.env['easy_expenses.record'].sudo()
+        cr = self.env.cr
+        total = 0
+        while True:
+            templates = self.search([('active', '=', True), ('next_date', '<=', today)],
+                                    order='next_date, id', limit=RECURRING_TEMPLATE_CHUNK_SIZE)
+            if not templates:
+                break
+
+            vals_list = []
+            schedules = []
+            for template in templates:
+                count = template.occurrence_count
+                date = template.next_date
+                while date <= today and (not template.end_date or date <= template.end_date):
+                    vals_list.append(template._occurrence_vals(date))
+                    count += 1
+                    date = template._occurrence_date(count)
+                schedules.append((template.id, count, date, not template.end_date or date <= template.end_date))
+
+            if vals_list:
+                # Occurrences created by a replayed chunk, in one lookup
+                cr.execute("""
+                    SELECT recurring_id, date FROM easy_expenses_record
+                     WHERE recurring_id IN %s AND date >= %s
+                """, [tuple(templates.ids), min(vals['date'] for vals in vals_list)])
+                existing = set(cr.fetchall())
+                vals_list = [vals for vals in vals_list if (vals['recurring_id'], vals['date']) not in existing]
+            for start in range(0, len(vals_list), RECURRING_RECORD_CHUNK_SIZE):
+                Record.create(vals_list[start:start + RECURRING_RECORD_CHUNK_SIZE])
+
+            cr.execute(f"""
+                UPDATE {self._table} t
+                   SET occurrence_count = v.occurrence_count, next_date = v.next_date, active = v.active,
+                       write_uid = %s, write_date = now() at time zone 'UTC'
+                  FROM (VALUES {', '.join(['(%s, %s, %s::date, %s)'] * len(schedules))})
+                    AS v(id, occurrence_count, next_date, active)
+                 WHERE t.id = v.id
+            """, [self.env.uid] + [value for schedule in schedules for value in schedule])
+            if not getattr(threading.current_thread(), 'testing', False):
+                cr.commit()
+            total += len(vals_list)
+            # Keep the ORM cache from growing with the number of occurrences
+            self.env.invalidate_all()
+        _logger.info("Generated %s recurring expense record(s)", total)
+
+
+class Budget(models.Model):
+    """
+    Spending limit of a user over a period, for one global or user category
+    (or all spending). `spent` is a running counter adjusted by delta on every
+    expense record change, so reading a budget never aggregates records.
+    """
+    _name = 'easy_expenses.budget'
+    _description = 'Expense Budget'
+    _order = 'date_from desc, id'
+
+    name = fields.Char(string="Name", required=True)
+    user_id = fields.Many2one('res.users', string="User", required=True, default=lambda self: self.env.user,
+                              ondelete='cascade')
+    category_type = fields.Selection(
+        [('global', 'Global Category'), ('user', 'User Category')],
+        string="Category Type",
+        help="Leave empty to budget all of the user's spending"
+    )
+    category_id = fields.Many2one('easy_expenses.category', string="Global Category", ondelete='cascade')
+    user_category_id = fields.Many2one('easy_expenses.user_category', string="User Category", ondelete='cascade')
+    category_key = fields.Char(string="Category Key", compute='_compute_category_key', store=True)
+    date_from = fields.Date(string="From", required=True)
+    date_to = fields.Date(string="To", required=True)
+    amount_limit = fields.Float(string="Budget", required=True)
+    alert_threshold = fields.Float(string="Alert Threshold (%)", default=80.0,
+                                   help="Raise a warning once this share of the budget is spent")
+    spent = fields.Float(string="Spent", readonly=True, copy=False)
+    alert_state = fields.Selection(
+        [('ok', 'Within Budget'), ('warning', 'Threshold Reached'), ('exceeded', 'Exceeded')],
+        string="Status", default='ok', readonly=True, copy=False
+    )
+    alert_ids = fields.One2many('easy_expenses.budget_alert', 'budget_id', string="Alerts")
+
+    # Status from the spent counter, in SQL so the delta UPDATE can set it in the same statement
+    _STATE_SQL = ("CASE WHEN {spent} >= b.amount_limit THEN 'exceeded' "
+                  "WHEN {spent} >= b.amount_limit * b.alert_threshold / 100 THEN 'warning' ELSE 'ok' END")
+    _STATE_RANK = {'ok': 0, 'warning': 1, 'exceeded': 2}
+    # Archived records still count in the budgets, so spending is summed over both tables
+    _RECORDS_SQL = ("(SELECT user_id, date, category_key, amount FROM easy_expenses_record UNION ALL "
+                    "SELECT user_id, date, category_key, amount FROM easy_expenses_record_archive) AS r")
+
+    def init(self):
+        """Lookup index of the delta UPDATE run by every expense record change"""
+        tools.create_index(self._cr, 'easy_expenses_budget_user_category_period_idx',
+                           self._table, ['user_id', 'category_key', 'date_from', 'date_to'])
+
+    @api.depends('category_type', 'category_id', 'user_category_id')
+    def _compute_category_key(self):
+        for budget in self:
+            if budget.category_type == 'user' and budget.user_category_id:
+                budget.category_key = f'u:{budget.user_category_id.id}'
+            elif budget.category_type == 'global' and budget.category_id:
+                budget.category_key = f'g:{budget.category_id.id}'
+            else:
+                budget.category_key = False
+
+    @api.constrains('date_from', 'date_to', 'amount_limit')
+    def _check_budget(self):
+        for budget in self:
+            if budget.date_to < budget.date_from:
+                raise ValidationError("The budget period must end after it starts.")
+            if budget.amount_limit <= 0:
+                raise ValidationError("The budget amount must be greater than zero.")
+
+    @api.onchange('category_type')
+    def _onchange_category_type(self):
+        """Reset the categories when switching category type"""
+        self.category_id = False
+        self.user_category_id = False
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        budgets = super().create(vals_list)
+        budgets._recompute_spent()
+        return budgets
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'user_id', 'category_type', 'category_id', 'user_category_id',
+                'date_from', 'date_to', 'amount_limit', 'alert_threshold'} & set(vals):
+            self._recompute_spent()
+        return res
+
+    def _recompute_spent(self):
+        """Reset the counters from the live and archived records, once per budget creation or redefinition"""
+        if not self:
+            return
+        self.flush_recordset()
+        for model_name in ('easy_expenses.record', 'easy_expenses.record_archive'):
+            self.env[model_name].flush_model(['user_id', 'category_key', 'date', 'amount'])
+        self.env.cr.execute(f"""
+            UPDATE {self._table} b
+               SET spent = s.spent, alert_state = {self._STATE_SQL.format(spent='s.spent')}
+              FROM (
+                    SELECT b2.id, COALESCE(SUM(r.amount), 0) AS spent
+                      FROM {self._table} b2
+                 LEFT JOIN {self._RECORDS_SQL}
+                        ON r.user_id = b2.user_id AND r.date >= b2.date_from AND r.date < b2.date_to + 1
+                       AND (b2.category_key IS NULL OR r.category_key = b2.category_key)
+                     WHERE b2.id IN %s
+                  GROUP BY b2.id
+                   ) s
+             WHERE b.id = s.id
+        """, [tuple(self.ids)])
+        self.invalidate_recordset(['spent', 'alert_state'])
+
+    @api.model
+    def _add_spending(self, spending):
+        """
+        Apply {(user_id, category_key, day): signed amount} deltas to every matching
+        budget with one UPDATE, and raise an alert for each budget whose status rose.
+        """
+        spending = {key: amount for key, amount in spending.items() if amount}
+        if not spending:
+            return
+        self.env.cr.execute(f"""
+            UPDATE {self._table} b
+               SET spent = b.spent + d.delta, alert_state = {self._STATE_SQL.format(spent='(b.spent + d.delta)')}
+              FROM (
+                    SELECT b2.id, b2.alert_state AS old_state, SUM(v.amount) AS delta
+                      FROM {self._table} b2
+                      JOIN (VALUES {', '.join(['(%s, %s, %s::date, %s)'] * len(spending))})
+                        AS v(user_id, category_key, day, amount)
+                        ON b2.user_id = v.user_id AND v.day BETWEEN b2.date_from AND b2.date_to
+                       AND (b2.category_key IS NULL OR b2.category_key = v.category_key)
+                  GROUP BY b2.id, b2.alert_state
+                   ) d
+             WHERE b.id = d.id
+         RETURNING b.id, b.user_id, d.old_state, b.alert_state, b.spent, b.amount_limit
+        """, [value for (user_id, category_key, day), amount in spending.items()
+              for value in (user_id, category_key, day, amount)])
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return
+        self.invalidate_model(['spent', 'alert_state'])
+        alerts = [
+            {'budget_id': budget_id, 'user_id': user_id, 'level': new_state, 'spent': spent, 'amount_limit': limit}
+            for budget_id, user_id, old_state, new_state, spent, limit in rows
+            if self._STATE_RANK[new_state] > self._STATE_RANK[old_state]
+        ]
+        if alerts:
+            self.env['easy_expenses.budget_alert'].sudo().create(alerts)
+
+    @api.model
+    def action_recompute_spent(self):
+        """Server action: reset every budget counter from the live and archived records"""
+        self.search([])._recompute_spent()
+
+
+class BudgetAlert(models.Model):
+    """A budget reaching its alert threshold or its limit"""
+    _name = 'easy_expenses.budget_alert'
+    _description = 'Budget Alert'
+    _order = 'id desc'
+
+    budget_id = fields.Many2one('easy_expenses.budget', string="Budget", required=True, ondelete='cascade',
+                                index=True)
+    user_id = fields.Many2one('res.users', string="User", required=True, ondelete='cascade')
+    level = fields.Selection([('warning', 'Threshold Reached'), ('exceeded', 'Exceeded')],
+                             string="Level", required=True)
+    spent = fields.Float(string="Spent")
+    amount_limit = fields.Float(string="Budget")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        alerts = super().create(vals_list)
+        for alert in alerts:
+            _logger.info("Budget %s of user %s: %s (%.2f of %.2f)", alert.budget_id.id, alert.user_id.id,
+                         alert.level, alert.spent, alert.amount_limit)
+        return alerts
+
+
+class ExpenseRecordRollup(models.Model):
+    """Monthly spending totals, maintained by delta from expense record writes"""
+    _name = 'easy_expenses.record_rollup'
+    _description = 'Monthly Expense Rollup'
+    _order = 'month desc'
+
+    user_id = fields.Many2one('res.users', string="User", required=True, ondelete='cascade')
+    month = fields.Date(string="Month", required=True, help="First day of the month (UTC)")
+    category_type = fields.Selection(
+        [('global', 'Global Category'), ('user', 'User Category')],
+        string="Category Type",
+        required=True
+    )
+    # Set null like the records' references; deleted catalog entries are detached first (_detach_catalog_entries)
+    category_id = fields.Many2one('easy_expenses.category', string="Global Category", ondelete='set null')
+    user_category_id = fields.Many2one('easy_expenses.user_category', string="User Category", ondelete='set null')
+    expense_id = fields.Many2one('easy_expenses.expense', string="Global Expense", ondelete='set null')
+    user_expense_id = fields.Many2one('easy_expenses.user_expense', string="Custom Expense", ondelete='set null')
+
+    amount_total = fields.Float(string="Total Amount")
+    record_count = fields.Integer(string="Records")
+    amount_min = fields.Float(string="Smallest Amount")
+    amount_max = fields.Float(string="Largest Amount")
+
+    # Bucket identity; nullable keys are coalesced so they can take part in the unique index
+    _BUCKET_KEY = ("user_id, month, category_type, COALESCE(category_id, 0), COALESCE(user_category_id, 0), "
+                   "COALESCE(expense_id, 0), COALESCE(user_expense_id, 0)")
+    # Bucket identity of the delta rows joined by _remove_buckets (keys coalesced like the index)
+    _BUCKET_JOIN = ("r.user_id = v.user_id AND r.month = v.month AND r.category_type = v.category_type "
+                    "AND COALESCE(r.category_id, 0) = v.category_id "
+                    "AND COALESCE(r.user_category_id, 0) = v.user_category_id "
+                    "AND COALESCE(r.expense_id, 0) = v.expense_id "
+                    "AND COALESCE(r.user_expense_id, 0) = v.user_expense_id")
+    _DELTA_ROW = "(%s, %s::date, %s, %s::integer, %s::integer, %s::integer, %s::integer, %s::float, %s::integer, %s::float, %s::float)"
+    # Archived records still count in the rollups, so buckets are computed over both tables
+    _RECORDS_SQL = ("(SELECT user_id, date, category_type, category_id, user_category_id, expense_id, "
+                    "user_expense_id, amount FROM easy_expenses_record UNION ALL "
+                    "SELECT user_id, date, category_type, category_id, user_category_id, expense_id, "
+                    "user_expense_id, amount FROM easy_expenses_record_archive) AS records")
+
+    def init(self):
+        """Unique bucket index, also used as the ON CONFLICT target of the delta upsert"""
+        tools.create_unique_index(self._cr, 'easy_expenses_record_rollup_bucket_uniq', self._table, [
+            'user_id', 'month', 'category_type', 'COALESCE(category_id, 0)', 'COALESCE(user_category_id, 0)',
+            'COALESCE(expense_id, 0)', 'COALESCE(user_expense_id, 0)',
+        ])
+
+    @api.model
+    def _add_buckets(self, buckets):
+        """Add {bucket key: [total, count, min, max]} deltas with one upsert, creating buckets as needed"""
+        if not buckets:
+            return
+        # Keys are unique within the dict, so no row is hit twice by the ON CONFLICT update
+        self.env.cr.execute(f"""
+            INSERT INTO {self._table} AS r (user_id, month, category_type, category_id, user_category_id,
+                                           expense_id, user_expense_id, amount_total, record_count,
+                                           amount_min, amount_max, create_uid, create_date, write_uid, write_date)
+            SELECT v.*, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM (VALUES {', '.join([self._DELTA_ROW] * len(buckets))}) AS v
+            ON CONFLICT ({self._BUCKET_KEY}) DO UPDATE SET
+                amount_total = r.amount_total + EXCLUDED.amount_total,
+                record_count = r.record_count + EXCLUDED.record_count,
+                amount_min = LEAST(r.amount_min, EXCLUDED.amount_min),
+                amount_max = GREATEST(r.amount_max, EXCLUDED.amount_max),
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, [self.env.uid, self.env.uid] + [value for key, delta in buckets.items() for value in key + tuple(delta)])
+        self.invalidate_model()
+
+    @api.model
+    def _remove_buckets(self, buckets):
+        """
+        Subtract {bucket key: [total, count, min, max]} deltas with one UPDATE.
+        Empty buckets are dropped; min/max are re-read from the records, in one
+        grouped query, only for the buckets where a removed amount was an extreme.
+        """
+        if not buckets:
+            return
+        self.env['easy_expenses.record'].flush_model()
+        cr = self.env.cr
+        cr.execute(f"""
+            UPDATE {self._table} r
+               SET amount_total = r.amount_total - v.amount_total, record_count = r.record_count - v.record_count
+              FROM (VALUES {', '.join([self._DELTA_ROW] * len(buckets))})
+                AS v(user_id, month, category_type, category_id, user_category_id, expense_id, user_expense_id,
+                     amount_total, record_count, amount_min, amount_max)
+             WHERE {self._BUCKET_JOIN}
+         RETURNING r.id, r.record_count, v.amount_min <= r.amount_min OR v.amount_max >= r.amount_max
+        """, [value for key, delta in buckets.items()
+              for value in list(key[:3]) + [id_ or 0 for id_ in key[3:]] + list(delta)])
+        # A missing bucket means the rollup has drifted: _rebuild() will reconcile it
+        rows = cr.fetchall()
+        empty_ids = tuple(rollup_id for rollup_id, remaining, _extreme in rows if remaining <= 0)
+        stale_ids = tuple(rollup_id for rollup_id, remaining, extreme in rows if remaining > 0 and extreme)
+        if empty_ids:
+            cr.execute(f"DELETE FROM {self._table} WHERE id IN %s", [empty_ids])
+        if stale_ids:
+            cr.execute(f"""
+                UPDATE {self._table} r SET amount_min = s.amount_min, amount_max = s.amount_max
+                  FROM (
+                        SELECT b.id, MIN(records.amount) AS amount_min, MAX(records.amount) AS amount_max
+                          FROM {self._table} b
+                          JOIN {self._RECORDS_SQL}
+                            ON records.user_id = b.user_id AND records.category_type = b.category_type
+                           AND records.date >= b.month AND records.date < b.month + interval '1 month'
+                           AND COALESCE(records.category_id, 0) = COALESCE(b.category_id, 0)
+                           AND COALESCE(records.user_category_id, 0) = COALESCE(b.user_category_id, 0)
+                           AND COALESCE(records.expense_id, 0) = COALESCE(b.expense_id, 0)
+                           AND COALESCE(records.user_expense_id, 0) = COALESCE(b.user_expense_id, 0)
+                         WHERE b.id IN %s
+                      GROUP BY b.id
+                       ) s
+                 WHERE r.id = s.id
+            """, [stale_ids])
+        self.invalidate_model()
+
+    @api.model
+    def _detach_catalog_entries(self, column, ids):
+        """
+        Merge the buckets of deleted catalog entries into the buckets without
+        that reference, as the records' set null does to their rows.
+        :param column: Bucket column referencing the entries (category_id, expense_id...).
+        :param ids: Ids of the entries being deleted.
+        """
+        if not ids:
+            return
+        self.flush_model()
+        key_columns = ['category_id', 'user_category_id', 'expense_id', 'user_expense_id']
+        moved_keys = ', '.join('NULL::integer' if name == column else name for name in key_columns)
+        self.env.cr.execute(f"""
+            INSERT INTO {self._table} AS r (user_id, month, category_type, {', '.join(key_columns)},
+                                           amount_total, record_count, amount_min, amount_max,
+                                           create_uid, create_date, write_uid, write_date)
+            SELECT user_id, month, category_type, {moved_keys},
+                   SUM(amount_total), SUM(record_count), MIN(amount_min), MAX(amount_max),
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM {self._table}
+             WHERE {column} IN %s
+          GROUP BY 1, 2, 3, 4, 5, 6, 7
+            ON CONFLICT ({self._BUCKET_KEY}) DO UPDATE SET
+                amount_total = r.amount_total + EXCLUDED.amount_total,
+                record_count = r.record_count + EXCLUDED.record_count,
+                amount_min = LEAST(r.amount_min, EXCLUDED.amount_min),
+                amount_max = GREATEST(r.amount_max, EXCLUDED.amount_max),
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, [self.env.uid, self.env.uid, tuple(ids)])
+        self.env.cr.execute(f"DELETE FROM {self._table} WHERE {column} IN %s", [tuple(ids)])
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self):
+        """
+        Recompute every bucket from the live and archived expense records.
+        :return: Number of buckets that differed from the incrementally maintained values.
+        """
+        self.env['easy_expenses.record'].flush_model()
+        cr = self.env.cr
+        cr.execute(f"""
+            CREATE TEMP TABLE easy_expenses_rollup_fresh AS
+            SELECT user_id, date_trunc('month', date)::date AS month, category_type,
+                   category_id, user_category_id, expense_id, user_expense_id,
+                   SUM(amount) AS amount_total, COUNT(*) AS record_count,
+                   MIN(amount) AS amount_min, MAX(amount) AS amount_max
+              FROM {self._RECORDS_SQL}
+          GROUP BY 1, 2, 3, 4, 5, 6, 7
+        """)
+        cr.execute(f"""
+            SELECT COUNT(*)
+              FROM easy_expenses_rollup_fresh f
+         FULL JOIN {self._table} r
+                ON r.user_id = f.user_id AND r.month = f.month AND r.category_type = f.category_type
+               AND COALESCE(r.category_id, 0) = COALESCE(f.category_id, 0)
+               AND COALESCE(r.user_category_id, 0) = COALESCE(f.user_category_id, 0)
+               AND COALESCE(r.expense_id, 0) = COALESCE(f.expense_id, 0)
+               AND COALESCE(r.user_expense_id, 0) = COALESCE(f.user_expense_id, 0)
+             WHERE r.id IS NULL OR f.user_id IS NULL
+                OR r.record_count != f.record_count
+                OR ABS(r.amount_total - f.amount_total) > 0.005
+                OR r.amount_min != f.amount_min OR r.amount_max != f.amount_max
+        """)
+        drift = cr.fetchone()[0]
+        cr.execute(f"DELETE FROM {self._table}")
+        cr.execute(f"""
+            INSERT INTO {self._table} (user_id, month, category_type, category_id, user_category_id,
+                                       expense_id, user_expense_id, amount_total, record_count,
+                                       amount_min, amount_max, create_uid, create_date, write_uid, write_date)
+            SELECT user_id, month, category_type, category_id, user_category_id, expense_id, user_expense_id,
+                   amount_total, record_count, amount_min, amount_max,
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM easy_expenses_rollup_fresh
+        """, [self.env.uid, self.env.uid])
+        cr.execute("DROP TABLE easy_expenses_rollup_fresh")
+        self.invalidate_model()
+        _logger.info("Rebuilt expense rollups, %s bucket(s) had drifted", drift)
+        return drift
+
+    @api.model
+    def action_rebuild(self):
+        """Server action entry point for _rebuild()"""
+        drift = self._rebuild()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': "Expense rollups rebuilt",
+                'message': f"{drift} bucket(s) were out of sync and have been corrected.",
+                'sticky': False,
+            },
+        }
+
+
+class ExpenseRecordArchive(models.Model):
+    """Expense records moved out of easy_expenses.record by the retention job"""
+    _name = 'easy_expenses.record_archive'
+    _description = 'Archived Expense Record'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    user_id = fields.Many2one('res.users', string="User", required=True, ondelete='cascade')
+    date = fields.Datetime(string="Date", required=True)
+    amount = fields.Float(string="Amount", required=True)
+    category_type = fields.Selection(
+        [('global', 'Global Category'), ('user', 'User Category')],
+        string="Category Type",
+        required=True
+    )
+    category_id = fields.Many2one('easy_expenses.category', string="Global Category")
+    user_category_id = fields.Many2one('easy_expenses.user_category', string="User Category")
+    expense_id = fields.Many2one('easy_expenses.expense', string="Global Expense")
+    user_expense_id = fields.Many2one('easy_expenses.user_expense', string="Custom Expense")
+    note = fields.Text(string="Note")
+    recurring_id = fields.Many2one('easy_expenses.recurring_expense', string="Recurring Expense",
+                                   ondelete='set null')
+    # Category dimension copied from the record, so summaries group archived rows the same way
+    category_key = fields.Char(string="Category Key")
+    expense_key = fields.Char(string="Expense Key")
+    category_name = fields.Char(string="Category")
+    expense_name = fields.Char(string="Expense")
+
+    def _auto_init(self):
+        if tools.table_exists(self._cr, self._table) and \
+                'category_key' not in tools.table_columns(self._cr, self._table):
+            _init_category_dimension(self)
+        return super()._auto_init()
+
+    def init(self):
+        tools.create_index(self._cr, 'easy_expenses_record_archive_user_date_idx',
+                           self._table, ['user_id', 'date'])
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import test_query_plans
+from . import test_partitioning
+from . import test_rollups
+from . import test_category_dimension
+from . import test_recurring
@@ -0,0 +1,56 @@
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from ..models.models import ARCHIVE_AFTER_MONTHS_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestCategoryDimension(TransactionCase):
+    """Catalog renames and deletions copied onto the records' stored category dimension"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Record = cls.env['easy_expenses.record']
+        cls.user = cls.env['res.users'].create({'name': "Dimension Test User",
+                                                'login': 'dimension_test_user@example.com'})
+        cls.user_category = cls.env['easy_expenses.user_category'].create(
+            {'name': "Pets", 'user_id': cls.user.id})
+        cls.user_expense = cls.env['easy_expenses.user_expense'].create(
+            {'name': "Vet", 'category_id': cls.user_category.id, 'user_id': cls.user.id})
+        cls.records = cls.Record.create([{
+            'user_id': cls.user.id,
+            'category_type': 'user',
+            'user_category_id': cls.user_category.id,
+            'user_expense_id': cls.user_expense.id,
+            'amount': amount,
+            'date': date,
+        } for amount, date in ((12.0, fields.Datetime.now()), (8.0, fields.Datetime.to_datetime('2001-03-04')))])
+        cls.old_record = cls.records[1]
+        cls.env['ir.config_parameter'].sudo().set_param(ARCHIVE_AFTER_MONTHS_PARAM, 12)
+        cls.Record._cron_archive_old_records()
+        cls.live_record = cls.records.exists()
+        cls.archived = cls.env['easy_expenses.record_archive'].browse(cls.old_record.id)
+
+    def _dimension(self, rows):
+        return {(row.category_key or None, row.category_name or None, row.expense_key or None,
+                 row.expense_name or None) for row in rows}
+
+    def test_rename(self):
+        """A rename reaches live and archived rows, touches the live ones and bumps the records version"""
+        version = self.Record._get_records_version(self.user.id)
+        self.user_category.name = "Animals"
+        self.assertEqual(self._dimension(self.live_record | self.archived), {
+            (f'u:{self.user_category.id}', "Animals", f'u:{self.user_expense.id}', "Vet")})
+        self.assertGreater(self.Record._get_records_version(self.user.id), version)
+        self.assertEqual(self.live_record.write_uid, self.env.user)
+
+    def test_delete(self):
+        """Deleting the entries clears the key and name they left on live and archived rows"""
+        self.user_expense.unlink()
+        self.assertEqual(self._dimension(self.live_record | self.archived), {
+            (f'u:{self.user_category.id}', "Pets", None, None)})
+        version = self.Record._get_records_version(self.user.id)
+        self.user_category.unlink()
+        self.assertEqual(self._dimension(self.live_record | self.archived), {(None, None, None, None)})
+        self.assertGreater(self.Record._get_records_version(self.user.id), version)
+        self.assertFalse(self.live_record.user_category_id)
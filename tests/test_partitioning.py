@@ -0,0 +1,144 @@
+from dateutil.relativedelta import relativedelta
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from ..controllers.reports import _summary_rows
+from ..models.models import ARCHIVE_AFTER_MONTHS_PARAM
+
+# Far enough back for a 12 months retention to archive it
+OLD_MONTHS_AGO = 30
+
+
+@tagged('post_install', '-at_install')
+class TestPartitioning(TransactionCase):
+    """Opt-in monthly partitioning and cold archiving of the records table, on the real schema"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Record = cls.env['easy_expenses.record']
+        cls.user = cls.env['res.users'].create({'name': "Partition Test User",
+                                                'login': 'partition_test_user@example.com'})
+        cls.expense = cls.env['easy_expenses.expense'].search([], limit=1)
+        cls.this_month = fields.Date.today().replace(day=1)
+        cls.old_month = cls.this_month - relativedelta(months=OLD_MONTHS_AGO)
+        cls.recent = cls._create_records(cls.this_month, [10.0, 20.0])
+        cls.old = cls._create_records(cls.old_month, [5.0, 7.5, 2.5])
+
+    @classmethod
+    def _create_records(cls, month, amounts):
+        return cls.Record.create([{
+            'user_id': cls.user.id,
+            'category_type': 'global',
+            'category_id': cls.expense.category_id.id,
+            'expense_id': cls.expense.id,
+            'amount': amount,
+            'date': fields.Datetime.to_datetime(month) + relativedelta(days=index, hours=12),
+        } for index, amount in enumerate(amounts)])
+
+    def _partition_of(self, record):
+        record.flush_recordset()
+        self.env.cr.execute("SELECT tableoid::regclass::text FROM easy_expenses_record WHERE id = %s", [record.id])
+        return self.env.cr.fetchone()[0]
+
+    def _totals(self, granularity, tz='UTC'):
+        """(amount, count) of the test user's summary, from the records (day) or the rollups (month)"""
+        rows = _summary_rows(self.env, self.user.id, granularity, 'category_type', tz)
+        return round(sum(row['sum'] for row in rows), 2), sum(row['count'] for row in rows)
+
+    def _archive(self):
+        self.env['ir.config_parameter'].sudo().set_param(ARCHIVE_AFTER_MONTHS_PARAM, 12)
+        self.Record._cron_archive_old_records()
+
+    def test_partition_table(self):
+        """Partitioning keeps the rows and the primary key name, routes rows by month and keeps ORM CRUD working"""
+        self.Record._partition_table()
+        self.assertTrue(self.Record._is_partitioned())
+
+        cr = self.env.cr
+        cr.execute("""
+            SELECT conname FROM pg_constraint
+             WHERE conrelid = 'easy_expenses_record'::regclass AND contype = 'p'
+        """)
+        self.assertEqual(cr.fetchall(), [('easy_expenses_record_pkey',)])
+        self.assertEqual(self.Record.search_count([('user_id', '=', self.user.id)]), 5)
+        self.assertEqual(self._partition_of(self.recent[0]), f'easy_expenses_record_p{self.this_month:%Y%m}')
+        self.assertEqual(self._partition_of(self.old[0]), f'easy_expenses_record_p{self.old_month:%Y%m}')
+
+        record = self._create_records(self.this_month, [3.0])
+        record.amount = 4.0
+        self.assertEqual(self._partition_of(record), f'easy_expenses_record_p{self.this_month:%Y%m}')
+        self.assertEqual(self._totals('day'), (49.0, 6))
+        self.assertEqual(self._totals('month'), (49.0, 6))
+        record.unlink()
+        self.assertFalse(record.exists())
+        self.assertEqual(self._totals('month'), (45.0, 5))
+
+    def test_partition_pruning(self):
+        """A date range filter only scans the partitions of its months"""
+        self.Record._partition_table()
+        self.env.cr.execute("EXPLAIN SELECT id FROM easy_expenses_record WHERE date >= %s AND date < %s",
+                            [self.this_month, self.this_month + relativedelta(months=1)])
+        plan = '\n'.join(row[0] for row in self.env.cr.fetchall())
+        self.assertIn(f'easy_expenses_record_p{self.this_month:%Y%m}', plan)
+        self.assertNotIn(f'easy_expenses_record_p{self.old_month:%Y%m}', plan)
+        self.assertNotIn('easy_expenses_record_pdefault', plan)
+
+    def test_archive_old_records(self):
+        """Archiving moves old rows with their category dimension, logs tombstones and changes no total"""
+        totals = {granularity: self._totals(granularity) for granularity in ('day', 'month')}
+        self.assertEqual(totals['day'], (45.0, 5))
+        self.assertEqual(totals['month'], totals['day'])
+        old_ids = self.old.ids
+
+        self._archive()
+
+        self.assertFalse(self.Record.search([('id', 'in', old_ids)]))
+        self.assertEqual(sorted(self.Record.search([('user_id', '=', self.user.id)]).ids), sorted(self.recent.ids))
+        archived = self.env['easy_expenses.record_archive'].search([('id', 'in', old_ids)])
+        self.assertEqual(sorted(archived.ids), sorted(old_ids))
+        self.assertEqual(set(archived.mapped('category_key')), {f'g:{self.expense.category_id.id}'})
+        self.assertEqual(set(archived.mapped('expense_key')), {f'g:{self.expense.id}'})
+        self.assertEqual(set(archived.mapped('category_name')), {self.expense.category_id.name})
+        self.assertEqual(set(archived.mapped('expense_name')), {self.expense.name})
+
+        tombstones = self.env['easy_expenses.sync_tombstone'].search([
+            ('res_model', '=', 'easy_expenses.record'), ('res_id', 'in', old_ids)])
+        self.assertEqual(sorted(tombstones.mapped('res_id')), sorted(old_ids))
+        self.assertEqual(tombstones.user_id, self.user)
+
+        # Archived records keep counting, on the raw path as on the rollup path
+        for granularity, expected in totals.items():
+            self.assertEqual(self._totals(granularity), expected)
+        self.assertEqual(self._totals('week', 'Europe/Brussels'), totals['day'])
+
+    def test_archive_partitioned(self):
+        """On a partitioned table, archiving also drops the emptied monthly partitions"""
+        self.Record._partition_table()
+        self._archive()
+        self.env.cr.execute("SELECT 1 FROM pg_class WHERE relname = %s",
+                            [f'easy_expenses_record_p{self.old_month:%Y%m}'])
+        self.assertFalse(self.env.cr.fetchone())
+        self.assertEqual(self._totals('day'), (45.0, 5))
+        self.assertEqual(self._partition_of(self.recent[0]), f'easy_expenses_record_p{self.this_month:%Y%m}')
+
+    def test_archive_keeps_budget_spending(self):
+        """Budgets created or recomputed after archiving still count the archived records"""
+        Budget = self.env['easy_expenses.budget']
+        budget_vals = {
+            'name': "Partition Test Budget",
+            'user_id': self.user.id,
+            'date_from': self.old_month,
+            'date_to': self.this_month + relativedelta(months=1, days=-1),
+            'amount_limit': 1000.0,
+        }
+        budget = Budget.create(budget_vals)
+        self.assertEqual(budget.spent, 45.0)
+
+        self._archive()
+        budget._recompute_spent()
+        self.assertEqual(budget.spent, 45.0)
+        self.assertEqual(Budget.create(budget_vals).spent, 45.0)
+
+        # Redefining the period recomputes from both tables too
+        budget.date_to = self.this_month - relativedelta(days=1)
+        self.assertEqual(budget.spent, 15.0)
@@ -0,0 +1,193 @@
+import re
+from datetime import timedelta
+from contextlib import contextmanager
+from unittest.mock import patch
+from odoo.sql_db import Cursor
+from odoo.tools import SQL
+from odoo.tests import TransactionCase, tagged
+from ..controllers.records import _build_record_domain, _keyset_domain
+from ..controllers.reports import _summary_rows
+from ..controllers.sync import SYNC_MODELS, SYNC_OVERLAP
+from ..controllers._serializers import CATEGORY_FIELDS, EXPENSE_FIELDS, EXPENSE_NAMES, _search_read
+
+# Rows of a busy neighbour next to a few hundred of the tested user's, so the
+# planner sees the per-user selectivity of a production table
+SEED_OTHER_RECORDS = 50000
+SEED_USER_RECORDS = 300
+SEED_OTHER_CATALOG = 5000
+# Tables that must always be reached through an index on the hot paths
+INDEXED_TABLES = ('easy_expenses_record', 'easy_expenses_record_rollup',
+                  'easy_expenses_user_category', 'easy_expenses_user_expense')
+
+
+@tagged('post_install', '-at_install')
+class TestQueryPlans(TransactionCase):
+    """EXPLAIN the queries of the hot API paths and fail on sequential scans of the big tables"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.env['res.users'].create({'name': "Plan Test User", 'login': 'plan_test_user@example.com'})
+        cls.other_user = cls.env.ref('base.user_admin')
+        cls.expense = cls.env['easy_expenses.expense'].search([], limit=1)
+        cls.user_category = cls.env['easy_expenses.user_category'].create(
+            {'name': "Pets", 'user_id': cls.user.id})
+        cls.user_expense = cls.env['easy_expenses.user_expense'].create(
+            {'name': "Food", 'category_id': cls.user_category.id, 'user_id': cls.user.id})
+
+        cr = cls.env.cr
+        global_expenses = cls.env['easy_expenses.expense'].search_read([], ['category_id'], load=None)
+        cr.execute("""
+            INSERT INTO easy_expenses_record (user_id, category_type, category_id, expense_id, amount, date,
+                                              category_key, expense_key, create_uid, create_date, write_uid, write_date)
+            SELECT %(user_id)s, 'global', e.category_ids[1 + n %% %(count)s], e.ids[1 + n %% %(count)s], 1 + n %% 97,
+                   now() at time zone 'UTC' - n * interval '37 minutes',
+                   'g:' || e.category_ids[1 + n %% %(count)s], 'g:' || e.ids[1 + n %% %(count)s],
+                   1, now() at time zone 'UTC', 1, now() at time zone 'UTC' - n * interval '37 minutes'
+              FROM generate_series(1, %(rows)s) n,
+                   (SELECT %(ids)s::int[] AS ids, %(category_ids)s::int[] AS category_ids) e
+        """, {
+            'user_id': cls.other_user.id,
+            'rows': SEED_OTHER_RECORDS,
+            'count': len(global_expenses),
+            'ids': [expense['id'] for expense in global_expenses],
+            'category_ids': [expense['category_id'] for expense in global_expenses],
+        })
+        cr.execute("""
+            INSERT INTO easy_expenses_record (user_id, category_type, user_category_id, user_expense_id, amount, date,
+                                              category_key, expense_key, create_uid, create_date, write_uid, write_date)
+            SELECT %s, 'user', %s, %s, 1 + n %% 53, now() at time zone 'UTC' - n * interval '3 hours',
+                   'u:' || %s, 'u:' || %s, 1, now() at time zone 'UTC', 1, now() at time zone 'UTC' - n * interval '3 hours'
+              FROM generate_series(1, %s) n
+        """, [cls.user.id, cls.user_category.id, cls.user_expense.id, cls.user_category.id, cls.user_expense.id,
+              SEED_USER_RECORDS])
+        # Custom catalogs of the neighbour, so per-user catalog lookups need their user_id indexes
+        cr.execute("""
+            INSERT INTO easy_expenses_user_category (user_id, name, create_uid, create_date, write_uid, write_date)
+            SELECT %s, 'Category ' || n, 1, now() at time zone 'UTC', 1, now() at time zone 'UTC' - n * interval '1 hour'
+              FROM generate_series(1, %s) n
+         RETURNING id
+        """, [cls.other_user.id, SEED_OTHER_CATALOG])
+        other_category_id = cr.fetchone()[0]
+        cr.execute("""
+            INSERT INTO easy_expenses_user_expense (user_id, category_id, name,
+                                                    create_uid, create_date, write_uid, write_date)
+            SELECT %s, %s, 'Expense ' || n, 1, now() at time zone 'UTC', 1, now() at time zone 'UTC' - n * interval '1 hour'
+              FROM generate_series(1, %s) n
+        """, [cls.other_user.id, other_category_id, SEED_OTHER_CATALOG])
+        cls.env['easy_expenses.record_rollup']._rebuild()
+        for table in INDEXED_TABLES:
+            cr.execute(f"ANALYZE {table}")
+
+    @contextmanager
+    def _capture_queries(self):
+        """Record the (query, params) of every statement executed in the block"""
+        queries = []
+        execute = Cursor.execute
+
+        def capture(cr, query, params=None, log_exceptions=True):
+            if isinstance(query, SQL):
+                query, params = query.code, query.params
+            queries.append((query, params))
+            return execute(cr, query, params, log_exceptions)
+
+        with patch.object(Cursor, 'execute', capture):
+            yield queries
+
+    def _assert_indexed(self, queries, indexes=()):
+        """
+        EXPLAIN every captured SELECT touching INDEXED_TABLES and fail on a sequential scan of them.
+        :param indexes: Index names that must each appear in the plan of at least one of the queries.
+        """
+        explained = 0
+        plans = []
+        for query, params in queries:
+            if not query.lstrip().upper().startswith('SELECT'):
+                continue
+            tables = [table for table in INDEXED_TABLES if re.search(rf'"?{table}"?\b', query)]
+            if not tables:
+                continue
+            self.env.cr.execute(f"EXPLAIN {query}", params)
+            plan = '\n'.join(row[0] for row in self.env.cr.fetchall())
+            for table in tables:
+                self.assertNotRegex(plan, rf'Seq Scan on {table}\b', f"Sequential scan of {table}:\n{query}\n{plan}")
+            plans.append(plan)
+            explained += 1
+        self.assertTrue(explained, "No query on the indexed tables was captured")
+        for index in indexes:
+            self.assertTrue(any(index in plan for plan in plans), f"{index} is not used:\n" + '\n\n'.join(plans))
+
+    def test_get_records(self):
+        """records/get: plain listing, every filter, and a deep keyset page"""
+        Record = self.env['easy_expenses.record'].sudo()
+        middle = Record.search([('user_id', '=', self.user.id)], order='date desc, id desc',
+                               offset=SEED_USER_RECORDS // 2, limit=1)
+        filters_list = [
+            {},
+            {'start_date': '2000-01-01', 'end_date': '2100-01-01'},
+            {'category_id': self.expense.category_id.id},
+            {'user_category_id': self.user_category.id},
+            {'category_key': f'u:{self.user_category.id}'},
+            {'expense_key': f'u:{self.user_expense.id}'},
+        ]
+        for filters in filters_list:
+            with self.subTest(filters=filters), self._capture_queries() as queries:
+                Record.search_read(_build_record_domain(self.user.id, filters), ['amount', 'date'],
+                                   order='date desc, id desc', limit=101)
+            self._assert_indexed(queries)
+
+        with self._capture_queries() as queries:
+            Record.search_read(_build_record_domain(self.user.id, {}) + _keyset_domain(middle.date, middle.id),
+                               ['amount', 'date'], order='date desc, id desc', limit=101)
+        self._assert_indexed(queries)
+
+    def test_ownership_lookups(self):
+        """Single-record routes check ownership with an (id, user_id) search"""
+        record = self.env['easy_expenses.record'].search([('user_id', '=', self.user.id)], limit=1)
+        with self._capture_queries() as queries:
+            self.env['easy_expenses.record'].sudo().search([('id', '=', record.id), ('user_id', '=', self.user.id)],
+                                                           limit=1)
+        self._assert_indexed(queries)
+
+    def test_summary(self):
+        """records/summary on the rollup path (UTC months) and on the raw path (days, other timezones)"""
+        for granularity, tz, start_date, end_date in (
+            ('month', 'UTC', None, None),
+            ('year', 'UTC', '2020-01-01', None),
+            ('day', 'UTC', None, None),
+            ('week', 'UTC', '2020-01-01', '2100-01-01'),
+            ('month', 'Europe/Brussels', None, None),
+        ):
+            for group_by in ('category', 'expense', 'category_type'):
+                with self.subTest(granularity=granularity, tz=tz, group_by=group_by), \
+                        self._capture_queries() as queries:
+                    rows = _summary_rows(self.env, self.user.id, granularity, group_by, tz, start_date, end_date)
+                self.assertTrue(rows)
+                self._assert_indexed(queries)
+
+    def test_user_catalogs(self):
+        """user_categories/get and user_expenses/category: per-user lookups through their user_id indexes"""
+        UserCategory = self.env['easy_expenses.user_category'].sudo()
+        UserExpense = self.env['easy_expenses.user_expense'].sudo()
+        with self._capture_queries() as queries:
+            _search_read(UserCategory, [('user_id', '=', self.user.id)], CATEGORY_FIELDS)
+        self._assert_indexed(queries)
+
+        for domain in ([('user_id', '=', self.user.id)],
+                       [('user_id', '=', self.user.id), ('category_id', '=', self.user_category.id)]):
+            with self.subTest(domain=domain), self._capture_queries() as queries:
+                _search_read(UserExpense, domain, EXPENSE_FIELDS, EXPENSE_NAMES)
+            self._assert_indexed(queries)
+
+    def test_sync(self):
+        """sync: a recent watermark reads each model through its (user_id, write_date) index"""
+        since = self.env.cr.now() - timedelta(days=1)
+        for key, model_name, output_fields, names in SYNC_MODELS:
+            Model = self.env[model_name].sudo()
+            domain = [('user_id', '=', self.user.id), ('id', '>', 0), ('write_date', '>', since - SYNC_OVERLAP)]
+            with self.subTest(model=model_name), self._capture_queries() as queries:
+                _search_read(Model, domain, output_fields, names, order='id', limit=1001)
+            if model_name == 'easy_expenses.record':
+                self._assert_indexed(queries, [f'{Model._table}_user_write_date_idx'])
+            else:
+                self._assert_indexed(queries)
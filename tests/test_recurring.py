@@ -0,0 +1,93 @@
+from unittest.mock import patch
+from dateutil.relativedelta import relativedelta
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from ..models import models as expense_models
+
+
+@tagged('post_install', '-at_install')
+class TestRecurringExpenses(TransactionCase):
+    """Scheduled generation of the expense records of recurring expense templates"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Template = cls.env['easy_expenses.recurring_expense']
+        cls.Record = cls.env['easy_expenses.record']
+        cls.user = cls.env['res.users'].create({'name': "Recurring Test User",
+                                                'login': 'recurring_test_user@example.com'})
+        cls.expense = cls.env['easy_expenses.expense'].search([], limit=1)
+        cls.today = fields.Date.today()
+
+    def _create_templates(self, count=1, **vals):
+        return self.Template.create([{
+            'name': f"Rent {index}",
+            'user_id': self.user.id,
+            'category_type': 'global',
+            'category_id': self.expense.category_id.id,
+            'expense_id': self.expense.id,
+            'amount': 100.0 + index,
+            'interval_type': 'month',
+            'start_date': self.today - relativedelta(months=3),
+            **vals,
+        } for index in range(count)])
+
+    def _occurrences(self, templates):
+        records = self.Record.search([('recurring_id', 'in', templates.ids)])
+        return {(record.recurring_id.id, record.date.date()) for record in records}, len(records)
+
+    def test_generate_in_chunks(self):
+        """Every due occurrence of every template is created once, whatever the chunk size"""
+        templates = self._create_templates(5)
+        with patch.object(expense_models, 'RECURRING_TEMPLATE_CHUNK_SIZE', 2):
+            self.Template._cron_generate_records()
+        occurrences, count = self._occurrences(templates)
+        self.assertEqual(count, 20)
+        self.assertEqual(occurrences, {(template.id, template.start_date + relativedelta(months=months))
+                                       for template in templates for months in range(4)})
+        templates.invalidate_recordset()
+        for template in templates:
+            self.assertEqual(template.occurrence_count, 4)
+            self.assertEqual(template.next_date, template.start_date + relativedelta(months=4))
+            self.assertTrue(template.active)
+
+    def test_replayed_chunk(self):
+        """A chunk replayed after its records were created but before its schedules advanced adds nothing"""
+        templates = self._create_templates(2)
+        self.Template._cron_generate_records()
+        before = self._occurrences(templates)
+
+        # State of a run interrupted between the record creation and the schedule UPDATE
+        self.env.cr.execute("UPDATE easy_expenses_recurring_expense "
+                            "SET occurrence_count = 1, next_date = start_date + interval '1 month' "
+                            "WHERE id IN %s", [tuple(templates.ids)])
+        self.env.invalidate_all()
+        self.Template._cron_generate_records()
+
+        self.assertEqual(self._occurrences(templates), before)
+        templates.invalidate_recordset()
+        self.assertEqual(set(templates.mapped('occurrence_count')), {4})
+
+    def test_end_date(self):
+        """A template reaching its end date stops at its last occurrence and is deactivated"""
+        start_date = self.today - relativedelta(months=3)
+        template = self._create_templates(start_date=start_date,
+                                          end_date=start_date + relativedelta(months=2, days=-1))
+        running = self._create_templates(end_date=self.today + relativedelta(years=1))
+        self.Template._cron_generate_records()
+
+        occurrences, count = self._occurrences(template)
+        self.assertEqual(count, 2)
+        self.assertEqual(occurrences, {(template.id, template.start_date),
+                                       (template.id, template.start_date + relativedelta(months=1))})
+        template.invalidate_recordset()
+        self.assertFalse(template.active)
+        self.assertEqual(template.occurrence_count, 2)
+
+        running.invalidate_recordset()
+        self.assertTrue(running.active)
+        self.assertEqual(self._occurrences(running)[1], 4)
+
+        # A deactivated template is not picked again
+        self.Template._cron_generate_records()
+        self.assertEqual(self._occurrences(template)[1], 2)
@@ -0,0 +1,69 @@
+from dateutil.relativedelta import relativedelta
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from ..controllers.reports import _summary_rows
+
+
+@tagged('post_install', '-at_install')
+class TestRollups(TransactionCase):
+    """Monthly rollups kept equal to the records they aggregate"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Record = cls.env['easy_expenses.record']
+        cls.user = cls.env['res.users'].create({'name': "Rollup Test User", 'login': 'rollup_test_user@example.com'})
+        cls.user_category = cls.env['easy_expenses.user_category'].create(
+            {'name': "Pets", 'user_id': cls.user.id})
+        cls.user_expense = cls.env['easy_expenses.user_expense'].create(
+            {'name': "Vet", 'category_id': cls.user_category.id, 'user_id': cls.user.id})
+        cls.other_category = cls.env['easy_expenses.user_category'].create(
+            {'name': "Kids", 'user_id': cls.user.id})
+        cls.this_month = fields.Date.today().replace(day=1)
+        cls.records = cls.Record.create([{
+            'user_id': cls.user.id,
+            'category_type': 'user',
+            'user_category_id': category.id,
+            'user_expense_id': category == cls.user_category and cls.user_expense.id,
+            'amount': amount,
+            'date': fields.Datetime.to_datetime(cls.this_month - relativedelta(months=months_ago)) +
+                    relativedelta(days=index, hours=12),
+        } for months_ago in (0, 1) for category in (cls.user_category, cls.other_category)
+            for index, amount in enumerate([4.0, 9.5, 1.5])])
+
+    def _summary(self, tz):
+        """{(period, category_type): (sum, count)} by month, from the rollups in UTC, from the records otherwise"""
+        rows = _summary_rows(self.env, self.user.id, 'month', 'category_type', tz)
+        return {(row['period'], row['category_type']): (round(row['sum'], 2), row['count']) for row in rows}
+
+    def _assert_rollups_match_records(self):
+        rollups = self.env['easy_expenses.record_rollup'].search([('user_id', '=', self.user.id)])
+        records = self.Record.search([('user_id', '=', self.user.id)])
+        self.assertEqual(self._summary('UTC'), self._summary('Etc/UTC'))
+        expected = {key: [round(total, 2), count, minimum, maximum]
+                    for key, (total, count, minimum, maximum) in records._rollup_buckets().items()}
+        actual = {(rollup.user_id.id, rollup.month, rollup.category_type, rollup.category_id.id or None,
+                   rollup.user_category_id.id or None, rollup.expense_id.id or None, rollup.user_expense_id.id or None):
+                  [round(rollup.amount_total, 2), rollup.record_count, rollup.amount_min, rollup.amount_max]
+                  for rollup in rollups}
+        self.assertEqual(actual, expected)
+
+    def test_record_changes(self):
+        """Creating, rewriting the extremes of and deleting records keeps every bucket exact"""
+        self._assert_rollups_match_records()
+        self.records.filtered(lambda rec: rec.amount == 9.5).write({'amount': 2.0})
+        self._assert_rollups_match_records()
+        self.records.filtered(lambda rec: rec.amount == 1.5)[:2].unlink()
+        self._assert_rollups_match_records()
+        self.records.exists().write({'user_category_id': self.other_category.id, 'user_expense_id': False})
+        self._assert_rollups_match_records()
+
+    def test_delete_catalog_entries(self):
+        """Deleting catalog entries keeps the rollup totals equal to the records'"""
+        before = self._summary('UTC')
+        self.user_expense.unlink()
+        self._assert_rollups_match_records()
+        self.user_category.unlink()
+        self._assert_rollups_match_records()
+        self.assertEqual(self._summary('UTC'), before)
+        self.assertEqual(self.Record.search_count([('user_id', '=', self.user.id)]), len(self.records))